@@ -0,0 +1,6 @@
+from . import db
+
+class Cart(db.Model):
+    __tablename__ = "Cart"
+    cart_id = db.Column(db.String(32), primary_key=True)
+    touched_at = db.Column(db.DateTime, nullable=False)  # idx_cart_touched in schema.sql
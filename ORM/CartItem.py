@@ -0,0 +1,11 @@
+from . import db
+
+class CartItem(db.Model):
+    __tablename__ = "CartItem"
+    cart_item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    cart_id = db.Column(db.String(32), db.ForeignKey("Cart.cart_id", ondelete="CASCADE"), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # 'pizza' or 'product'
+    item_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+
+    __table_args__ = (db.UniqueConstraint('cart_id', 'kind', 'item_id'),)
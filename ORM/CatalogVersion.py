@@ -0,0 +1,8 @@
+from . import db
+from datetime import datetime
+
+class CatalogVersion(db.Model):
+    __tablename__ = "CatalogVersion"
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
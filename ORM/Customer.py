@@ -13,6 +13,8 @@ class Customer(db.Model):
     birth_date = db.Column(db.Date, nullable=False)
     postcode = db.Column(db.String(20), nullable=False)
     gender = db.Column(db.String(10), nullable=False)
+    # 'MM-DD', computed by the database so birthday lookups can use an index
+    birth_month_day = db.Column(db.String(5), db.Computed("strftime('%m-%d', birth_date)", persisted=True))
 
     __table_args__ = (
         CheckConstraint('birth_date <= CURRENT_DATE', name='chk_birth_date'),
@@ -0,0 +1,6 @@
+from . import db
+
+class CustomerLoyaltyCounter(db.Model):
+    __tablename__ = "CustomerLoyaltyCounter"
+    customer_id = db.Column(db.Integer, db.ForeignKey("Customer.customer_id"), primary_key=True)
+    total_pizzas_bought = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,8 @@
+from . import db
+
+class DailyCustomerRollup(db.Model):
+    __tablename__ = "DailyCustomerRollup"
+    day = db.Column(db.Date, primary_key=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey("Customer.customer_id"), primary_key=True)
+    total_orders = db.Column(db.Integer, nullable=False, default=0)
+    total_spent = db.Column(db.Float, nullable=False, default=0.0)
@@ -0,0 +1,10 @@
+from . import db
+
+class DailyEarningsRollup(db.Model):
+    __tablename__ = "DailyEarningsRollup"
+    day = db.Column(db.Date, primary_key=True)
+    postcode = db.Column(db.String(20), primary_key=True)
+    gender = db.Column(db.String(10), primary_key=True)
+    age_group = db.Column(db.String(10), primary_key=True)
+    total_orders = db.Column(db.Integer, nullable=False, default=0)
+    total_earnings = db.Column(db.Float, nullable=False, default=0.0)
@@ -0,0 +1,8 @@
+from . import db
+
+class DailyPizzaRollup(db.Model):
+    __tablename__ = "DailyPizzaRollup"
+    day = db.Column(db.Date, primary_key=True)
+    pizza_id = db.Column(db.Integer, db.ForeignKey("Pizza.pizza_id"), primary_key=True)
+    total_sold = db.Column(db.Integer, nullable=False, default=0)
+    total_revenue = db.Column(db.Float, nullable=False, default=0.0)
@@ -9,3 +9,7 @@ class DeliveryPerson(db.Model):
     phone = db.Column(db.String(30), nullable=False, unique=True)
     postcode = db.Column(db.String(20), nullable=False)
     last_delivery_at = db.Column(db.DateTime, nullable=True)
+    # End of the cooldown (last_delivery_at + 30 min); the epoch for couriers who never delivered
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime(1970, 1, 1))
+    # Bumped on every claim/delivery; claims are conditional on the version read (services/dispatch.py)
+    version = db.Column(db.Integer, nullable=False, default=0)
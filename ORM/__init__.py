@@ -10,4 +10,11 @@ from .Ingredient import Ingredient
 from .Product import Product
 from .OrderProduct import OrderProduct
 from .Order import Order
-from .OrderPizza import OrderPizza
\ No newline at end of file
+from .OrderPizza import OrderPizza
+from .CatalogVersion import CatalogVersion
+from .CustomerLoyaltyCounter import CustomerLoyaltyCounter
+from .DailyEarningsRollup import DailyEarningsRollup
+from .DailyCustomerRollup import DailyCustomerRollup
+from .DailyPizzaRollup import DailyPizzaRollup
+from .Cart import Cart
+from .CartItem import CartItem
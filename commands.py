@@ -0,0 +1,97 @@
+"""
+Maintenance commands (``flask --app main <command>``).
+
+They hang off a blueprint without a CLI group, so they stay top-level
+commands and are only registered when create_app() runs.
+"""
+import click
+from flask import Blueprint, current_app
+from ORM import db
+from services import loyalty, query_plans, rollups, schema
+from services.analytics_snapshot import analytics_snapshot
+
+bp = Blueprint('commands', __name__, cli_group=None)
+
+# -----------------------------
+# CLI: SCHEMA
+# -----------------------------
+@bp.cli.command("init-db")
+def init_db_command():
+    """Create missing tables and upgrade an existing database to the current schema."""
+    for change in schema.upgrade():
+        click.echo(f"  {change}")
+    click.echo(f"Schema up to date in {db.engine.url.database}")
+
+# -----------------------------
+# CLI: LOYALTY COUNTERS
+# -----------------------------
+@bp.cli.command("loyalty-counters")
+@click.option("--rebuild", is_flag=True, help="Reset every counter from the CustomerLoyalty view.")
+def loyalty_counters_command(rebuild):
+    """Check the loyalty counters against the CustomerLoyalty view."""
+    if rebuild:
+        loyalty.rebuild_counters()
+        db.session.commit()
+        click.echo("Loyalty counters rebuilt from CustomerLoyalty.")
+
+    mismatches = loyalty.verify_counters()
+    for customer_id, counter_value, view_value in mismatches:
+        click.echo(f"customer {customer_id}: counter={counter_value} view={view_value}")
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} loyalty counter(s) out of date; run with --rebuild")
+    click.echo("Loyalty counters match the CustomerLoyalty view.")
+
+# -----------------------------
+# CLI: REPORT ROLLUPS
+# -----------------------------
+@bp.cli.command("rollups-backfill")
+def rollups_backfill_command():
+    """Rebuild the daily report rollups from the Orders history."""
+    earnings, customers, pizzas = rollups.backfill()
+    db.session.commit()
+    click.echo(f"Rebuilt rollups: {earnings} earnings rows, {customers} customer rows, {pizzas} pizza rows.")
+
+# -----------------------------
+# CLI: ANALYTICS SNAPSHOT
+# -----------------------------
+@bp.cli.command("snapshot-analytics")
+def snapshot_analytics_command():
+    """Publish a fresh analytics snapshot now (PIZZA_ANALYTICS_SNAPSHOT=1)."""
+    if not current_app.config['ANALYTICS_SNAPSHOT']:
+        raise click.ClickException("Set PIZZA_ANALYTICS_SNAPSHOT=1 to use the analytics snapshot.")
+    analytics_snapshot.refresh()
+    click.echo(f"Snapshot written to {analytics_snapshot.path}")
+
+# -----------------------------
+# CLI: STATIC ASSETS
+# -----------------------------
+@bp.cli.command("build-assets")
+def build_assets_command():
+    """Fingerprint, gzip and thumbnail the static files into static/dist."""
+    from services import assets
+
+    report = assets.build(current_app.static_folder)
+    for name, built, before, after in report:
+        click.echo(f"{name:<40} {before:>8} -> {after:>8} bytes  {built}")
+    before, after = sum(row[2] for row in report), sum(row[3] for row in report)
+    click.echo(f"{len(report)} assets: {before} -> {after} bytes; restart the app to serve them.")
+    if assets.Image is None:
+        images = sum(assets.thumbnail_source(name) for name, *_ in report)
+        if images:
+            raise SystemExit(f"Pillow is not installed: no thumbnails for {images} image(s), the pages "
+                             "keep the full-size files; pip install -r requirements.txt and build again")
+
+# -----------------------------
+# CLI: QUERY PLANS
+# -----------------------------
+@bp.cli.command("check-query-plans")
+def check_query_plans_command():
+    """Fail if an age/birthday report query falls back to a full table scan."""
+    failures = 0
+    for label, sql, params in query_plans.index_checks():
+        plan = query_plans.explain(sql, params)
+        scans = query_plans.full_scans(plan)
+        click.echo(f"{'FAIL' if scans else 'ok  '} {label}: {' | '.join(plan)}")
+        failures += bool(scans)
+    if failures:
+        raise SystemExit(f"{failures} query plan(s) scan a whole table")
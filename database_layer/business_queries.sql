@@ -49,17 +49,16 @@ LEFT JOIN Orders o ON c.customer_id = o.customer_id AND o.cancelled_at IS NULL
 LEFT JOIN OrderPizza op ON o.order_id = op.order_id
 GROUP BY c.customer_id, c.first_name, c.last_name, c.email;
 
-
-
 --Bday discounts
 CREATE VIEW IF NOT EXISTS BirthdayCustomers AS
 SELECT customer_id,first_name,last_name,email,birth_date,postcode
 FROM Customer
-WHERE DATE_FORMAT(birth_date, '%m-%d') = DATE_FORMAT(CURDATE(), '%m-%d');
+WHERE birth_month_day = DATE_FORMAT(CURDATE(), '%m-%d');
 
 
 
--- Simplified: Get all available delivery personnel
+-- Delivery personnel free to take an order now (cooldown over).
+-- Filter on postcode as well to get an idx_dp_postcode_available range probe.
 CREATE VIEW IF NOT EXISTS AvailableDeliveryPersonnel AS
 SELECT 
     delivery_person_id,
@@ -67,14 +66,9 @@ SELECT
     phone,
     postcode,
     last_delivery_at,
-    CASE 
-        WHEN last_delivery_at IS NULL THEN 0
-        WHEN TIMESTAMPDIFF(MINUTE, last_delivery_at, NOW()) >= 30 THEN 0
-        ELSE 30 - TIMESTAMPDIFF(MINUTE, last_delivery_at, NOW())
-    END AS cooldown_minutes_remaining
+    available_at
 FROM DeliveryPerson
-WHERE last_delivery_at IS NULL 
-   OR TIMESTAMPDIFF(MINUTE, last_delivery_at, NOW()) >= 30;
+WHERE available_at <= NOW();
 
 
 -- Undelivered Orders View
@@ -104,48 +98,40 @@ ORDER BY o.order_time;
 CREATE VIEW IF NOT EXISTS TopPizzasLastMonth AS
 SELECT 
     p.name AS pizza_name,
-    SUM(op.quantity) AS total_sold,
-    ROUND(SUM(op.quantity * op.unit_price), 2) AS total_revenue
-FROM OrderPizza op
-JOIN Pizza p ON op.pizza_id = p.pizza_id
-JOIN Orders o ON op.order_id = o.order_id
-WHERE o.order_time >= DATE_SUB(CURDATE(), INTERVAL 1 MONTH)
-  AND o.cancelled_at IS NULL
+    SUM(r.total_sold) AS total_sold,
+    ROUND(SUM(r.total_revenue), 2) AS total_revenue
+FROM DailyPizzaRollup r
+JOIN Pizza p ON r.pizza_id = p.pizza_id
+WHERE r.day >= DATE_SUB(CURDATE(), INTERVAL 1 MONTH)
 GROUP BY p.pizza_id, p.name
+HAVING SUM(r.total_sold) > 0
 ORDER BY total_sold DESC
 LIMIT 3;
 
 -- Earnings by Postcode (last month)
 CREATE VIEW IF NOT EXISTS EarningsByPostcode AS
 SELECT 
-    o.postcode_snapshot AS postcode,
-    COUNT(DISTINCT o.order_id) AS total_orders,
-    SUM(o.total_amount) AS total_earnings,
-    ROUND(AVG(o.total_amount), 2) AS average_order_value
-FROM Orders o
-WHERE o.order_time >= DATE_SUB(CURDATE(), INTERVAL 1 MONTH)
-  AND o.cancelled_at IS NULL
-GROUP BY o.postcode_snapshot
+    r.postcode,
+    SUM(r.total_orders) AS total_orders,
+    SUM(r.total_earnings) AS total_earnings,
+    ROUND(SUM(r.total_earnings) / SUM(r.total_orders), 2) AS average_order_value
+FROM DailyEarningsRollup r
+WHERE r.day >= DATE_SUB(CURDATE(), INTERVAL 1 MONTH)
+GROUP BY r.postcode
+HAVING SUM(r.total_orders) > 0
 ORDER BY total_earnings DESC;
 
--- Earnings by Age Group (last month)
+-- Earnings by Age Group (last month, age at the time of the order)
 CREATE VIEW IF NOT EXISTS EarningsByAgeGroup AS
 SELECT 
-    CASE 
-        WHEN TIMESTAMPDIFF(YEAR, c.birth_date, CURDATE()) < 25 THEN '18-24'
-        WHEN TIMESTAMPDIFF(YEAR, c.birth_date, CURDATE()) < 35 THEN '25-34'
-        WHEN TIMESTAMPDIFF(YEAR, c.birth_date, CURDATE()) < 45 THEN '35-44'
-        WHEN TIMESTAMPDIFF(YEAR, c.birth_date, CURDATE()) < 55 THEN '45-54'
-        ELSE '55+'
-    END AS age_group,
-    COUNT(DISTINCT o.order_id) AS total_orders,
-    SUM(o.total_amount) AS total_earnings,
-    ROUND(AVG(o.total_amount), 2) AS average_order_value
-FROM Orders o
-JOIN Customer c ON o.customer_id = c.customer_id
-WHERE o.order_time >= DATE_SUB(CURDATE(), INTERVAL 1 MONTH)
-  AND o.cancelled_at IS NULL
-GROUP BY age_group
+    r.age_group,
+    SUM(r.total_orders) AS total_orders,
+    SUM(r.total_earnings) AS total_earnings,
+    ROUND(SUM(r.total_earnings) / SUM(r.total_orders), 2) AS average_order_value
+FROM DailyEarningsRollup r
+WHERE r.day >= DATE_SUB(CURDATE(), INTERVAL 1 MONTH)
+GROUP BY r.age_group
+HAVING SUM(r.total_orders) > 0
 ORDER BY total_earnings DESC;
 
 
@@ -171,4 +157,44 @@ SELECT
     o.cancelled_at
 FROM Orders o
 JOIN Customer c ON o.customer_id = c.customer_id
-LEFT JOIN DeliveryPerson dp ON o.delivery_person_id = dp.delivery_person_id;
\ No newline at end of file
+LEFT JOIN DeliveryPerson dp ON o.delivery_person_id = dp.delivery_person_id;
+
+
+-- Catalog version bumps: anything that can change a PizzaMenu row or the
+-- products page invalidates the cached menu held by the app (services/menu_cache.py)
+-- and the ETags of the catalog pages (services/http_cache.py)
+CREATE TRIGGER IF NOT EXISTS trg_catalog_pizza_insert AFTER INSERT ON Pizza
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_pizza_update AFTER UPDATE ON Pizza
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_pizza_delete AFTER DELETE ON Pizza
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_pizzaingredient_insert AFTER INSERT ON PizzaIngredient
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_pizzaingredient_update AFTER UPDATE ON PizzaIngredient
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_pizzaingredient_delete AFTER DELETE ON PizzaIngredient
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_ingredient_insert AFTER INSERT ON Ingredient
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_ingredient_update AFTER UPDATE ON Ingredient
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_ingredient_delete AFTER DELETE ON Ingredient
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_product_insert AFTER INSERT ON Product
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_product_update AFTER UPDATE ON Product
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_catalog_product_delete AFTER DELETE ON Product
+FOR EACH ROW UPDATE CatalogVersion SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
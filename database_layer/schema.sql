@@ -8,6 +8,7 @@ CREATE TABLE Customer (
     birth_date DATE NOT NULL,
     postcode VARCHAR(20) NOT NULL,
     gender ENUM('M', 'F', 'Other') NOT NULL,
+    birth_month_day CHAR(5) AS (DATE_FORMAT(birth_date, '%m-%d')) STORED,
     
     -- Constraints
     CONSTRAINT chk_birth_date CHECK (birth_date <= CURDATE()),
@@ -58,6 +59,10 @@ CREATE TABLE DeliveryPerson (
     phone VARCHAR(30) NOT NULL UNIQUE,
     postcode VARCHAR(20) NOT NULL,
     last_delivery_at DATETIME,
+    -- end of the 30 minute cooldown (last_delivery_at + 30 min), kept up to date by services/dispatch.py
+    available_at DATETIME NOT NULL DEFAULT '1970-01-01 00:00:00',
+    -- bumped by every claim/delivery, couriers are claimed with UPDATE ... WHERE version = (the one read)
+    version INT NOT NULL DEFAULT 0,
     
     -- Constraints
     CONSTRAINT chk_dp_postcode CHECK (postcode REGEXP '^[0-9]{5}$')
@@ -177,16 +182,101 @@ CREATE TABLE OrderProduct (
     CONSTRAINT chk_orderproduct_quantity CHECK (quantity > 0)
 );
 
+--per-customer pizza counter behind loyalty lookups, kept in step with OrderPizza
+--by the order code (services/loyalty.py) so checkout reads one row instead of the history
+CREATE TABLE CustomerLoyaltyCounter (
+    customer_id INT PRIMARY KEY,
+    total_pizzas_bought INT NOT NULL DEFAULT 0,
+
+    FOREIGN KEY (customer_id) REFERENCES Customer(customer_id)
+        ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+--daily rollups behind the /reports earnings, postcode, age-group and top pizza
+--reports. Maintained by the order code (services/rollups.py) when orders are
+--placed or cancelled, so reports never rescan the full Orders history
+CREATE TABLE DailyEarningsRollup (
+    day DATE NOT NULL,
+    postcode VARCHAR(20) NOT NULL,
+    gender VARCHAR(10) NOT NULL,
+    age_group VARCHAR(10) NOT NULL,
+    total_orders INT NOT NULL DEFAULT 0,
+    total_earnings DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+
+    PRIMARY KEY (day, postcode, gender, age_group)
+);
+
+CREATE TABLE DailyCustomerRollup (
+    day DATE NOT NULL,
+    customer_id INT NOT NULL,
+    total_orders INT NOT NULL DEFAULT 0,
+    total_spent DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+
+    PRIMARY KEY (day, customer_id),
+
+    FOREIGN KEY (customer_id) REFERENCES Customer(customer_id)
+        ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE TABLE DailyPizzaRollup (
+    day DATE NOT NULL,
+    pizza_id INT NOT NULL,
+    total_sold INT NOT NULL DEFAULT 0,
+    total_revenue DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+
+    PRIMARY KEY (day, pizza_id),
+
+    FOREIGN KEY (pizza_id) REFERENCES Pizza(pizza_id)
+        ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+--catalog version: bumped by the triggers in business_queries.sql whenever
+--Pizza, PizzaIngredient or Ingredient change, so cached menus know when to rebuild
+CREATE TABLE CatalogVersion (
+    id INT PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO CatalogVersion (id, version) VALUES (1, 0);
+
+--server-side carts (services/cart.py), shared by every worker process: the session
+--cookie only carries cart_id. Carts not changed for CART_TTL seconds are deleted
+CREATE TABLE Cart (
+    cart_id VARCHAR(32) PRIMARY KEY,
+    touched_at DATETIME NOT NULL
+);
+
+CREATE TABLE CartItem (
+    cart_item_id INT AUTO_INCREMENT PRIMARY KEY,
+    cart_id VARCHAR(32) NOT NULL,
+    kind VARCHAR(10) NOT NULL,
+    item_id INT NOT NULL,
+    quantity INT NOT NULL DEFAULT 1,
+
+    UNIQUE (cart_id, kind, item_id),
+
+    FOREIGN KEY (cart_id) REFERENCES Cart(cart_id)
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    CONSTRAINT chk_cartitem_kind CHECK (kind IN ('pizza', 'product')),
+    CONSTRAINT chk_cartitem_quantity CHECK (quantity > 0)
+);
+
 --indexes for performance optimization
 CREATE INDEX idx_customer_postcode ON Customer(postcode);
 CREATE INDEX idx_customer_birth_date ON Customer(birth_date);
+CREATE INDEX idx_customer_birth_month_day ON Customer(birth_month_day);
 CREATE INDEX idx_orders_customer ON Orders(customer_id);
 CREATE INDEX idx_orders_status ON Orders(status);
 CREATE INDEX idx_orders_time ON Orders(order_time);
 CREATE INDEX idx_orders_delivery_person ON Orders(delivery_person_id);
+--open orders (UndeliveredOrders): the NULL delivered_at/cancelled_at prefix, already in order_time order
+CREATE INDEX idx_orders_open ON Orders(delivered_at, cancelled_at, order_time);
 CREATE INDEX idx_ingredient_meat ON Ingredient(is_meat);
 CREATE INDEX idx_pizza_active ON Pizza(active);
 CREATE INDEX idx_product_category ON Product(category);
 CREATE INDEX idx_product_active ON Product(active);
-CREATE INDEX idx_dp_postcode ON DeliveryPerson(postcode);
-CREATE INDEX idx_dp_last_delivery ON DeliveryPerson(last_delivery_at);
\ No newline at end of file
+--expired carts, deleted oldest first
+CREATE INDEX idx_cart_touched ON Cart(touched_at);
+--couriers free now in a postcode (AvailableDeliveryPersonnel): one range probe on available_at
+CREATE INDEX idx_dp_postcode_available ON DeliveryPerson(postcode, available_at);
\ No newline at end of file
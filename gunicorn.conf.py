@@ -0,0 +1,65 @@
+"""
+gunicorn settings for the production server:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Pre-fork: the master only manages workers, each worker imports wsgi.py on
+its own (preload_app stays off, so no SQLite connection or background
+thread is inherited across fork) and serves requests from a thread pool
+(gthread). Before a worker accepts traffic, post_worker_init runs the
+warm-up (services/warmup.py): pooled connections opened, menu and grids
+cached, templates compiled.
+
+One worker by default. Some state lives in the worker process: the
+/metrics counters, the menu and fragment caches and the dispatcher's
+courier heaps. Carts and courier claims are in the database, and the
+caches and heaps are checked against the database (CatalogVersion, the
+courier version) before they are used, so extra workers stay correct.
+The counters are not shared though: with PIZZA_WORKERS > 1 each scrape
+of /metrics only sees the worker that answered it. SQLite takes one
+writer at a time anyway, so threads cover most of the load; raise
+PIZZA_WORKERS for CPU-bound rendering and scrape or sum every worker.
+
+Graceful reload: ``kill -HUP $(cat instance/gunicorn.pid)`` starts a fresh
+set of workers with the current code and settings, and each one warms up
+before it accepts connections. The old workers stop accepting and finish
+their in-flight requests (up to graceful_timeout) before they exit; the
+master keeps the listening socket, so connections arriving in between
+wait in its backlog instead of being refused.
+``kill -TERM`` is a graceful shutdown.
+
+Environment overrides:
+    PIZZA_BIND             address to listen on (default 127.0.0.1:8000)
+    PIZZA_WORKERS          worker processes (default 1, see above)
+    PIZZA_THREADS          request threads per worker (default 8)
+    PIZZA_MAX_REQUESTS     recycle a worker after this many requests (default 0: never)
+    PIZZA_WARM_UP=0        skip the per-worker warm-up
+"""
+import os
+
+bind = os.environ.get('PIZZA_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('PIZZA_WORKERS', 1))
+threads = int(os.environ.get('PIZZA_THREADS', 8))   # within SQLITE_POOL_SIZE + SQLITE_MAX_OVERFLOW
+worker_class = 'gthread'
+preload_app = False
+
+timeout = 30            # a worker silent for this long is killed and replaced
+graceful_timeout = 30   # seconds old workers get to finish requests on reload/shutdown
+keepalive = 5
+max_requests = int(os.environ.get('PIZZA_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+pidfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'gunicorn.pid')
+accesslog = '-'
+errorlog = '-'
+
+
+def post_worker_init(worker):
+    """Runs in the worker after the app is loaded and before it accepts connections"""
+    if os.environ.get('PIZZA_WARM_UP', '1') == '0':
+        return
+    from services.warmup import warm_up
+
+    seconds, connections = warm_up(worker.wsgi)
+    worker.log.info("worker %s warmed up in %.0f ms (%d pooled connections)",
+                    worker.pid, seconds * 1000, connections)
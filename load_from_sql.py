@@ -2,9 +2,15 @@
 Load data from MySQL SQL files by translating to SQLite syntax
 Created by LLM to translate mysql schema and data inserts to sqlite
 """
+import argparse
+import contextlib
+import hashlib
+import io
 import os
 import re
 import sqlite3
+import time
+from datetime import date
 
 def mysql_to_sqlite_schema(mysql_sql):
     """Convert MySQL schema to SQLite syntax"""
@@ -63,6 +69,14 @@ def mysql_to_sqlite_schema(mysql_sql):
     # Remove empty constraint sections (just "-- Constraints" followed by closing paren)
     sqlite_sql = re.sub(r',?\s*--\s*Constraints\s*\)', ')', sqlite_sql, flags=re.IGNORECASE)
     
+    # Replace DATE_FORMAT with strftime (generated columns)
+    # DATE_FORMAT(birth_date, '%m-%d') -> strftime('%m-%d', birth_date)
+    sqlite_sql = re.sub(
+        r"DATE_FORMAT\((\w+),\s*'([^']+)'\)",
+        r"strftime('\2', \1)",
+        sqlite_sql
+    )
+    
     # Add IF NOT EXISTS to CREATE TABLE
     sqlite_sql = re.sub(r'CREATE TABLE\s+', 'CREATE TABLE IF NOT EXISTS ', sqlite_sql, flags=re.IGNORECASE)
     
@@ -97,9 +111,20 @@ def mysql_to_sqlite_views(mysql_sql):
         sqlite_sql
     )
     
+    # DATE_FORMAT(CURDATE(), '%m-%d') -> strftime('%m-%d', 'now')
+    sqlite_sql = re.sub(
+        r"DATE_FORMAT\(CURDATE\(\),\s*'([^']+)'\)",
+        r"strftime('\1', 'now')",
+        sqlite_sql,
+        flags=re.IGNORECASE
+    )
+    
     # Replace CURDATE() with DATE('now')
     sqlite_sql = re.sub(r'CURDATE\(\)', "DATE('now')", sqlite_sql, flags=re.IGNORECASE)
     
+    # Replace NOW() with the local time, which is what the app stores (datetime.now())
+    sqlite_sql = re.sub(r'\bNOW\(\)', "DATETIME('now', 'localtime')", sqlite_sql, flags=re.IGNORECASE)
+    
     # Replace DATE_SUB(CURDATE(), INTERVAL 1 MONTH) with DATE('now', '-1 month')
     sqlite_sql = re.sub(
         r"DATE_SUB\(CURDATE\(\),\s*INTERVAL\s+(\d+)\s+MONTH\)",
@@ -129,6 +154,16 @@ def mysql_to_sqlite_views(mysql_sql):
         flags=re.IGNORECASE
     )
     
+    # Replace TIMESTAMPDIFF(YEAR, a, b) between two columns with a whole-years difference
+    # (one year less when b's month-day falls before a's)
+    sqlite_sql = re.sub(
+        r"TIMESTAMPDIFF\(YEAR,\s*(\w+\.?\w*),\s*(\w+\.?\w*)\)",
+        r"(CAST(strftime('%Y', \2) AS INTEGER) - CAST(strftime('%Y', \1) AS INTEGER)"
+        r" - (strftime('%m-%d', \2) < strftime('%m-%d', \1)))",
+        sqlite_sql,
+        flags=re.IGNORECASE
+    )
+    
     # Replace CONCAT with ||
     # CONCAT(c.first_name, ' ', c.last_name) -> c.first_name || ' ' || c.last_name
     def replace_concat(match):
@@ -143,7 +178,16 @@ def mysql_to_sqlite_views(mysql_sql):
         sqlite_sql,
         flags=re.IGNORECASE
     )
-    
+
+    # Wrap single-statement trigger bodies in BEGIN ... END (required by SQLite)
+    # FOR EACH ROW UPDATE ...; -> FOR EACH ROW BEGIN UPDATE ...; END;
+    sqlite_sql = re.sub(
+        r"(CREATE\s+TRIGGER\b.*?FOR\s+EACH\s+ROW)\s+(?!BEGIN\b)(.*?);",
+        r"\1 BEGIN \2; END;",
+        sqlite_sql,
+        flags=re.IGNORECASE | re.DOTALL
+    )
+
     return sqlite_sql
 
 def clean_sql(sql_content):
@@ -157,15 +201,68 @@ def clean_sql(sql_content):
             lines.append(line)
     return ' '.join(lines)
 
-def load_from_sql_files():
-    """Load database from SQL files with MySQL to SQLite translation"""
+# Counters and rollups derived from the loaded orders. business_queries.sql
+# only defines views and triggers; once loaded, the app keeps these tables
+# current itself (services/loyalty.py, services/rollups.py), and
+# `flask --app main loyalty-counters --rebuild` / `rollups-backfill` redo
+# them after an import into an existing database.
+DERIVED_TABLES_SQL = """
+INSERT INTO CustomerLoyaltyCounter (customer_id, total_pizzas_bought)
+SELECT customer_id, total_pizzas_bought FROM CustomerLoyalty;
+
+INSERT INTO DailyEarningsRollup (day, postcode, gender, age_group, total_orders, total_earnings)
+SELECT day, postcode, gender, age_group, COUNT(*), SUM(total_amount)
+FROM (
+    SELECT
+        DATE(o.order_time) AS day,
+        o.postcode_snapshot AS postcode,
+        c.gender,
+        CASE
+            WHEN TIMESTAMPDIFF(YEAR, c.birth_date, o.order_time) < 25 THEN '18-24'
+            WHEN TIMESTAMPDIFF(YEAR, c.birth_date, o.order_time) < 35 THEN '25-34'
+            WHEN TIMESTAMPDIFF(YEAR, c.birth_date, o.order_time) < 45 THEN '35-44'
+            WHEN TIMESTAMPDIFF(YEAR, c.birth_date, o.order_time) < 55 THEN '45-54'
+            ELSE '55+'
+        END AS age_group,
+        o.total_amount
+    FROM Orders o
+    JOIN Customer c ON o.customer_id = c.customer_id
+    WHERE o.cancelled_at IS NULL
+) AS placed
+GROUP BY day, postcode, gender, age_group;
+
+INSERT INTO DailyCustomerRollup (day, customer_id, total_orders, total_spent)
+SELECT DATE(o.order_time), o.customer_id, COUNT(*), SUM(o.total_amount)
+FROM Orders o
+WHERE o.cancelled_at IS NULL
+GROUP BY DATE(o.order_time), o.customer_id;
+
+INSERT INTO DailyPizzaRollup (day, pizza_id, total_sold, total_revenue)
+SELECT DATE(o.order_time), op.pizza_id, SUM(op.quantity), SUM(op.quantity * op.unit_price)
+FROM OrderPizza op
+JOIN Orders o ON op.order_id = o.order_id
+WHERE o.cancelled_at IS NULL
+GROUP BY DATE(o.order_time), op.pizza_id;
+"""
+
+
+def seed_derived_tables(cursor):
+    """Fill CustomerLoyaltyCounter and the daily rollups from the loaded orders (needs the views)"""
+    cursor.executescript(mysql_to_sqlite_views(DERIVED_TABLES_SQL))
+
+
+def load_from_sql_files(db_path=None):
+    """Load database from SQL files with MySQL to SQLite translation
+
+    Returns the database path, or None when a step failed.
+    """
     
     print("=" * 70)
     print("LOADING DATABASE FROM SQL FILES")
     print("=" * 70)
     
     # Get database path
-    db_path = os.path.join('instance', 'database.db')
+    db_path = db_path or os.path.join('instance', 'database.db')
     
     # Remove old database
     if os.path.exists(db_path):
@@ -358,10 +455,27 @@ def load_from_sql_files():
             print("\nCreated views:")
             for row in cursor.fetchall():
                 print(f"  ✓ {row[0]}")
-                
+
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger'")
+            print(f"\n✓ Created {cursor.fetchone()[0]} triggers")
+
         except sqlite3.Error as e:
             print(f"⚠️  Error creating views: {e}")
             conn.rollback()
+
+    print("\n" + "=" * 70)
+    print("STEP 5: Seeding Counters and Rollups")
+    print("=" * 70)
+
+    try:
+        seed_derived_tables(cursor)
+        conn.commit()
+        for table in ('CustomerLoyaltyCounter', 'DailyEarningsRollup', 'DailyCustomerRollup', 'DailyPizzaRollup'):
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            print(f"  ✓ {table}: {cursor.fetchone()[0]} rows")
+    except sqlite3.Error as e:
+        print(f"⚠️  Error seeding counters and rollups: {e}")
+        conn.rollback()
     
     conn.close()
     
@@ -371,6 +485,519 @@ def load_from_sql_files():
     print(f"Total records loaded: {total_records}")
     print(f"Database location: {db_path}")
     print("=" * 70)
+    return db_path
+
+# ---------------------------------------------------------------------------
+# Template database: built once per version of the SQL files and per day, then cloned
+# ---------------------------------------------------------------------------
+TEMPLATE_SOURCES = [
+    'database_layer/schema.sql',
+    'database_layer/sample_data.sql',
+    'database_layer/business_queries.sql',
+]
+TEMPLATE_DIR = os.path.join('instance', 'template_cache')
+
+
+def template_key():
+    """Today's date and a content hash of the SQL files (and of this loader, which translates them)
+
+    The sample data dates its orders relative to the day it is loaded
+    (DATE('now', '-N days')), so the key starts with today's date: the
+    template is rebuilt when the files change and at most once a day, not
+    on every load.
+    """
+    digest = hashlib.sha256()
+    for path in TEMPLATE_SOURCES + [os.path.abspath(__file__)]:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+        digest.update(b'\0')
+    return f"{date.today().isoformat()}-{digest.hexdigest()[:16]}"
+
+
+def template_database(rebuild=False):
+    """Path of today's golden database for the current SQL files, built by load_from_sql_files() if missing
+
+    The build goes to a temporary file that is renamed into place, so
+    processes building at the same time never see a half-built template.
+    Templates for older versions of the files or earlier days are deleted.
+    """
+    path = os.path.join(TEMPLATE_DIR, f"golden-{template_key()}.db")
+    if os.path.exists(path) and not rebuild:
+        return path
+
+    os.makedirs(TEMPLATE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        built = load_from_sql_files(tmp_path)
+    if built is None or '⚠️' in output.getvalue():
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise RuntimeError(f"building the template database failed:\n{output.getvalue()}")
+    os.replace(tmp_path, path)
+
+    for name in os.listdir(TEMPLATE_DIR):
+        stale = os.path.join(TEMPLATE_DIR, name)
+        if name.startswith('golden-') and name.endswith('.db') and stale != path:
+            os.remove(stale)
+    return path
+
+
+def clone_template(target=None, rebuild=False):
+    """Copy the golden database into ``target`` with SQLite's backup API
+
+    ``target`` is a database path (default: instance/database.db, replaced
+    in place even while the app has it open or in WAL mode) or an open
+    sqlite3 connection, e.g. a per-test copy:
+
+        conn = clone_template(sqlite3.connect(':memory:'))
+    """
+    source = sqlite3.connect(f"file:{template_database(rebuild)}?mode=ro", uri=True)
+    try:
+        if isinstance(target, sqlite3.Connection):
+            source.backup(target)
+            return target
+        target = target or os.path.join('instance', 'database.db')
+        destination = sqlite3.connect(target)
+        try:
+            source.backup(destination)
+        finally:
+            destination.close()
+        return target
+    finally:
+        source.close()
+
+# ---------------------------------------------------------------------------
+# Streaming loader for production-sized exports
+# ---------------------------------------------------------------------------
+
+_STRING_LITERAL = r"'(?:[^'\\]|\\.|'')*'"
+
+# Line comments outside string literals (a string may run past the end of the line)
+_LINE_COMMENT = re.compile(r"('(?:[^'\\]|\\.|'')*(?:'|$))|--[^\n]*", re.DOTALL)
+_ESCAPE = re.compile(r"\\.", re.DOTALL)
+
+_INSERT_HEADER = re.compile(
+    r"INSERT\s+(?:IGNORE\s+)?INTO\s+[`\"]?(\w+)[`\"]?\s*(?:\(([^)]*)\))?\s*VALUES\s*",
+    re.IGNORECASE
+)
+
+# One literal per match: string, float, integer, NULL/TRUE/FALSE, punctuation, or anything else
+_VALUE_TOKEN = re.compile(
+    r"\s*(?:(" + _STRING_LITERAL + r")"
+    r"|(-?\d+\.\d*(?:[eE][-+]?\d+)?|-?\d+[eE][-+]?\d+)"
+    r"|(-?\d+)"
+    r"|(NULL|TRUE|FALSE)\b"
+    r"|([(),])"
+    r"|(\S))",
+    re.IGNORECASE | re.DOTALL
+)
+
+_MYSQL_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+# Statements found in mysqldump output that have no SQLite equivalent
+_SKIPPED_PREFIXES = ('SET ', 'LOCK ', 'UNLOCK ', '/*', 'USE ', 'START TRANSACTION', 'COMMIT')
+
+# SQLite understands TRUE/FALSE itself from 3.23 on, older versions need the rewrite
+_NATIVE_BOOLEANS = sqlite3.sqlite_version_info >= (3, 23, 0)
+
+LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -262144",  # 256 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = OFF",
+]
+
+
+def _odd_quotes(text):
+    """True when text contains an odd number of unescaped single quotes"""
+    if '\\' in text:
+        text = _ESCAPE.sub('', text)
+    return text.count("'") & 1
+
+
+def iter_sql_statements(lines):
+    """Yield statements from an iterable of SQL lines (e.g. an open file)
+
+    Only one statement is held in memory at a time. Semicolons inside string
+    literals are respected and -- comments outside them are dropped.
+    """
+    pieces = []
+    in_string = False
+    for line in lines:
+        if not in_string and '--' in line:
+            line = _LINE_COMMENT.sub(lambda m: m.group(1) or '', line)
+        if ';' not in line:
+            pieces.append(line)
+            in_string ^= _odd_quotes(line)
+            continue
+        *segments, rest = line.split(';')
+        for segment in segments:
+            pieces.append(segment)
+            in_string ^= _odd_quotes(segment)
+            if in_string:
+                pieces.append(';')
+                continue
+            statement = ''.join(pieces).strip()
+            pieces = []
+            if statement:
+                yield statement
+        pieces.append(rest)
+        in_string ^= _odd_quotes(rest)
+
+    if in_string:
+        raise ValueError("Unterminated string literal in SQL input")
+    statement = ''.join(pieces).strip()
+    if statement:
+        yield statement
+
+
+def _unquote(literal):
+    """Decode a MySQL string literal including its quotes"""
+    value = literal[1:-1]
+    if '\\' in value:
+        value = re.sub(r"\\(.)", lambda m: _MYSQL_ESCAPES.get(m.group(1), m.group(1)), value,
+                       flags=re.DOTALL)
+    return value.replace("''", "'")
+
+
+def parse_insert(statement):
+    """Parse a literal-only INSERT into (table, columns, rows)
+
+    Returns None when the statement is not an INSERT or when a value is an
+    expression (e.g. DATE('now', '-3 days')) that has to be executed as SQL.
+    """
+    header = _INSERT_HEADER.match(statement)
+    if header is None:
+        return None
+    table = header.group(1)
+    columns = None
+    if header.group(2):
+        columns = tuple(c.strip().strip('`"') for c in header.group(2).split(','))
+
+    rows = []
+    row = None
+    for string, real, integer, keyword, punct, other in _VALUE_TOKEN.findall(statement, header.end()):
+        if other:
+            return None
+        if punct:
+            if punct == '(':
+                if row is not None:
+                    return None
+                row = []
+            elif punct == ')':
+                if row is None:
+                    return None
+                rows.append(tuple(row))
+                row = None
+            continue
+        if row is None:
+            return None
+        if integer:
+            row.append(int(integer))
+        elif string:
+            row.append(_unquote(string))
+        elif real:
+            row.append(float(real))
+        else:
+            keyword = keyword.upper()
+            row.append(None if keyword == 'NULL' else int(keyword == 'TRUE'))
+    if row is not None or not rows:
+        return None
+    return table, columns, rows
+
+
+class _TableStats:
+    """Rows loaded and seconds spent per table"""
+
+    def __init__(self):
+        self.rows = {}
+        self.seconds = {}
+
+    def add(self, table, rows, seconds):
+        self.rows[table] = self.rows.get(table, 0) + rows
+        self.seconds[table] = self.seconds.get(table, 0.0) + seconds
+
+
+class _BulkWriter:
+    """Run data statements in large transactions, batching decoded rows
+
+    INSERTs are handed to SQLite as they are, since its parser reads multi-row
+    VALUES lists far faster than rows can be decoded in Python. Rows that need
+    decoding first (MySQL backslash escapes) are collected per table and sent
+    with executemany.
+    """
+
+    def __init__(self, conn, batch_size=50000, commit_every=1000000):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.stats = _TableStats()
+        self.batched = 0
+        self.direct = 0
+        self.current_table = None
+        self._key = None
+        self._rows = []
+        self._seconds = 0.0
+        self._uncommitted = 0
+
+    def __enter__(self):
+        self.cursor.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+            self.cursor.execute("COMMIT")
+        else:
+            self.conn.rollback()
+
+    def write(self, statement):
+        t0 = time.perf_counter()
+        if statement[:20].upper().startswith(_SKIPPED_PREFIXES):
+            return
+        header = _INSERT_HEADER.match(statement)
+        self.current_table = header.group(1) if header else None
+
+        if header and '\\' in statement:
+            parsed = parse_insert(statement)
+            if parsed is not None:
+                self._batch(parsed, t0)
+                return
+
+        # Keep file order: rows batched so far go in before this statement
+        self.flush()
+        if not _NATIVE_BOOLEANS:
+            statement = mysql_to_sqlite_data(statement)
+        before = self.conn.total_changes
+        try:
+            self.cursor.execute(statement)
+        except sqlite3.Error as e:
+            if header:
+                raise
+            print(f"⚠️  Warning: {e}")
+            print(f"Statement: {statement[:100]}...")
+            return
+        self.direct += 1
+        if header:
+            self._count(header.group(1), self.conn.total_changes - before, time.perf_counter() - t0)
+
+    def _batch(self, parsed, t0):
+        table, columns, rows = parsed
+        key = (table, columns, len(rows[0]))
+        if key != self._key:
+            self.flush()
+            self._key = key
+        self._rows.extend(rows)
+        self._seconds += time.perf_counter() - t0
+        self.batched += 1
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        t0 = time.perf_counter()
+        table, columns, width = self._key
+        column_sql = f" ({', '.join(columns)})" if columns else ''
+        placeholders = ', '.join('?' * width)
+        self.cursor.executemany(f"INSERT INTO {table}{column_sql} VALUES ({placeholders})", self._rows)
+        self._count(table, len(self._rows), self._seconds + time.perf_counter() - t0)
+        self._rows = []
+        self._seconds = 0.0
+
+    def _count(self, table, rows, seconds):
+        self.stats.add(table, rows, seconds)
+        self._uncommitted += rows
+        if self._uncommitted >= self.commit_every:
+            self.cursor.execute("COMMIT")
+            self.cursor.execute("BEGIN")
+            self._uncommitted = 0
+
+
+def load_streaming(db_path=None, data_paths=None, batch_size=50000):
+    """Load the schema plus one or more (large) data files statement by statement
+
+    Data files are read line by line so they are never held in memory, rows
+    go in inside large transactions with load-time PRAGMAs applied, and
+    secondary indexes are built once the data is in.
+    """
+    db_path = db_path or os.path.join('instance', 'database.db')
+    data_paths = data_paths or ['database_layer/sample_data.sql']
+    schema_path = 'database_layer/schema.sql'
+    queries_path = 'database_layer/business_queries.sql'
+
+    print("=" * 70)
+    print("STREAMING DATABASE LOAD")
+    print("=" * 70)
+
+    for path in [schema_path] + list(data_paths):
+        if not os.path.exists(path):
+            print(f"❌ File not found: {path}")
+            return
+
+    if os.path.exists(db_path):
+        try:
+            os.remove(db_path)
+            print(f"✓ Removed old database: {db_path}")
+        except PermissionError:
+            print("⚠️  Could not remove database (may be in use)")
+            return
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    for pragma in LOAD_PRAGMAS:
+        cursor.execute(pragma)
+    print("✓ Applied load-time PRAGMAs (journal off, synchronous off, 256 MB cache)")
+
+    print("\n" + "=" * 70)
+    print("STEP 1: Creating Tables")
+    print("=" * 70)
+
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        sqlite_schema = mysql_to_sqlite_schema(f.read())
+
+    deferred_indexes = []
+    tables_created = 0
+    cursor.execute("BEGIN")
+    for statement in iter_sql_statements(io.StringIO(sqlite_schema)):
+        if re.match(r'CREATE\s+(UNIQUE\s+)?INDEX', statement, re.IGNORECASE):
+            deferred_indexes.append(statement)
+            continue
+        try:
+            cursor.execute(statement)
+            if re.match(r'CREATE TABLE', statement, re.IGNORECASE):
+                tables_created += 1
+        except sqlite3.Error as e:
+            print(f"⚠️  Warning: {e}")
+            print(f"Statement: {statement[:100]}...")
+    cursor.execute("COMMIT")
+    print(f"✓ Created {tables_created} tables ({len(deferred_indexes)} indexes deferred)")
+
+    print("\n" + "=" * 70)
+    print("STEP 2: Streaming Data")
+    print("=" * 70)
+
+    writer = _BulkWriter(conn, batch_size=batch_size)
+    try:
+        with writer:
+            for data_path in data_paths:
+                print(f"✓ Reading {data_path}")
+                with open(data_path, 'r', encoding='utf-8') as f:
+                    for statement in iter_sql_statements(f):
+                        writer.write(statement)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"⚠️  Error loading {writer.current_table or 'data'}: {e}")
+        conn.close()
+        return
+
+    stats = writer.stats
+    total_records = sum(stats.rows.values())
+    for table in sorted(stats.rows, key=lambda t: -stats.rows[t]):
+        rows, seconds = stats.rows[table], stats.seconds[table]
+        rate = rows / seconds if seconds > 0 else float('inf')
+        print(f"  ✓ {table}: {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+    print(f"✓ {writer.direct} statements executed, {writer.batched} decoded into executemany batches")
+
+    print("\n" + "=" * 70)
+    print("STEP 3: Building Indexes")
+    print("=" * 70)
+
+    t0 = time.perf_counter()
+    cursor.execute("BEGIN")
+    for statement in deferred_indexes:
+        try:
+            cursor.execute(statement)
+        except sqlite3.Error as e:
+            print(f"⚠️  Warning: {e}")
+            print(f"Statement: {statement[:100]}...")
+    cursor.execute("COMMIT")
+    print(f"✓ Built {len(deferred_indexes)} indexes in {time.perf_counter() - t0:.2f}s")
+
+    violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+    if violations:
+        print(f"⚠️  {len(violations)} rows violate foreign keys (first: {violations[0]})")
+    else:
+        print("✓ Foreign key check passed")
+
+    print("\n" + "=" * 70)
+    print("STEP 4: Creating Business Views")
+    print("=" * 70)
+
+    if not os.path.exists(queries_path):
+        print(f"⚠️  Business queries file not found: {queries_path}")
+        print("Skipping view creation...")
+    else:
+        with open(queries_path, 'r', encoding='utf-8') as f:
+            sqlite_views = mysql_to_sqlite_views(f.read())
+        t0 = time.perf_counter()
+        try:
+            cursor.executescript(sqlite_views)
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='view'")
+            views_created = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger'")
+            triggers_created = cursor.fetchone()[0]
+            print(f"✓ Created {views_created} views and {triggers_created} triggers "
+                  f"in {time.perf_counter() - t0:.2f}s")
+        except sqlite3.Error as e:
+            print(f"⚠️  Error creating views: {e}")
+
+    print("\n" + "=" * 70)
+    print("STEP 5: Seeding Counters and Rollups")
+    print("=" * 70)
+
+    t0 = time.perf_counter()
+    try:
+        seed_derived_tables(cursor)
+        print(f"✓ Seeded loyalty counters and daily rollups in {time.perf_counter() - t0:.2f}s")
+    except sqlite3.Error as e:
+        print(f"⚠️  Error seeding counters and rollups: {e}")
+
+    cursor.execute("PRAGMA analysis_limit = 1000")
+    cursor.execute("ANALYZE")
+    conn.close()
+
+    elapsed = time.perf_counter() - started
+    print("\n" + "=" * 70)
+    print("✅ DATABASE LOADED SUCCESSFULLY!")
+    print("=" * 70)
+    print(f"Total records loaded: {total_records} in {elapsed:.1f}s "
+          f"({total_records / elapsed:,.0f} rows/s overall)")
+    print(f"Database location: {db_path}")
+    print("=" * 70)
+
 
 if __name__ == '__main__':
-    load_from_sql_files()
+    parser = argparse.ArgumentParser(description="Load the pizza database from the SQL files")
+    parser.add_argument('--streaming', action='store_true',
+                        help="stream statements in large transactions (for big exports)")
+    parser.add_argument('--data', nargs='+', metavar='FILE',
+                        help="with --streaming: data files to stream (default: database_layer/sample_data.sql)")
+    parser.add_argument('--db', metavar='PATH', help="database file (default: instance/database.db)")
+    parser.add_argument('--batch-size', type=int, default=50000,
+                        help="rows per executemany batch in streaming mode")
+    parser.add_argument('--full', action='store_true',
+                        help="translate and replay the SQL files instead of cloning the cached template")
+    parser.add_argument('--rebuild-template', action='store_true',
+                        help="rebuild today's cached template even if the SQL files did not change")
+    args = parser.parse_args()
+    if args.data and not args.streaming:
+        parser.error("--data is only read by the streaming loader; add --streaming")
+
+    if args.streaming:
+        load_streaming(args.db, args.data, args.batch_size)
+    elif args.full:
+        load_from_sql_files(args.db)
+    else:
+        t0 = time.perf_counter()
+        cached = os.path.exists(os.path.join(TEMPLATE_DIR, f"golden-{template_key()}.db"))
+        template = template_database(args.rebuild_template)
+        t1 = time.perf_counter()
+        target = clone_template(args.db)
+        t2 = time.perf_counter()
+        state = "cached" if cached and not args.rebuild_template else f"built in {t1 - t0:.2f}s"
+        print(f"✓ Template {template} ({state})")
+        print(f"✓ Cloned into {target} in {(t2 - t1) * 1000:.1f} ms")
@@ -0,0 +1,6 @@
+"""
+Application services shared by the routes in views/.
+
+Each module owns one piece of business logic (menu pricing, carts, orders,
+delivery assignment...) so the routes only deal with requests and templates.
+"""
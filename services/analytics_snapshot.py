@@ -0,0 +1,165 @@
+"""
+Read-only analytics snapshot for the reports.
+
+With ANALYTICS_SNAPSHOT on, a background thread per process copies the
+live database into ``<database>.analytics.db`` every
+ANALYTICS_SNAPSHOT_INTERVAL seconds with SQLite's online backup API, and
+the reports page and exports read from that copy ("reports" bind) instead
+of the file place_order writes to. Long report scans then never hold the
+live database, and report load cannot slow checkouts down.
+
+Publishing is atomic: the backup goes to a temporary file that is
+os.replace()d over the snapshot, so a reader sees either the old or the
+new copy, never a half-written one. The backup runs in one step inside a
+single read transaction: in WAL mode that does not block writers, and
+the copy is consistent as of its start (a stepped backup would restart
+every time an order is written meanwhile). A pooled "reports"
+connection remembers which file it opened and is replaced on checkout once
+the snapshot has been swapped, so the next query reads the new copy; a
+query already running finishes on the old one.
+
+Worker processes share the snapshot: a thread only publishes when the
+file on disk is older than the interval, so a pre-forked server takes
+roughly one snapshot per interval, not one per worker. Until the first
+snapshot exists the reports read the live database. Reports are as old as
+the snapshot; the page shows its age.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DisconnectionError
+from ORM import db
+from services import sqlite_profile
+
+REPORTS_BIND = 'reports'
+ANALYTICS_SNAPSHOT_INTERVAL = 300   # seconds between snapshots
+
+
+def snapshot_path(database_path):
+    """instance/database.db -> instance/database.analytics.db"""
+    stem, ext = os.path.splitext(database_path)
+    return f"{stem}.analytics{ext or '.db'}"
+
+
+def publish(source_path, target_path):
+    """Copy source_path to target_path with the backup API and swap it in atomically"""
+    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    target = sqlite3.connect(tmp_path)
+    try:
+        source.backup(target)
+        # A copy of a WAL database is WAL too; readers opened with mode=ro need rollback mode
+        target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+        source.close()
+    os.replace(tmp_path, target_path)
+
+
+class AnalyticsSnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+        self.source_path = None
+        self.path = None
+
+    def init_app(self, app):
+        """Add the "reports" bind; call before db.init_app"""
+        app.config.setdefault('ANALYTICS_SNAPSHOT', False)
+        app.config.setdefault('ANALYTICS_SNAPSHOT_INTERVAL', ANALYTICS_SNAPSHOT_INTERVAL)
+        url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if not sqlite_profile._is_sqlite_file(url):
+            app.config['ANALYTICS_SNAPSHOT'] = False
+        if not app.config['ANALYTICS_SNAPSHOT']:
+            return
+
+        self._app = app
+        self.source_path = url.database
+        self.path = app.config.get('ANALYTICS_SNAPSHOT_PATH') or snapshot_path(url.database)
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault(REPORTS_BIND, {'url': str(sqlite_profile._read_only_url(f"sqlite:///{self.path}"))})
+
+    def install(self, app):
+        """Hook the snapshot connections; call after db.init_app"""
+        if not app.config['ANALYTICS_SNAPSHOT']:
+            return
+        with app.app_context():
+            engine = db.engines[REPORTS_BIND]
+            event.listen(engine, 'do_connect', self._remember_file)
+            event.listen(engine, 'connect', self._query_only)
+            event.listen(engine, 'checkout', self._check_file)
+
+    def _file_id(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def _remember_file(self, dialect, connection_record, cargs, cparams):
+        # Before opening: if the file is swapped right after, the next checkout reconnects
+        connection_record.info['snapshot_file'] = self._file_id()
+
+    @staticmethod
+    def _query_only(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA query_only = ON")
+
+    def _check_file(self, dbapi_connection, connection_record, connection_proxy):
+        if connection_record.info.get('snapshot_file') != self._file_id():
+            raise DisconnectionError("analytics snapshot was replaced")  # the pool reconnects
+
+    def taken_at(self):
+        """When the current snapshot was published (None if there is none yet)"""
+        try:
+            return datetime.fromtimestamp(os.path.getmtime(self.path))
+        except (OSError, TypeError):
+            return None
+
+    def reads(self):
+        """bind_arguments for report queries: the snapshot when there is one
+
+            db.session.execute(text(...), bind_arguments=analytics_snapshot.reads())
+        """
+        if not current_app.config.get('ANALYTICS_SNAPSHOT'):
+            return sqlite_profile.reads()
+        self._start()
+        if self.taken_at() is None:
+            return sqlite_profile.reads()  # first snapshot still being taken
+        return {'bind': db.engines[REPORTS_BIND]}
+
+    def refresh(self):
+        """Take a snapshot now"""
+        publish(self.source_path, self.path)
+
+    def _start(self):
+        # Started on first use, so every worker process gets its own thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='analytics-snapshot', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        interval = self._app.config['ANALYTICS_SNAPSHOT_INTERVAL']
+        while True:
+            taken_at = self.taken_at()
+            age = (datetime.now() - taken_at).total_seconds() if taken_at else None
+            if age is None or age >= interval:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self._app.logger.warning("analytics snapshot failed: %s", e)
+                age = 0
+            time.sleep(max(1.0, interval - age))
+
+
+analytics_snapshot = AnalyticsSnapshot()
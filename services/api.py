@@ -0,0 +1,198 @@
+"""
+Read-only JSON API for the menu, products and a customer's orders.
+
+Every list endpoint returns ``{"data": [...], "next_cursor": "..."|null}``
+and takes:
+
+- ``limit``: page size, API_PAGE_SIZE by default, at most API_MAX_PAGE_SIZE;
+- ``cursor``: the ``next_cursor`` of the previous page. Pages are keyset
+  paginated on the primary key (``WHERE id > last ORDER BY id LIMIT n``,
+  newest first for orders), so page 500 costs the same as page 1 and rows inserted meanwhile do not
+  shift the pages;
+- ``fields``: comma-separated subset of the resource's fields; only those
+  columns are selected.
+
+Rows are read as plain tuples with text() queries and zipped with the
+field names, no ORM objects are built. The menu is paged out of
+menu_cache, which already holds the PizzaMenu rows. Product prices are
+read from the same column the cart and checkout charge (Product.cost).
+"""
+import base64
+import binascii
+import json
+from bisect import bisect_right
+from flask import current_app, request
+from sqlalchemy import text
+from ORM import db
+from services import sqlite_profile
+from services.menu_cache import menu_cache
+
+API_PAGE_SIZE = 50        # rows per page when no limit is given
+API_MAX_PAGE_SIZE = 200   # largest limit a client may ask for
+
+MENU_FIELDS = ('pizza_id', 'name', 'price', 'is_vegetarian', 'is_vegan')
+
+# field -> column (None: not a column, filled in after the query); the key comes first
+PRODUCT_COLUMNS = {
+    'product_id': 'product_id',
+    'name': 'name',
+    'category': 'category',
+    'price': 'ROUND(cost, 2)',   # what the cart charges (resolve_cart in services/cart.py)
+    'is_alcohol': 'is_alcohol',
+}
+ORDER_COLUMNS = {
+    'order_id': 'order_id',
+    'order_time': 'order_time',
+    'status': 'status',
+    'total_amount': 'total_amount',
+    'applied_discount': 'applied_discount',
+    'discount_code': 'discount_code',
+    'postcode': 'postcode_snapshot',
+    'delivered_at': 'delivered_at',
+    'cancelled_at': 'cancelled_at',
+    'items': None,
+}
+BOOLEAN_FIELDS = {'is_vegetarian', 'is_vegan', 'is_alcohol'}
+
+
+class ApiError(Exception):
+    """Bad request parameters; sent as {"error": message} with ``status``"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def encode_cursor(resource, key):
+    raw = json.dumps([resource, key], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(resource, cursor):
+    """Last key of the previous page, or None for the first page"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        name, key = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise ApiError("invalid cursor")
+    if name != resource or not isinstance(key, int):
+        raise ApiError("invalid cursor")
+    return key
+
+
+def page_size():
+    default = current_app.config.get('API_PAGE_SIZE', API_PAGE_SIZE)
+    largest = current_app.config.get('API_MAX_PAGE_SIZE', API_MAX_PAGE_SIZE)
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    if not 1 <= limit <= largest:
+        raise ApiError(f"limit must be between 1 and {largest}")
+    return limit
+
+
+def requested_fields(available):
+    """Fields named in ?fields=, in the order given (all of them by default)"""
+    value = request.args.get('fields')
+    if not value:
+        return list(available)
+    fields = list(dict.fromkeys(f.strip() for f in value.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in available]
+    if unknown or not fields:
+        raise ApiError(f"unknown field(s) {', '.join(unknown) or value!r}; "
+                       f"available: {', '.join(available)}")
+    return fields
+
+
+def _page(resource, rows, limit, fields, row_fields):
+    """Response body for up to ``limit`` rows (``rows`` may hold one extra), key first"""
+    more = len(rows) > limit
+    rows = rows[:limit]
+    positions = [row_fields.index(f) for f in fields]
+    data = []
+    for row in rows:
+        item = {}
+        for field, position in zip(fields, positions):
+            value = row[position]
+            item[field] = bool(value) if field in BOOLEAN_FIELDS else value
+        data.append(item)
+    next_cursor = encode_cursor(resource, rows[-1][0]) if more else None
+    return {'data': data, 'next_cursor': next_cursor}
+
+
+def menu_page():
+    fields = requested_fields(MENU_FIELDS)
+    limit = page_size()
+    after = decode_cursor('menu', request.args.get('cursor'))
+
+    pizzas = menu_cache.active_pizzas()   # ordered by pizza_id
+    start = 0 if after is None else bisect_right(pizzas, after, key=lambda p: p['pizza_id'])
+    rows = [tuple(p[f] for f in MENU_FIELDS) for p in pizzas[start:start + limit + 1]]
+    return _page('menu', rows, limit, fields, MENU_FIELDS)
+
+
+def _select(columns, fields, key):
+    """Column list with the key first (needed for the cursor even when not requested)"""
+    selected = [key] + [f for f in fields if f != key and columns[f] is not None]
+    return selected, ', '.join(columns[f] for f in selected)
+
+
+def products_page():
+    fields = requested_fields(PRODUCT_COLUMNS)
+    limit = page_size()
+    after = decode_cursor('products', request.args.get('cursor'))
+
+    selected, columns = _select(PRODUCT_COLUMNS, fields, 'product_id')
+    rows = db.session.execute(text(f"""
+        SELECT {columns} FROM Product
+        WHERE active = 1 AND product_id > :after
+        ORDER BY product_id
+        LIMIT :limit
+    """), {'after': -1 if after is None else after, 'limit': limit + 1},
+        bind_arguments=sqlite_profile.reads()).all()
+    return _page('products', rows, limit, fields, selected)
+
+
+def order_items(order_ids):
+    """order_id -> [{'kind', 'id', 'name', 'quantity', 'unit_price'}] for a page of orders"""
+    items = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return items
+    placeholders = ', '.join(f':o{n}' for n in range(len(order_ids)))
+    params = {f'o{n}': order_id for n, order_id in enumerate(order_ids)}
+    rows = db.session.execute(text(f"""
+        SELECT order_id, 'pizza', pizza_id, name_snapshot, quantity, unit_price
+        FROM OrderPizza WHERE order_id IN ({placeholders})
+        UNION ALL
+        SELECT order_id, 'product', product_id, name_snapshot, quantity, unit_price
+        FROM OrderProduct WHERE order_id IN ({placeholders})
+        ORDER BY 1, 2, 3
+    """), params)
+    for order_id, kind, item_id, name, quantity, unit_price in rows:
+        items[order_id].append({'kind': kind, 'id': item_id, 'name': name,
+                                'quantity': quantity, 'unit_price': unit_price})
+    return items
+
+
+def orders_page(customer_id):
+    """The customer's orders, newest first"""
+    fields = requested_fields(ORDER_COLUMNS)
+    limit = page_size()
+    before = decode_cursor('orders', request.args.get('cursor'))
+
+    selected, columns = _select(ORDER_COLUMNS, fields, 'order_id')
+    query = f"SELECT {columns} FROM Orders WHERE customer_id = :customer_id"
+    params = {'customer_id': customer_id, 'limit': limit + 1}
+    if before is not None:
+        query += " AND order_id < :before"
+        params['before'] = before
+    rows = db.session.execute(text(query + " ORDER BY order_id DESC LIMIT :limit"), params).all()
+
+    if 'items' in fields:
+        items = order_items([row[0] for row in rows[:limit]])
+        selected = selected + ['items']
+        rows = [tuple(row) + (items.get(row[0]),) for row in rows]
+    return _page('orders', rows, limit, fields, selected)
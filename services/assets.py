@@ -0,0 +1,181 @@
+"""
+Static asset pipeline: fingerprinted, precompressed files and pizza thumbnails.
+
+``flask --app main build-assets`` (build()) writes static/dist/:
+
+- every file under static/ copied as name.<hash>.ext, so its URL changes
+  whenever its content does and it can be cached forever;
+- a .gz next to each text asset (CSS, JS, SVG) when that is smaller;
+- for every pizza image, a card-sized WebP thumbnail plus a JPEG fallback
+  (needs Pillow, in requirements.txt; without it build-assets warns and
+  exits non-zero, and the pages keep using the full images);
+- manifest.json mapping the original names to the built ones.
+
+Pages link assets through the ``asset_url`` and ``pizza_image`` template
+helpers, which fall back to plain /static URLs for anything not built, so
+nothing breaks before the first build. Built files are served from
+/assets/ with ``Cache-Control: public, max-age=31536000, immutable`` and
+the .gz variant when the client accepts gzip. Old builds are left in place
+so pages rendered before a rebuild keep working; restart the app after
+building to pick up the new manifest.
+"""
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+from datetime import datetime, timezone
+from flask import request, send_from_directory, url_for
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # thumbnails are optional
+    Image = None
+
+DIST_FOLDER = 'dist'                          # under the static folder
+THUMBNAIL_SIZE = (248, 180)                   # .pizza-card img box in style.css
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt')
+ASSET_MAX_AGE = 365 * 24 * 60 * 60            # built files never change
+
+
+def _fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _built_name(name, data, ext=None):
+    stem, original_ext = os.path.splitext(name)
+    return f"{stem}.{_fingerprint(data)}{ext or original_ext}"
+
+
+def _write(dist, name, data):
+    path = os.path.join(dist, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def thumbnail_source(name):
+    """Whether build() makes thumbnails of the static file ``name`` (when Pillow is installed)"""
+    return name.startswith('images/') and name.lower().endswith(('.jpg', '.jpeg', '.png'))
+
+
+def _thumbnails(data, size):
+    """(webp bytes, jpeg bytes) of the image cropped to fill ``size``"""
+    with Image.open(io.BytesIO(data)) as image:
+        thumb = ImageOps.fit(image.convert('RGB'), size, Image.LANCZOS)
+    webp, jpeg = io.BytesIO(), io.BytesIO()
+    thumb.save(webp, 'WEBP', quality=80, method=6)
+    thumb.save(jpeg, 'JPEG', quality=80, optimize=True, progressive=True)
+    return webp.getvalue(), jpeg.getvalue()
+
+
+def build(static_folder, thumbnail_size=THUMBNAIL_SIZE):
+    """Build static/dist and its manifest; returns [(original, built, bytes before, bytes after)]"""
+    dist = os.path.join(static_folder, DIST_FOLDER)
+    manifest = {'files': {}, 'gzip': [], 'thumbnails': {}}
+    report = []
+
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist)
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            built = _built_name(name, data)
+            _write(dist, built, data)
+            manifest['files'][name] = built
+            size = len(data)
+
+            if name.endswith(COMPRESSIBLE):
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                if len(compressed) < len(data):
+                    size = _write(dist, built + '.gz', compressed)
+                    manifest['gzip'].append(built)
+            report.append((name, built, len(data), size))
+
+            if thumbnail_source(name) and Image:
+                webp, jpeg = _thumbnails(data, thumbnail_size)
+                stem = os.path.splitext(name)[0].replace('images/', 'images/thumbs/', 1)
+                manifest['thumbnails'][name] = {
+                    'webp': _built_name(stem + '.webp', webp),
+                    'jpg': _built_name(stem + '.jpg', jpeg),
+                    'width': thumbnail_size[0],
+                    'height': thumbnail_size[1],
+                }
+                _write(dist, manifest['thumbnails'][name]['webp'], webp)
+                _write(dist, manifest['thumbnails'][name]['jpg'], jpeg)
+                report.append((name + ' (thumbnail)', manifest['thumbnails'][name]['webp'], len(data), len(webp)))
+
+    with open(os.path.join(dist, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return report
+
+
+class Assets:
+    def __init__(self):
+        self._manifest = None
+        self._version = ''
+        self._modified = None
+
+    def init_app(self, app):
+        dist = os.path.join(app.static_folder, DIST_FOLDER)
+        self._manifest = {'files': {}, 'gzip': [], 'thumbnails': {}}
+        manifest_path = os.path.join(dist, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'rb') as f:
+                data = f.read()
+            self._manifest = json.loads(data)
+            self._version = _fingerprint(data)
+            self._modified = datetime.fromtimestamp(int(os.path.getmtime(manifest_path)), timezone.utc)
+        self._gzip = set(self._manifest['gzip'])
+        self._dist = dist
+
+        app.add_url_rule('/assets/<path:filename>', 'assets', self._serve)
+        app.add_template_global(self.url, 'asset_url')
+        app.add_template_global(self.pizza_image, 'pizza_image')
+
+    @property
+    def version(self):
+        """Hash of the loaded manifest ('' before the first build)"""
+        return self._version
+
+    @property
+    def modified(self):
+        """When the loaded manifest was built (None before the first build)"""
+        return self._modified
+
+    def url(self, name):
+        """URL of a static file: the fingerprinted build if there is one"""
+        built = self._manifest['files'].get(name)
+        if built:
+            return url_for('assets', filename=built)
+        return url_for('static', filename=name)
+
+    def pizza_image(self, name):
+        """{'src', 'webp', 'width', 'height'} for a file under static/images/"""
+        thumb = self._manifest['thumbnails'].get(f"images/{name}")
+        if thumb:
+            return {'src': url_for('assets', filename=thumb['jpg']),
+                    'webp': url_for('assets', filename=thumb['webp']),
+                    'width': thumb['width'], 'height': thumb['height']}
+        return {'src': self.url(f"images/{name}"), 'webp': None, 'width': None, 'height': None}
+
+    def _serve(self, filename):
+        encoded = filename in self._gzip and 'gzip' in request.accept_encodings
+        response = send_from_directory(self._dist, filename + '.gz' if encoded else filename,
+                                       max_age=ASSET_MAX_AGE, conditional=True)
+        if encoded:
+            response.headers['Content-Encoding'] = 'gzip'
+            response.mimetype = mimetypes.guess_type(filename)[0] or response.mimetype
+        if filename in self._gzip:
+            response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+assets = Assets()
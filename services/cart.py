@@ -0,0 +1,210 @@
+"""
+Server-side carts, and cart resolution into priced, typed lines.
+
+Carts are stored in the database (Cart / CartItem), so every worker
+process sees the same cart and carts survive worker restarts and reloads;
+the session cookie only carries an opaque cart id. A cart line is just
+(kind, item id) -> quantity, so adding an item is one UPDATE (or INSERT)
+whatever the cart size. Carts not changed for CART_TTL seconds are
+treated as empty and deleted by a sweep that runs at most once every
+CART_SWEEP_INTERVAL seconds per process, when a cart is created.
+CART_MAX_LINES bounds the lines per cart. All three can be overridden in
+the app config. Every write commits on its own.
+
+The cart only says what was added. resolve_cart() looks everything up in
+bulk - pizzas from the cached PizzaMenu, products with a single IN query -
+so checkout costs the same number of queries whether the cart has 1 line
+or 50.
+"""
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import text
+from ORM import db
+from ORM.Product import Product
+from services.menu_cache import menu_cache
+
+CART_TTL = 2 * 60 * 60       # seconds an unchanged cart is kept
+CART_SWEEP_INTERVAL = 60     # seconds between deletes of expired carts, per process
+CART_MAX_LINES = 100         # distinct items per cart
+
+
+class CartStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._swept = float('-inf')
+
+    def _limit(self, name, default):
+        return current_app.config.get(name, default)
+
+    @staticmethod
+    def new_id():
+        return secrets.token_urlsafe(16)
+
+    @staticmethod
+    def _stamp(moment):
+        # Same text form SQLAlchemy stores DateTime columns in, so they compare as strings
+        return moment.isoformat(sep=' ', timespec='microseconds')
+
+    def _cutoff(self, now):
+        return self._stamp(now - timedelta(seconds=self._limit('CART_TTL', CART_TTL)))
+
+    def _sweep(self, now):
+        """Delete expired carts, at most once per CART_SWEEP_INTERVAL (caller commits)"""
+        with self._lock:
+            if time.monotonic() - self._swept < self._limit('CART_SWEEP_INTERVAL', CART_SWEEP_INTERVAL):
+                return
+            self._swept = time.monotonic()
+        cutoff = {"cutoff": self._cutoff(now)}
+        db.session.execute(text(
+            "DELETE FROM CartItem WHERE cart_id IN (SELECT cart_id FROM Cart WHERE touched_at < :cutoff)"
+        ), cutoff)
+        db.session.execute(text("DELETE FROM Cart WHERE touched_at < :cutoff"), cutoff)
+
+    def _touch(self, cart_id, now):
+        """Mark the cart as changed now, creating it (or restarting an expired one)"""
+        params = {"cart_id": cart_id, "now": self._stamp(now), "cutoff": self._cutoff(now)}
+        # An expired cart that was not swept yet starts again empty
+        db.session.execute(text(
+            "DELETE FROM CartItem WHERE cart_id = :cart_id "
+            "AND EXISTS (SELECT 1 FROM Cart WHERE cart_id = :cart_id AND touched_at < :cutoff)"
+        ), params)
+        if db.session.execute(text("UPDATE Cart SET touched_at = :now WHERE cart_id = :cart_id"),
+                              params).rowcount == 0:
+            db.session.execute(text("INSERT INTO Cart (cart_id, touched_at) VALUES (:cart_id, :now)"), params)
+            self._sweep(now)
+
+    def add(self, cart_id, kind, item_id, quantity=1):
+        """Add quantity of a pizza/product; False if the cart already has CART_MAX_LINES items"""
+        now = datetime.now()
+        try:
+            self._touch(cart_id, now)
+            params = {"cart_id": cart_id, "kind": kind, "item_id": item_id, "quantity": quantity}
+            added = db.session.execute(text(
+                "UPDATE CartItem SET quantity = quantity + :quantity "
+                "WHERE cart_id = :cart_id AND kind = :kind AND item_id = :item_id"
+            ), params).rowcount == 1
+            if not added:
+                lines = db.session.execute(text("SELECT COUNT(*) FROM CartItem WHERE cart_id = :cart_id"),
+                                           params).scalar()
+                if lines < self._limit('CART_MAX_LINES', CART_MAX_LINES):
+                    db.session.execute(text(
+                        "INSERT INTO CartItem (cart_id, kind, item_id, quantity) "
+                        "VALUES (:cart_id, :kind, :item_id, :quantity)"
+                    ), params)
+                    added = True
+            db.session.commit()
+            return added
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def items(self, cart_id):
+        """Cart lines as [{'pizza_id' | 'product_id': id, 'quantity': n}] ([] if there is no cart)"""
+        if not cart_id:
+            return []
+        rows = db.session.execute(text("""
+            SELECT i.kind, i.item_id, i.quantity FROM CartItem i
+            JOIN Cart c ON c.cart_id = i.cart_id
+            WHERE i.cart_id = :cart_id AND c.touched_at >= :cutoff
+            ORDER BY i.cart_item_id
+        """), {"cart_id": cart_id, "cutoff": self._cutoff(datetime.now())})
+        return [{f"{kind}_id": item_id, 'quantity': quantity} for kind, item_id, quantity in rows]
+
+    def count(self, cart_id):
+        """Items in the cart, quantities included (0 if there is no cart)"""
+        if not cart_id:
+            return 0
+        return db.session.execute(text("""
+            SELECT COALESCE(SUM(i.quantity), 0) FROM CartItem i
+            JOIN Cart c ON c.cart_id = i.cart_id
+            WHERE i.cart_id = :cart_id AND c.touched_at >= :cutoff
+        """), {"cart_id": cart_id, "cutoff": self._cutoff(datetime.now())}).scalar()
+
+    def clear(self, cart_id):
+        if not cart_id:
+            return
+        db.session.execute(text("DELETE FROM CartItem WHERE cart_id = :cart_id"), {"cart_id": cart_id})
+        db.session.execute(text("DELETE FROM Cart WHERE cart_id = :cart_id"), {"cart_id": cart_id})
+        db.session.commit()
+
+
+cart_store = CartStore()
+
+
+@dataclass
+class CartLine:
+    kind: str          # 'pizza' or 'product'
+    item_id: int
+    name: str
+    price: float       # current unit price
+    quantity: int
+    category: str      # 'pizza', 'drink' or 'snack'
+
+    @property
+    def total(self):
+        return self.price * self.quantity
+
+
+@dataclass
+class PricedCart:
+    lines: list = field(default_factory=list)
+    unavailable: list = field(default_factory=list)  # cart items that no longer resolve
+
+    @property
+    def subtotal(self):
+        return sum(line.total for line in self.lines)
+
+    @property
+    def pizza_lines(self):
+        return [line for line in self.lines if line.kind == 'pizza']
+
+    @property
+    def product_lines(self):
+        return [line for line in self.lines if line.kind == 'product']
+
+    @property
+    def drink_lines(self):
+        return [line for line in self.lines if line.category == 'drink']
+
+    @property
+    def pizza_count(self):
+        return sum(line.quantity for line in self.pizza_lines)
+
+
+def resolve_cart(cart_items):
+    """Price the cart items against the current menu and product list.
+
+    Inactive or deleted pizzas/products are left out of the lines and
+    reported in ``unavailable``.
+    """
+    product_ids = {item['product_id'] for item in cart_items if item.get('product_id') is not None}
+    products = {}
+    if product_ids:
+        products = {p.product_id: p for p in Product.query.filter(Product.product_id.in_(product_ids))}
+
+    menu = menu_cache.by_id()
+    priced = PricedCart()
+    for item in cart_items:
+        quantity = max(1, int(item.get('quantity', 1)))
+
+        if item.get('pizza_id') is not None:
+            pizza = menu.get(item['pizza_id'])
+            if not pizza or not pizza['active']:
+                priced.unavailable.append(item)
+                continue
+            priced.lines.append(CartLine('pizza', pizza['pizza_id'], pizza['name'],
+                                         pizza['price'], quantity, 'pizza'))
+
+        elif item.get('product_id') is not None:
+            product = products.get(item['product_id'])
+            if not product or not product.active:
+                priced.unavailable.append(item)
+                continue
+            priced.lines.append(CartLine('product', product.product_id, product.name,
+                                         round(float(product.cost), 2), quantity, product.category))
+
+    return priced
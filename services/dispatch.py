@@ -0,0 +1,240 @@
+"""
+Courier dispatcher.
+
+Couriers are kept in one min-heap per postcode, keyed by when their 30
+minute cooldown ends (DeliveryPerson.available_at, stored so that
+AvailableDeliveryPersonnel is a range probe on idx_dp_postcode_available).
+Assigning an order pops the earliest-available courier in O(log n) and
+claims it with a conditional UPDATE on the version we last saw
+(``WHERE delivery_person_id = ? AND version = ?``, which bumps the
+version). Every change to a courier bumps the version, so when another
+worker (or process) got there first the UPDATE matches no row: the
+courier is re-read from the database, put back in the heap with its real
+availability, and the next candidate is tried. No lock is held across
+processes; the database row is the only arbiter, which is what lets
+several workers dispatch for the same postcode.
+
+A claim starts the courier's next delivery when they are free (now, or at
+the end of their cooldown) and sets available_at 30 minutes after that;
+record_delivery() moves it to 30 minutes after the actual delivery if
+that is later.
+
+Heap entries are never removed in place: a courier that gets a new
+cooldown is pushed again and the outdated entry is dropped when it
+reaches the top.
+
+Claims are written on the caller's session, and the new version is
+remembered before the caller commits. The couriers a session changed are
+listed in its ``info`` with the (innermost) transaction that changed them;
+when that transaction or one around it rolls back, including a savepoint
+of begin_nested() such as one order of the order queue's batch, or the
+session closes without committing, they are forgotten and their postcodes
+are read again from the database on next use. Keeping the rolled-back
+version instead would let a claim match a later, real change that
+brought the database to the same version (ABA).
+"""
+import heapq
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from ORM import db
+from ORM.DeliveryPerson import DeliveryPerson
+
+COOLDOWN = timedelta(minutes=30)
+SESSION_KEY = 'dispatch_written'   # session.info key: [(courier, transaction)] changed, not yet committed
+MAX_CLAIM_CONFLICTS = 20   # lost claims before assign() gives up and the order stays pending
+
+
+class CourierDispatcher:
+    def __init__(self):
+        self._lock = threading.RLock()   # re-entered when a rollback runs inside assign()
+        self._heaps = {}         # postcode -> [(available_at, delivery_person_id)]
+        self.claim_conflicts = 0  # claims lost to another worker (or a rolled-back claim)
+        self._couriers = {}      # delivery_person_id -> (postcode, available_at, version)
+
+    def load(self):
+        """(Re)build every heap from the DeliveryPerson table"""
+        rows = db.session.query(
+            DeliveryPerson.delivery_person_id, DeliveryPerson.postcode,
+            DeliveryPerson.available_at, DeliveryPerson.version
+        ).all()
+        with self._lock:
+            self._heaps = {}
+            self._couriers = {}
+            for courier_id, postcode, available_at, version in rows:
+                self._couriers[courier_id] = (postcode, available_at, version)
+                self._heaps.setdefault(postcode, []).append((available_at, courier_id))
+            for heap in self._heaps.values():
+                heapq.heapify(heap)
+
+    def _written(self, courier_id):
+        """Note that the current transaction changed this courier (see _forget_written)"""
+        session = db.session()
+        transaction = session.get_nested_transaction() or session.get_transaction()
+        session.info.setdefault(SESSION_KEY, []).append((courier_id, transaction))
+
+    def _forget(self, courier_ids):
+        with self._lock:
+            for courier_id in courier_ids:
+                state = self._couriers.pop(courier_id, None)
+                if state is not None:
+                    # The whole postcode is reloaded by _load_postcode on next use
+                    self._heaps.pop(state[0], None)
+
+    def _forget_written(self, session, previous_transaction):
+        """after_soft_rollback: drop what the rolled-back transaction's claims made us remember"""
+        written = session.info.get(SESSION_KEY)
+        if not written:
+            return
+        undone, kept = [], []
+        for courier_id, transaction in written:
+            outer = transaction
+            while outer is not None and outer is not previous_transaction:
+                outer = outer.parent
+            (undone if outer is previous_transaction else kept).append((courier_id, transaction))
+        session.info[SESSION_KEY] = kept
+        self._forget(courier_id for courier_id, _ in undone)
+
+    def _forget_uncommitted(self, session, transaction):
+        """after_transaction_end: a session closed without committing undid its claims too"""
+        if transaction.parent is None and session.info.get(SESSION_KEY):
+            self._forget(courier_id for courier_id, _ in session.info.pop(SESSION_KEY))
+
+    def _keep_written(self, session):
+        """after_commit: what we remember now matches the database"""
+        if not session.in_nested_transaction():  # a released savepoint can still be rolled back
+            session.info.pop(SESSION_KEY, None)
+
+    def _track(self, courier_id, postcode, available_at, version):
+        self._couriers[courier_id] = (postcode, available_at, version)
+        heapq.heappush(self._heaps.setdefault(postcode, []), (available_at, courier_id))
+
+    def _refresh(self, courier_id):
+        """Re-read a courier after a lost claim; returns its state (None if it is gone)"""
+        row = db.session.query(
+            DeliveryPerson.postcode, DeliveryPerson.available_at, DeliveryPerson.version
+        ).filter_by(delivery_person_id=courier_id).first()
+        if row is None:
+            self._couriers.pop(courier_id, None)
+            return None
+        return tuple(row)
+
+    def _load_postcode(self, postcode):
+        """Pick up couriers for a postcode we have not seen yet"""
+        if postcode in self._heaps:
+            return
+        rows = db.session.query(
+            DeliveryPerson.delivery_person_id, DeliveryPerson.available_at, DeliveryPerson.version
+        ).filter_by(postcode=postcode).all()
+        self._heaps[postcode] = []
+        for courier_id, available_at, version in rows:
+            self._track(courier_id, postcode, available_at, version)
+
+    def _top(self, postcode):
+        """Discard outdated entries and return the current head of the heap"""
+        heap = self._heaps.get(postcode, [])
+        while heap:
+            ready_at, courier_id = heap[0]
+            state = self._couriers.get(courier_id)
+            if state and state[0] == postcode and state[1] == ready_at:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def next_available(self, postcode):
+        """When the earliest courier for a postcode is free again (None if there is none)"""
+        with self._lock:
+            self._load_postcode(postcode)
+            top = self._top(postcode)
+        if top is None:
+            return None
+        return top[0]
+
+    def assign(self, postcode, now=None):
+        """Claim the earliest-available courier for a postcode.
+
+        Returns (delivery_person_id, minutes_until_available) or None when
+        the postcode has no couriers (or every claim kept losing the race).
+        The claim is written on the caller's session; if its transaction (or
+        the savepoint it was made in) rolls back, the claimed courier's
+        postcode is reloaded from the database.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._load_postcode(postcode)
+            attempts = {}
+            deferred = []  # couriers that lost the race twice, retried once the others are tried
+            conflicts = 0
+            try:
+                while True:
+                    top = self._top(postcode)
+                    if top is None:
+                        if not deferred or conflicts >= MAX_CLAIM_CONFLICTS:
+                            return None
+                        # Every courier was contended: give the deferred ones another round
+                        for courier_id in deferred:
+                            self._track(courier_id, *self._couriers[courier_id])
+                        deferred = []
+                        attempts = {}
+                        continue
+                    ready_at, courier_id = heapq.heappop(self._heaps[postcode])
+                    version = self._couriers[courier_id][2]
+
+                    # Only claim if nobody else has changed the courier since the version we hold
+                    starts_at = max(now, ready_at)
+                    claim = db.session.query(DeliveryPerson).filter(
+                        DeliveryPerson.delivery_person_id == courier_id,
+                        DeliveryPerson.version == version
+                    )
+                    if claim.update({DeliveryPerson.last_delivery_at: starts_at,
+                                     DeliveryPerson.available_at: starts_at + COOLDOWN,
+                                     DeliveryPerson.version: version + 1},
+                                    synchronize_session=False) == 1:
+                        self._track(courier_id, postcode, starts_at + COOLDOWN, version + 1)
+                        self._written(courier_id)
+                        wait = max(0.0, (ready_at - now).total_seconds() / 60)
+                        return courier_id, wait
+
+                    # Lost the race (or the courier moved/was deleted): re-read it and try the
+                    # next one
+                    self.claim_conflicts += 1
+                    conflicts += 1
+                    state = self._refresh(courier_id)
+                    if state is None:
+                        continue
+                    attempts[courier_id] = attempts.get(courier_id, 0) + 1
+                    if attempts[courier_id] < 2:
+                        self._track(courier_id, *state)
+                    else:
+                        self._couriers[courier_id] = state
+                        deferred.append(courier_id)
+            finally:
+                for courier_id in deferred:
+                    self._track(courier_id, *self._couriers[courier_id])
+
+    def record_delivery(self, courier_id, when=None):
+        """Start the courier's cooldown at a delivery (unless a claim already ends later).
+
+        Written on the caller's session like assign().
+        """
+        when = when or datetime.now()
+        after_delivery = when + COOLDOWN
+        db.session.query(DeliveryPerson).filter_by(delivery_person_id=courier_id).update({
+            DeliveryPerson.last_delivery_at: when,
+            DeliveryPerson.available_at: db.case(
+                (DeliveryPerson.available_at > after_delivery, DeliveryPerson.available_at),
+                else_=after_delivery
+            ),
+            DeliveryPerson.version: DeliveryPerson.version + 1,
+        }, synchronize_session=False)
+        with self._lock:
+            state = self._refresh(courier_id)
+            if state is not None:
+                self._track(courier_id, *state)
+                self._written(courier_id)
+
+
+dispatcher = CourierDispatcher()
+event.listen(db.session, 'after_soft_rollback', dispatcher._forget_written)
+event.listen(db.session, 'after_commit', dispatcher._keep_written)
+event.listen(db.session, 'after_transaction_end', dispatcher._forget_uncommitted)
@@ -0,0 +1,77 @@
+"""
+Streaming CSV / NDJSON export of a report query.
+
+The rows are read with ``yield_per`` (a server-side cursor: the driver
+hands them over in batches of EXPORT_BATCH_SIZE instead of buffering the
+whole result) and every batch is encoded and sent before the next one is
+fetched, so memory stays bounded by one batch whatever the report size.
+The response is a generator wrapped in stream_with_context; the query
+runs inside the request's session (on the analytics snapshot when it is
+on) and finishes with it.
+
+Reports that sort on an aggregate (earnings) still make SQLite sort all
+groups before the first row comes out, but that happens in its temp
+store, not in Python objects.
+"""
+import csv
+import io
+import json
+from datetime import date
+from flask import Response, stream_with_context
+from sqlalchemy import text
+from ORM import db
+from services.analytics_snapshot import analytics_snapshot
+
+EXPORT_BATCH_SIZE = 1000  # rows fetched and written per chunk
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)   # Decimal and anything else the driver returns
+
+
+def _csv_chunks(columns, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(columns, partitions):
+    for rows in partitions:
+        yield ''.join(json.dumps(dict(zip(columns, row)), default=_json_default) + '\n' for row in rows)
+
+
+def stream(query, params, fmt, filename, batch_size=EXPORT_BATCH_SIZE):
+    """Response streaming every row of ``query`` as ``fmt`` ('csv' or 'ndjson')"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}")
+
+    @stream_with_context
+    def generate():
+        result = db.session.execute(
+            text(query).execution_options(yield_per=batch_size), params,
+            bind_arguments=analytics_snapshot.reads()
+        )
+        try:
+            columns = list(result.keys())
+            chunks = _csv_chunks if fmt == 'csv' else _ndjson_chunks
+            yield from chunks(columns, result.partitions())
+        finally:
+            result.close()
+
+    response = Response(generate(), content_type=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,65 @@
+"""
+Rendered-HTML cache for the catalog grids (templates/partials/).
+
+The pizza and product grids only change with the catalog, so their HTML is
+kept per (template, locale, catalog version, ...) and the pages re-render
+just the parts that vary per request around them (navbar, flashes). The
+context is loaded lazily, so a hit skips the query behind the grid as well
+as the Jinja render. At most FRAGMENT_CACHE_SIZE fragments are kept, the
+least recently used one is dropped first; entries for an old catalog
+version simply age out. Set FRAGMENT_CACHE = False to always render.
+"""
+import threading
+from collections import OrderedDict
+from flask import current_app, render_template, request
+from markupsafe import Markup
+
+FRAGMENT_CACHE_SIZE = 256   # rendered fragments kept per process
+SUPPORTED_LOCALES = ['en']  # locales the templates are rendered for
+
+
+def current_locale():
+    locales = current_app.config.get('SUPPORTED_LOCALES', SUPPORTED_LOCALES)
+    return request.accept_languages.best_match(locales) or locales[0]
+
+
+class FragmentCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fragments = OrderedDict()   # key -> Markup, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, template, key, load):
+        """HTML of ``template`` for ``key``; ``load()`` returns its context on a miss"""
+        if not current_app.config.get('FRAGMENT_CACHE', True):
+            return Markup(render_template(template, **load()))
+
+        full_key = (template, current_locale()) + tuple(key)
+        with self._lock:
+            html = self._fragments.get(full_key)
+            if html is not None:
+                self._fragments.move_to_end(full_key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        # Rendered outside the lock; two concurrent misses both render, last one wins
+        html = Markup(render_template(template, **load()))
+        with self._lock:
+            self._fragments[full_key] = html
+            self._fragments.move_to_end(full_key)
+            limit = current_app.config.get('FRAGMENT_CACHE_SIZE', FRAGMENT_CACHE_SIZE)
+            while len(self._fragments) > limit:
+                self._fragments.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+    def __len__(self):
+        return len(self._fragments)
+
+
+fragment_cache = FragmentCache()
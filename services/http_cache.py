@@ -0,0 +1,131 @@
+"""
+Conditional GET for the catalog pages (/ and /products).
+
+A page's ETag is built from the catalog version (bumped by the triggers in
+business_queries.sql whenever a pizza, ingredient or product changes),
+the templates on disk, the asset build (services/assets.py) and the
+per-visitor bits the page shows: the signed-in customer and the cart
+size. Last-Modified is the latest of the catalog change, the newest
+template and the asset manifest's build, so a page that links newly
+fingerprinted assets is never answered with 304 either way.
+
+The catalog version is read from the database at most once every
+CATALOG_VERSION_TTL seconds per process, so a request carrying a matching
+If-None-Match (or, for anonymous visitors, If-Modified-Since) gets its 304
+without a render, and without a query unless the visitor has a cart (one
+lookup of its size).
+
+Anonymous pages are sent as ``public`` with a short max-age and
+Last-Modified; pages for a signed-in customer are ``private, no-cache``
+(revalidated every time, never shared). A response with flash messages
+pending is always rendered in full, since the flashes only show once.
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, make_response, request, session
+from sqlalchemy import text
+from werkzeug.http import is_resource_modified
+from ORM import db
+from services.assets import assets
+from services.cart import cart_store
+
+CATALOG_VERSION_TTL = 1.0   # seconds a catalog version read is reused
+CATALOG_PAGE_MAX_AGE = 60   # max-age of the anonymous catalog pages
+
+
+def _templates_stamp(folder):
+    """(hash, newest mtime) of the template files, so a deploy changes the ETag"""
+    digest = hashlib.sha1()
+    newest = 0.0
+    for root, _, files in sorted(os.walk(folder)):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            digest.update(f"{name}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+            newest = max(newest, stat.st_mtime)
+    return digest.hexdigest()[:12], datetime.fromtimestamp(int(newest), timezone.utc)
+
+
+class CatalogClock:
+    """Throttled read of (version, updated_at) from CatalogVersion"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked = float('-inf')
+        self._state = (0, None)
+
+    def current(self):
+        ttl = current_app.config.get('CATALOG_VERSION_TTL', CATALOG_VERSION_TTL)
+        if time.monotonic() - self._checked < ttl:
+            return self._state
+        with self._lock:
+            if time.monotonic() - self._checked >= ttl:
+                row = db.session.execute(
+                    text("SELECT version, updated_at FROM CatalogVersion WHERE id = 1")
+                ).fetchone()
+                version, updated_at = (row[0], row[1]) if row else (0, None)
+                if isinstance(updated_at, str):
+                    updated_at = datetime.fromisoformat(updated_at)
+                if updated_at is not None:
+                    updated_at = updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+                self._state = (version, updated_at)
+                self._checked = time.monotonic()
+        return self._state
+
+    def invalidate(self):
+        self._checked = float('-inf')
+
+
+catalog_clock = CatalogClock()
+_templates = {}
+
+
+def _validators(page):
+    """(etag, last_modified or None) for the current visitor"""
+    app = current_app._get_current_object()
+    if app not in _templates:
+        _templates[app] = _templates_stamp(os.path.join(app.root_path, app.template_folder))
+    templates_hash, templates_modified = _templates[app]
+    version, updated_at = catalog_clock.current()
+
+    customer_id = session.get('customer_id')
+    cart_count = cart_store.count(session.get('cart_id'))
+    key = f"{page}|{version}|{templates_hash}|{assets.version}|{datetime.now().year}|{customer_id}|" \
+          f"{session.get('customer_name')}|{cart_count}"
+    etag = hashlib.sha1(key.encode()).hexdigest()[:20]
+
+    if customer_id:
+        return etag, None
+    return etag, max(filter(None, (updated_at, templates_modified, assets.modified)))
+
+
+def conditional(page):
+    """Answer If-None-Match / If-Modified-Since with 304 before running the view"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if session.get('_flashes'):
+                response = make_response(view(*args, **kwargs))
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+
+            etag, last_modified = _validators(page)
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+
+            response.set_etag(etag)
+            if last_modified is None:
+                response.headers['Cache-Control'] = 'private, no-cache'
+            else:
+                response.last_modified = last_modified
+                max_age = current_app.config.get('CATALOG_PAGE_MAX_AGE', CATALOG_PAGE_MAX_AGE)
+                response.headers['Cache-Control'] = f'public, max-age={max_age}'
+            response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,83 @@
+"""
+Loyalty counters: 10% off once a customer has bought 10 pizzas.
+
+The CustomerLoyalty view sums OrderPizza over a customer's whole order
+history. CustomerLoyaltyCounter keeps the same number per customer and is
+updated in the transaction that writes (or cancels) the OrderPizza rows,
+so a loyalty lookup is a single primary-key read. verify_counters() and
+rebuild_counters() compare/reset the counters against the view.
+"""
+from sqlalchemy import text
+from ORM import db
+
+LOYALTY_THRESHOLD = 10  # pizzas bought before the 10% discount applies
+
+
+def pizzas_bought(customer_id):
+    row = db.session.execute(
+        text("SELECT total_pizzas_bought FROM CustomerLoyaltyCounter WHERE customer_id = :cid"),
+        {"cid": customer_id}
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def loyalty_status(customer_id):
+    """Return (total_pizzas_bought, eligible_for_loyalty_discount)"""
+    total = pizzas_bought(customer_id)
+    return total, total >= LOYALTY_THRESHOLD
+
+
+def open_counter(customer_id):
+    """Create the zeroed counter for a new customer (caller commits)"""
+    db.session.execute(
+        text("INSERT INTO CustomerLoyaltyCounter (customer_id, total_pizzas_bought) VALUES (:cid, 0)"),
+        {"cid": customer_id}
+    )
+
+
+def add_pizzas(customer_id, quantity):
+    """Add (or with a negative quantity, remove) pizzas from a customer's counter.
+
+    Runs on the caller's session so it commits or rolls back together with
+    the OrderPizza rows it accounts for.
+    """
+    if not quantity:
+        return
+    result = db.session.execute(
+        text("""
+            UPDATE CustomerLoyaltyCounter
+            SET total_pizzas_bought = total_pizzas_bought + :qty
+            WHERE customer_id = :cid
+        """),
+        {"cid": customer_id, "qty": quantity}
+    )
+    if result.rowcount == 0:
+        # No counter yet (customer predates the table): start one here and
+        # let rebuild_counters() pull in any older history.
+        db.session.execute(
+            text("INSERT INTO CustomerLoyaltyCounter (customer_id, total_pizzas_bought) VALUES (:cid, :qty)"),
+            {"cid": customer_id, "qty": max(0, quantity)}
+        )
+
+
+def verify_counters():
+    """Return [(customer_id, counter_value, view_value)] for every mismatch"""
+    result = db.session.execute(text("""
+        SELECT l.customer_id,
+               COALESCE(c.total_pizzas_bought, 0) AS counter_value,
+               l.total_pizzas_bought AS view_value
+        FROM CustomerLoyalty l
+        LEFT JOIN CustomerLoyaltyCounter c ON c.customer_id = l.customer_id
+        WHERE COALESCE(c.total_pizzas_bought, 0) != l.total_pizzas_bought
+        ORDER BY l.customer_id
+    """))
+    return [tuple(row) for row in result]
+
+
+def rebuild_counters():
+    """Reset every counter from the CustomerLoyalty view (caller commits)"""
+    db.session.execute(text("DELETE FROM CustomerLoyaltyCounter"))
+    db.session.execute(text("""
+        INSERT INTO CustomerLoyaltyCounter (customer_id, total_pizzas_bought)
+        SELECT customer_id, total_pizzas_bought FROM CustomerLoyalty
+    """))
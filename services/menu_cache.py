@@ -0,0 +1,87 @@
+"""
+In-process copy of the PizzaMenu view.
+
+PizzaMenu joins Pizza x PizzaIngredient x Ingredient and re-aggregates
+prices and dietary flags on every read. Those inputs change a few times a
+week, and every change bumps CatalogVersion (see the triggers at the bottom
+of business_queries.sql), so the menu is only rebuilt when the version
+stored in the database moves past the one we built from.
+"""
+import threading
+from sqlalchemy import text
+from ORM import db
+from services import sqlite_profile
+
+
+class MenuCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._pizzas = []
+        self._by_id = {}
+
+    @property
+    def version(self):
+        """Catalog version the cached menu was built from (None before first build)"""
+        return self._version
+
+    def catalog_version(self):
+        """Current catalog version in the database (single primary-key read)"""
+        row = db.session.execute(
+            text("SELECT version FROM CatalogVersion WHERE id = 1"),
+            bind_arguments=sqlite_profile.reads()
+        ).fetchone()
+        return row[0] if row else 0
+
+    def is_stale(self):
+        return self._version != self.catalog_version()
+
+    def invalidate(self):
+        self._version = None
+
+    def refresh(self):
+        """Rebuild from PizzaMenu if the catalog version moved"""
+        version = self.catalog_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            # The version is read before the view, so a change landing in
+            # between only causes one extra rebuild on the next request.
+            result = db.session.execute(text("""
+                SELECT pizza_id, name, active, price, is_vegetarian, is_vegan
+                FROM PizzaMenu
+                ORDER BY pizza_id
+            """), bind_arguments=sqlite_profile.reads())
+            by_id = {}
+            for row in result:
+                by_id[row[0]] = {
+                    'pizza_id': row[0],
+                    'name': row[1],
+                    'active': bool(row[2]),
+                    'price': round(float(row[3]), 2),
+                    'is_vegetarian': bool(row[4]),
+                    'is_vegan': bool(row[5])
+                }
+            self._by_id = by_id
+            self._pizzas = [p for p in by_id.values() if p['active']]
+            self._version = version
+
+    def active_pizzas(self):
+        """All active pizzas with price and dietary flags, ordered by id"""
+        self.refresh()
+        return self._pizzas
+
+    def by_id(self):
+        """Every menu entry keyed by pizza_id (one version check for many lookups)"""
+        self.refresh()
+        return self._by_id
+
+    def get(self, pizza_id):
+        """Menu entry for one pizza (active or not), or None"""
+        self.refresh()
+        return self._by_id.get(pizza_id)
+
+
+menu_cache = MenuCache()
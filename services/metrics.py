@@ -0,0 +1,170 @@
+"""
+Per-endpoint request and SQL metrics, exposed in Prometheus text format.
+
+install() adds request hooks to the app and cursor-execute hooks to every
+SQLAlchemy engine (including the read-only bind). For each endpoint it
+keeps a latency histogram, the number of SQL statements and the time spent
+in them (failed ones included), and the duration of the slowest statement
+seen. Statements run outside a request (CLI commands, the order queue's
+writer thread) are not counted. The text of a new slowest statement goes
+to the app log, not into a label: the only label is the endpoint, so the
+number of series stays bounded by the number of routes.
+
+render() returns everything in the Prometheus text exposition format for
+the /metrics route. With METRICS_QUERY_HEADER on (default: app.debug),
+responses also carry X-Query-Count and X-SQL-Time headers for the request.
+
+Counters are per process: scrape every worker (or sum them) when running
+more than one. gunicorn.conf.py runs a single worker unless PIZZA_WORKERS
+says otherwise.
+"""
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from ORM import db
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_LOG_LENGTH = 500  # a new slowest statement is logged truncated to this many characters
+
+
+class _EndpointStats:
+    __slots__ = ('buckets', 'requests', 'seconds', 'statements', 'sql_seconds', 'slowest_seconds')
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)  # non-cumulative; +Inf is `requests`
+        self.requests = 0
+        self.seconds = 0.0
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.slowest_seconds = 0.0
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def install(self, app):
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_execute)
+                event.listen(engine, 'handle_error', self._execute_failed)  # failed statements count too
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_seconds = 0.0
+        g.sql_slowest = (0.0, '')
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # On the statement's execution context, which dies with it even when the statement fails
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._count_statement(context, statement)
+
+    def _execute_failed(self, exception_context):
+        self._count_statement(exception_context.execution_context, exception_context.statement)
+
+    def _count_statement(self, context, statement):
+        started = getattr(context, '_metrics_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if not has_request_context() or 'sql_statements' not in g:
+            return
+        g.sql_statements += 1
+        g.sql_seconds += elapsed
+        if elapsed > g.sql_slowest[0]:
+            g.sql_slowest = (elapsed, statement)
+
+    def _finish_request(self, response):
+        if 'metrics_started' not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_started
+        endpoint = request.endpoint or 'unmatched'
+        slowest_seconds, slowest_statement = g.sql_slowest
+        if self.record(endpoint, elapsed, g.sql_statements, g.sql_seconds, slowest_seconds):
+            current_app.logger.info("slowest SQL for %s: %.1fms: %s", endpoint, slowest_seconds * 1000,
+                                    ' '.join(slowest_statement.split())[:STATEMENT_LOG_LENGTH])
+        if current_app.config.get('METRICS_QUERY_HEADER', current_app.debug):
+            response.headers['X-Query-Count'] = str(g.sql_statements)
+            response.headers['X-SQL-Time'] = f"{g.sql_seconds * 1000:.2f}ms"
+        return response
+
+    def record(self, endpoint, seconds, statements=0, sql_seconds=0.0, slowest_seconds=0.0):
+        """Count one request; True when it ran the endpoint's slowest statement so far"""
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _EndpointStats()
+            bucket = bisect_left(LATENCY_BUCKETS, seconds)
+            if bucket < len(LATENCY_BUCKETS):
+                stats.buckets[bucket] += 1
+            stats.requests += 1
+            stats.seconds += seconds
+            stats.statements += statements
+            stats.sql_seconds += sql_seconds
+            if slowest_seconds > stats.slowest_seconds:
+                stats.slowest_seconds = slowest_seconds
+                return True
+            return False
+
+    def render(self):
+        """All metrics in the Prometheus text format (version 0.0.4)"""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = [
+                "# HELP pizza_request_duration_seconds Request latency by endpoint.",
+                "# TYPE pizza_request_duration_seconds histogram",
+            ]
+            for endpoint, stats in endpoints:
+                label = f'endpoint="{_escape(endpoint)}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f'pizza_request_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'pizza_request_duration_seconds_bucket{{{label},le="+Inf"}} {stats.requests}')
+                lines.append(f'pizza_request_duration_seconds_sum{{{label}}} {stats.seconds:.6f}')
+                lines.append(f'pizza_request_duration_seconds_count{{{label}}} {stats.requests}')
+
+            lines += [
+                "# HELP pizza_sql_statements_total SQL statements executed by endpoint.",
+                "# TYPE pizza_sql_statements_total counter",
+            ]
+            lines += [f'pizza_sql_statements_total{{endpoint="{_escape(endpoint)}"}} {stats.statements}'
+                      for endpoint, stats in endpoints]
+
+            lines += [
+                "# HELP pizza_sql_seconds_total Time spent executing SQL by endpoint.",
+                "# TYPE pizza_sql_seconds_total counter",
+            ]
+            lines += [f'pizza_sql_seconds_total{{endpoint="{_escape(endpoint)}"}} {stats.sql_seconds:.6f}'
+                      for endpoint, stats in endpoints]
+
+            lines += [
+                "# HELP pizza_sql_slowest_statement_seconds Slowest SQL statement seen by endpoint.",
+                "# TYPE pizza_sql_slowest_statement_seconds gauge",
+            ]
+            lines += [f'pizza_sql_slowest_statement_seconds{{endpoint="{_escape(endpoint)}"}} '
+                      f'{stats.slowest_seconds:.6f}'
+                      for endpoint, stats in endpoints if stats.statements]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+metrics = Metrics()
@@ -0,0 +1,120 @@
+"""
+Group commit for place_order.
+
+With ORDER_GROUP_COMMIT on, place_order_route hands its verified quote to
+order_queue instead of writing the order itself. One writer thread per
+process drains whatever orders are waiting (up to ORDER_BATCH_SIZE),
+writes each one inside its own SAVEPOINT and commits them all in a single
+transaction, so a burst of checkouts costs one commit instead of one per
+order. An order that fails only rolls back its own savepoint and gets its
+own exception; the others in the batch still commit.
+
+place() blocks until the batch holding the order has committed. If the
+order has not been picked up after ORDER_QUEUE_TIMEOUT seconds it is
+withdrawn and QueueTimeout is raised; once the writer has started on it
+place() waits for the commit, so a request never reports a failure for an
+order that then gets written.
+"""
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError
+from ORM import db
+from ORM.Customer import Customer
+from services import orders
+
+ORDER_BATCH_SIZE = 64       # orders written per transaction at most
+ORDER_QUEUE_TIMEOUT = 30    # seconds an order may wait for the writer
+
+
+class QueueTimeout(Exception):
+    """The writer did not get to the order in time; nothing was written"""
+
+
+class _Job:
+    __slots__ = ('customer_id', 'quote', 'future')
+
+    def __init__(self, customer_id, quote):
+        self.customer_id = customer_id
+        self.quote = quote
+        self.future = Future()
+
+
+class OrderQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._app = None
+
+    def init_app(self, app):
+        app.config.setdefault('ORDER_GROUP_COMMIT', False)
+        app.config.setdefault('ORDER_BATCH_SIZE', ORDER_BATCH_SIZE)
+        app.config.setdefault('ORDER_QUEUE_TIMEOUT', ORDER_QUEUE_TIMEOUT)
+        self._app = app
+
+    def _start(self):
+        # Started on first use, so every worker process gets its own writer
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='order-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, customer_id, quote):
+        """Queue an order; the Future resolves to (order_id, assignment) after the commit"""
+        self._start()
+        job = _Job(customer_id, quote)
+        self._queue.put(job)
+        return job.future
+
+    def place(self, customer_id, quote):
+        """Queue an order and wait until it is committed; returns (order_id, assignment)"""
+        future = self.submit(customer_id, quote)
+        try:
+            return future.result(timeout=self._app.config['ORDER_QUEUE_TIMEOUT'])
+        except TimeoutError:
+            if future.cancel():
+                raise QueueTimeout("Too many orders right now, please try again.")
+            return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._app.config['ORDER_BATCH_SIZE']:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._app.app_context():
+                    self._write_batch(batch)
+            except Exception as e:
+                # Keep the writer alive; fail whatever this batch had not settled
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+
+    def _write_batch(self, batch):
+        written = []
+        for job in batch:
+            if not job.future.set_running_or_notify_cancel():
+                continue  # withdrawn by place() after a timeout
+            try:
+                with db.session.begin_nested():
+                    customer = db.session.get(Customer, job.customer_id)
+                    order, assignment = orders.place_order(customer, job.quote)
+                written.append((job, (order.order_id, assignment)))
+            except Exception as e:
+                job.future.set_exception(e)
+
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for job, _ in written:
+                job.future.set_exception(e)
+            return
+        for job, result in written:
+            job.future.set_result(result)
+
+
+order_queue = OrderQueue()
@@ -0,0 +1,117 @@
+"""
+Order lifecycle operations that need to keep derived data in step.
+"""
+from datetime import datetime
+from ORM import db
+from ORM.Order import Order
+from ORM.OrderPizza import OrderPizza
+from ORM.OrderProduct import OrderProduct
+from ORM.UsedDiscountCode import UsedDiscountCode
+from services import loyalty, pricing, rollups
+from services.dispatch import dispatcher
+
+
+def place_order(customer, quote, when=None):
+    """Write an order from a verified checkout quote on the caller's session.
+
+    Adds the Order with its pizza/product lines at the quoted prices, marks
+    a single-use code as used, bumps the loyalty counter and report rollups
+    and claims a courier. Returns (order, assignment) where assignment is
+    dispatcher.assign()'s (delivery_person_id, wait_minutes) or None. The
+    caller commits.
+    """
+    when = when or datetime.now()
+    order = Order(
+        customer_id=customer.customer_id,
+        postcode_snapshot=customer.postcode,
+        total_amount=quote['total'],
+        applied_discount=quote['total_discount'],
+        status='pending',
+        order_time=when,
+        discount_code=quote['discount_code']  # Save discount code if applied
+    )
+    db.session.add(order)
+    db.session.flush()  # Get order.order_id without committing
+
+    # Add pizzas to OrderPizza and products to OrderProduct at the quoted prices
+    lines = pricing.quote_lines(quote)
+    pizza_count = 0
+    for line in lines:
+        if line.kind == 'pizza':
+            db.session.add(OrderPizza(
+                order_id=order.order_id,
+                pizza_id=line.item_id,
+                quantity=line.quantity,
+                unit_price=line.price,
+                name_snapshot=line.name
+            ))
+            pizza_count += line.quantity
+        else:
+            db.session.add(OrderProduct(
+                order_id=order.order_id,
+                product_id=line.item_id,
+                quantity=line.quantity,
+                unit_price=line.price,
+                name_snapshot=line.name
+            ))
+
+    # Track single-use code usage
+    if quote['single_use_code']:
+        db.session.add(UsedDiscountCode(
+            customer_id=customer.customer_id,
+            code=quote['discount_code'],
+            order_id=order.order_id,
+            used_at=when
+        ))
+
+    # Count this order's pizzas towards future loyalty discounts
+    loyalty.add_pizzas(customer.customer_id, pizza_count)
+
+    # Add the order to the daily report rollups
+    rollups.record_order(order, customer, [
+        (line.item_id, line.quantity, line.price) for line in lines if line.kind == 'pizza'
+    ])
+
+    # Assign the earliest-available delivery person for the postcode
+    # (claiming them also moves their available_at 30 minutes past the start of delivery)
+    assignment = dispatcher.assign(customer.postcode, when)
+    if assignment:
+        order.delivery_person_id = assignment[0]
+        order.status = 'preparing'
+    db.session.flush()
+    return order, assignment
+
+
+def cancel_order(order, when=None):
+    """Cancel an order and take it back out of the loyalty counter and report rollups.
+
+    Returns False if the order was already cancelled or delivered. The
+    caller commits, so the reversal lands in the same transaction.
+    """
+    if order.cancelled_at is not None or order.delivered_at is not None:
+        return False
+
+    order.cancelled_at = when or datetime.now()
+    order.status = 'cancelled'
+
+    pizzas = db.session.query(db.func.coalesce(db.func.sum(OrderPizza.quantity), 0)) \
+        .filter(OrderPizza.order_id == order.order_id).scalar()
+    loyalty.add_pizzas(order.customer_id, -int(pizzas))
+    rollups.reverse_order(order)
+    return True
+
+
+def mark_delivered(order, when=None):
+    """Mark an order delivered and start its courier's cooldown.
+
+    Returns False if the order was already cancelled or delivered. The
+    caller commits.
+    """
+    if order.cancelled_at is not None or order.delivered_at is not None:
+        return False
+
+    order.delivered_at = when or datetime.now()
+    order.status = 'delivered'
+    if order.delivery_person_id is not None:
+        dispatcher.record_delivery(order.delivery_person_id, order.delivered_at)
+    return True
@@ -0,0 +1,151 @@
+"""
+Discount pipeline and signed price quotes.
+
+checkout_page prices the cart once (birthday gift, loyalty reward, discount
+code) and hands the result to the browser as a signed, short-lived quote.
+place_order_route verifies the signature instead of recomputing
+everything, and only re-checks what can change in between: the quote's
+age, that the cart still matches, and that a single-use code is unused.
+"""
+from datetime import date
+from flask import current_app
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from ORM.DiscountCode import DiscountCode
+from ORM.UsedDiscountCode import UsedDiscountCode
+from services import loyalty
+from services.cart import CartLine
+
+QUOTE_MAX_AGE = 15 * 60  # seconds a checkout quote stays valid (override with QUOTE_MAX_AGE)
+
+
+class QuoteError(Exception):
+    """The submitted quote is missing, tampered with, expired or out of date"""
+
+
+def cart_key(cart_items):
+    """Order-independent fingerprint of the cart items"""
+    return sorted(
+        ['pizza' if item.get('pizza_id') is not None else 'product',
+         item.get('pizza_id') if item.get('pizza_id') is not None else item.get('product_id'),
+         max(1, int(item.get('quantity', 1)))]
+        for item in cart_items
+    )
+
+
+def code_already_used(customer_id, code):
+    return UsedDiscountCode.query.get((customer_id, code)) is not None
+
+
+def build_quote(customer, priced_cart, cart_items, discount_code=None, today=None):
+    """Run the discount pipeline and return (quote, rejected_code).
+
+    ``rejected_code`` is set when the session's single-use code has
+    already been used, so the caller can tell the customer and drop it.
+    """
+    today = today or date.today()
+    subtotal = priced_cart.subtotal
+    discounts = []
+
+    # 1. BIRTHDAY DISCOUNT: Free cheapest pizza + free cheapest drink
+    is_birthday = (customer.birth_date.month == today.month and customer.birth_date.day == today.day)
+    if is_birthday:
+        if priced_cart.pizza_lines:
+            cheapest_pizza = min(line.price for line in priced_cart.pizza_lines)
+            discounts.append({
+                'type': 'birthday_pizza',
+                'description': '🎂 Birthday Gift: Free Pizza',
+                'amount': round(cheapest_pizza, 2)
+            })
+        if priced_cart.drink_lines:
+            cheapest_drink = min(line.price for line in priced_cart.drink_lines)
+            discounts.append({
+                'type': 'birthday_drink',
+                'description': '🎂 Birthday Gift: Free Drink',
+                'amount': round(cheapest_drink, 2)
+            })
+
+    # 2. LOYALTY DISCOUNT: 10% off after every 10 pizzas
+    total_pizzas, eligible = loyalty.loyalty_status(customer.customer_id)
+    if eligible:
+        discounts.append({
+            'type': 'loyalty',
+            'description': f'🌟 Loyalty Reward ({total_pizzas} pizzas bought): 10% off',
+            'amount': round(subtotal * 0.10, 2)
+        })
+
+    # 3. DISCOUNT CODE
+    rejected_code = None
+    single_use = False
+    code_obj = DiscountCode.query.get(discount_code) if discount_code else None
+    if code_obj and code_obj.single_use and code_already_used(customer.customer_id, discount_code):
+        rejected_code = discount_code
+        code_obj = None
+    if code_obj:
+        single_use = bool(code_obj.single_use)
+        if code_obj.percent_off:
+            code_discount = (float(code_obj.percent_off) / 100.0) * subtotal
+        elif code_obj.amount_off:
+            code_discount = min(float(code_obj.amount_off), subtotal)
+        else:
+            code_discount = 0.0
+        if code_discount > 0:
+            discounts.append({
+                'type': 'code',
+                'description': f'💳 {code_obj.description}',
+                'amount': round(code_discount, 2)
+            })
+    else:
+        discount_code = None
+
+    total_discount = round(sum(d['amount'] for d in discounts), 2)
+    quote = {
+        'customer_id': customer.customer_id,
+        'cart_key': cart_key(cart_items),
+        'lines': [[line.kind, line.item_id, line.name, line.price, line.quantity, line.category]
+                  for line in priced_cart.lines],
+        'is_birthday': is_birthday,
+        'subtotal': round(subtotal, 2),
+        'discounts': discounts,
+        'total_discount': total_discount,
+        'total': round(max(0, subtotal - total_discount), 2),
+        'discount_code': discount_code,
+        'single_use_code': single_use,
+    }
+    return quote, rejected_code
+
+
+def quote_lines(quote):
+    return [CartLine(*line) for line in quote['lines']]
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.secret_key, salt='price-quote')
+
+
+def sign_quote(quote):
+    return _serializer().dumps(quote)
+
+
+def load_quote(token, customer_id, cart_items, discount_code):
+    """Verify a quote submitted with place_order and return it.
+
+    Raises QuoteError if it is unsigned, expired, for someone else, or the
+    cart/discount code changed since it was issued.
+    """
+    if not token:
+        raise QuoteError("Please review your order before placing it.")
+    max_age = current_app.config.get('QUOTE_MAX_AGE', QUOTE_MAX_AGE)
+    try:
+        quote = _serializer().loads(token, max_age=max_age)
+    except SignatureExpired:
+        raise QuoteError("Your checkout has expired. Please review your order again.")
+    except BadSignature:
+        raise QuoteError("Please review your order before placing it.")
+
+    if quote['customer_id'] != customer_id:
+        raise QuoteError("Please review your order before placing it.")
+    if quote['cart_key'] != cart_key(cart_items) or quote['discount_code'] != (discount_code or None):
+        raise QuoteError("Your cart changed since checkout. Please review your order again.")
+    if quote['single_use_code'] and code_already_used(customer_id, quote['discount_code']):
+        raise QuoteError(f"Discount code '{quote['discount_code']}' has already been used.")
+    return quote
@@ -0,0 +1,183 @@
+"""
+EXPLAIN QUERY PLAN helpers.
+
+Used by the ``check-query-plans`` CLI command to make sure the report
+filters keep hitting an index instead of scanning whole tables, and by
+tools/query_plan_check.py, which runs every view and every statement the
+routes issue against a generated dataset. A full scan of a large table
+fails that check unless ALLOWED_SCANS lists it; suggest_index() proposes
+a (partial or covering) index for the ones that fail.
+"""
+import re
+from sqlalchemy import text
+from ORM import db
+
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)")
+_SCAN_INDEX = re.compile(r"^SCAN (?:TABLE )?(\w+) USING (?:COVERING )?INDEX (\w+)")
+_SOURCE = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.IGNORECASE)
+_SQL_KEYWORDS = {'ON', 'WHERE', 'JOIN', 'LEFT', 'RIGHT', 'FULL', 'INNER', 'OUTER', 'CROSS', 'NATURAL', 'USING',
+                 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'UNION', 'WINDOW', 'SET', 'VALUES', 'RETURNING'}
+
+LARGE_TABLE_ROWS = 1000  # a full scan only fails the check on tables at least this big
+
+# Full scans that are expected: (table, regex matched against the statement, reason)
+ALLOWED_SCANS = [
+    ('Customer', r'\bCustomerLoyalty\b',
+     "totals every customer's history; only the loyalty verify/rebuild commands read it"),
+    ('Customer', r'\bOrderDetails\b', "unfiltered listing of every order"),
+    ('Customer', r'SELECT DISTINCT postcode FROM Customer',
+     "report postcode filter options, read from the covering index idx_customer_postcode"),
+]
+
+
+def explain(sql, params=None):
+    """Return the plan detail lines SQLite reports for ``sql``.
+
+    ``params`` is a dict for text() statements or a tuple for raw DBAPI
+    statements (as recorded from the engine's cursor events).
+    """
+    if isinstance(params, (tuple, list)):
+        rows = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql, tuple(params))
+    else:
+        rows = db.session.execute(text("EXPLAIN QUERY PLAN " + sql), params or {})
+    return [row[3] for row in rows]
+
+
+def full_scans(plan):
+    """Names of the tables (or aliases) a plan reads with a full scan.
+
+    Scans of a view's or subquery's own result rows are not counted.
+    """
+    subqueries = {m.group(1) for m in (_SUBQUERY.match(detail) for detail in plan) if m}
+    scans = [m.group(1) for m in (_SCAN.match(detail) for detail in plan) if m]
+    return [name for name in scans if name not in subqueries and name != 'CONSTANT']
+
+
+def index_checks():
+    """(label, sql, params) for every report query that must be index-driven"""
+    from services import reports
+
+    checks = []
+    for age in ('all',) + tuple(reports.AGE_FILTERS):
+        sql, params = reports.earnings_query(age=age)
+        checks.append((f"earnings report (age={age})", sql, params))
+    checks.append(("BirthdayCustomers view", "SELECT * FROM BirthdayCustomers", {}))
+    checks.append(("EarningsByAgeGroup view", "SELECT * FROM EarningsByAgeGroup", {}))
+    checks.append(("UndeliveredOrders report", "SELECT * FROM UndeliveredOrders ORDER BY order_time DESC", {}))
+    checks.append(("AvailableDeliveryPersonnel for a postcode",
+                   "SELECT * FROM AvailableDeliveryPersonnel WHERE postcode = :postcode", {'postcode': '10001'}))
+    return checks
+
+
+def table_sizes():
+    """Row count of every table in the database"""
+    names = db.session.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )).scalars().all()
+    return {name: db.session.execute(text(f'SELECT COUNT(*) FROM "{name}"')).scalar() for name in names}
+
+
+def view_sql():
+    """CREATE VIEW statement of every view, by name"""
+    rows = db.session.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'view'"))
+    return {name: sql for name, sql in rows}
+
+
+def expand_views(sql, views):
+    """``sql`` followed by the bodies of the views it (transitively) reads"""
+    parts, seen, pending = [sql], set(), [sql]
+    while pending:
+        for source, _ in _sources(pending.pop()):
+            if source in views and source not in seen:
+                seen.add(source)
+                parts.append(views[source])
+                pending.append(views[source])
+    return "\n".join(parts)
+
+
+def _sources(sql):
+    """(table_or_view, alias) for every FROM/JOIN source in ``sql``"""
+    for name, alias in _SOURCE.findall(sql):
+        if alias.upper() in _SQL_KEYWORDS:
+            alias = ''
+        yield name, alias or name
+
+
+def table_aliases(sql, tables):
+    """Alias (or bare name) -> table, for every real table ``sql`` reads"""
+    return {alias: name for name, alias in _sources(sql) if name in tables}
+
+
+def partial_indexes():
+    """Names of the indexes with a WHERE clause"""
+    rows = db.session.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"))
+    return {name for name, sql in rows if re.search(r"\bWHERE\b", sql, re.IGNORECASE)}
+
+
+def large_scans(plan, aliases, sizes, min_rows=LARGE_TABLE_ROWS, partial=frozenset()):
+    """(table, alias) for every full scan of a table with at least ``min_rows`` rows.
+
+    Walking a partial index (one of ``partial``) only reads the rows the
+    index holds, so it does not count as a full scan.
+    """
+    bounded = {m.group(1) for m in (_SCAN_INDEX.match(detail) for detail in plan)
+               if m and m.group(2) in partial}
+    found = []
+    for alias in full_scans(plan):
+        table = aliases.get(alias, alias)
+        if alias not in bounded and sizes.get(table, 0) >= min_rows:
+            found.append((table, alias))
+    return found
+
+
+def allowed_scan(table, sql):
+    """The ALLOWED_SCANS reason for scanning ``table`` in ``sql`` (None if not allowed)"""
+    for allowed_table, pattern, reason in ALLOWED_SCANS:
+        if allowed_table == table and re.search(pattern, sql, re.IGNORECASE):
+            return reason
+    return None
+
+
+def suggest_index(sql, table, alias):
+    """A candidate CREATE INDEX for a scan of ``table`` (as ``alias``) in ``sql``.
+
+    Reads the predicates on the alias' columns: IS NULL tests become the
+    WHERE of a partial index, equality columns lead the key, then one range
+    or ORDER BY column. If the statement selects only a few more columns of
+    the table they are appended to make the index covering. Returns None
+    when there is nothing to index on.
+    """
+    ref = rf'(?:"?{re.escape(alias)}"?\.)"?(\w+)"?'
+    where = re.split(r'\bWHERE\b', sql, maxsplit=1, flags=re.IGNORECASE)
+    predicates = where[1] if len(where) > 1 else ''
+
+    null_columns = _unique(re.findall(ref + r'\s+IS\s+NULL', predicates, re.IGNORECASE))
+    equal_columns = _unique(re.findall(ref + r'\s*(?:=|\bIN\b)', predicates, re.IGNORECASE))
+    range_columns = _unique(re.findall(ref + r'\s*(?:>=|<=|>|<|\bBETWEEN\b)', predicates, re.IGNORECASE))
+    order_columns = _unique(re.findall(r'\bORDER\s+BY\s+' + ref, sql, re.IGNORECASE))
+
+    key = [c for c in equal_columns if c not in null_columns]
+    for column in range_columns + order_columns:
+        if column not in key and column not in null_columns:
+            key.append(column)
+            break
+    if not key and not null_columns:
+        return None
+    if not key:
+        key = null_columns
+
+    select_list = re.split(r'\bFROM\b', sql, maxsplit=1, flags=re.IGNORECASE)[0]
+    selected = [c for c in _unique(re.findall(ref, select_list)) if c not in key]
+    covering = '*' not in select_list and 0 < len(selected) and len(key) + len(selected) <= 5
+    columns = key + (selected if covering else [])
+
+    name = f"idx_{table.lower()}_{'_'.join(key)}" + ('_open' if null_columns and key != null_columns else '')
+    index = f"CREATE INDEX {name} ON {table}({', '.join(columns)})"
+    if null_columns and key != null_columns:
+        index += " WHERE " + " AND ".join(f"{c} IS NULL" for c in null_columns)
+    return index
+
+
+def _unique(items):
+    return list(dict.fromkeys(items))
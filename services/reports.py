@@ -0,0 +1,112 @@
+"""
+Query builders for the employee reports.
+
+Filters are written so SQLite can answer them from an index: age groups
+become birth_date ranges computed here in Python (instead of computing an
+age from every Customer row in SQL), which lets idx_customer_birth_date do
+the filtering.
+
+report_query() returns the full, ordered query of a report; the HTML page
+shows it a page at a time (page_query / summary_query) and the exports
+stream it whole (services/exports.py).
+"""
+from datetime import date
+
+# age filter -> (min_age, max_age), both inclusive, None for open-ended
+AGE_FILTERS = {
+    'under_25': (None, 24),
+    '25_40': (25, 40),
+    'over_40': (41, None),
+}
+
+
+def years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:  # 29 February in a non-leap year
+        return day.replace(year=day.year - years, day=28)
+
+
+def birth_date_bounds(min_age=None, max_age=None, today=None):
+    """Birth date range for customers aged min_age..max_age on ``today``.
+
+    Returns (born_after, born_on_or_before); either side is None when open.
+    """
+    today = today or date.today()
+    born_on_or_before = years_before(today, min_age) if min_age is not None else None
+    born_after = years_before(today, max_age + 1) if max_age is not None else None
+    return born_after, born_on_or_before
+
+
+def earnings_query(gender="all", age="all", postcode="all", today=None):
+    """SQL and parameters for the per-customer earnings report (last month)"""
+    query = """
+        SELECT 
+            c.customer_id,
+            c.first_name || ' ' || c.last_name as customer_name,
+            c.gender,
+            (CAST(strftime('%Y', :today) AS INTEGER) - CAST(strftime('%Y', c.birth_date) AS INTEGER)
+             - (strftime('%m-%d', :today) < strftime('%m-%d', c.birth_date))) as age,
+            c.postcode,
+            SUM(r.total_orders) as total_orders,
+            ROUND(SUM(r.total_spent), 2) as total_spent
+        FROM DailyCustomerRollup r
+        JOIN Customer c ON c.customer_id = r.customer_id
+        WHERE r.day >= DATE('now', '-1 month')
+    """
+
+    # The age shown is counted on the same day as the age filter's birth date bounds
+    today = today or date.today()
+    params = {"today": today.isoformat()}
+    if gender != "all":
+        query += " AND c.gender = :gender"
+        params["gender"] = gender
+
+    if age in AGE_FILTERS:
+        born_after, born_on_or_before = birth_date_bounds(*AGE_FILTERS[age], today=today)
+        if born_after:
+            query += " AND c.birth_date > :born_after"
+            params["born_after"] = born_after.isoformat()
+        if born_on_or_before:
+            query += " AND c.birth_date <= :born_on_or_before"
+            params["born_on_or_before"] = born_on_or_before.isoformat()
+
+    if postcode != "all":
+        query += " AND c.postcode = :postcode"
+        params["postcode"] = postcode
+
+    query += """
+        GROUP BY c.customer_id, c.first_name, c.last_name, c.gender, c.birth_date, c.postcode
+        HAVING total_orders > 0
+        ORDER BY total_spent DESC
+    """
+    return query, params
+
+
+REPORT_TYPES = ('undelivered', 'top_pizzas', 'earnings')
+REPORT_PAGE_SIZE = 50  # table rows per page on /reports
+
+
+def report_query(report_type, gender="all", age="all", postcode="all", today=None):
+    """SQL and parameters for every row of a report, in display order"""
+    if report_type == "undelivered":
+        # order_id breaks ties so pages do not overlap
+        return "SELECT * FROM UndeliveredOrders ORDER BY order_time DESC, order_id DESC", {}
+    if report_type == "top_pizzas":
+        return "SELECT * FROM TopPizzasLastMonth", {}
+    if report_type == "earnings":
+        return earnings_query(gender, age, postcode, today=today)
+    raise ValueError(f"unknown report type {report_type!r}")
+
+
+def page_query(query, params, page, per_page=REPORT_PAGE_SIZE):
+    """One page (1-based) of an ordered report query"""
+    return f"{query} LIMIT :page_limit OFFSET :page_offset", \
+        dict(params, page_limit=per_page, page_offset=(page - 1) * per_page)
+
+
+def summary_query(report_type, query, params):
+    """Row count and, for earnings, the revenue and order totals of a report query"""
+    totals = ", ROUND(SUM(total_spent), 2) AS total_revenue, SUM(total_orders) AS total_orders" \
+        if report_type == "earnings" else ""
+    return f"SELECT COUNT(*) AS total_rows{totals} FROM ({query})", params
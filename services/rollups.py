@@ -0,0 +1,136 @@
+"""
+Daily report rollups.
+
+The earnings, postcode, age-group and top-pizza reports used to group the
+whole Orders history on every page load. Instead each placed order adds
+itself to three small per-day tables, and a cancelled order subtracts
+itself again, in the same transaction as the order change:
+
+    DailyEarningsRollup  (day, postcode, gender, age_group)
+    DailyCustomerRollup  (day, customer_id)
+    DailyPizzaRollup     (day, pizza_id)
+
+backfill() rebuilds them from Orders, e.g. after a bulk import.
+"""
+from collections import defaultdict
+from sqlalchemy import text
+from ORM import db
+from ORM.Customer import Customer
+from ORM.Order import Order
+from ORM.OrderPizza import OrderPizza
+
+# Upper age bound (exclusive) for each bucket; same buckets as EarningsByAgeGroup
+AGE_GROUPS = [(25, '18-24'), (35, '25-34'), (45, '35-44'), (55, '45-54')]
+OLDEST_AGE_GROUP = '55+'
+
+
+def age_on(birth_date, day):
+    return day.year - birth_date.year - ((day.month, day.day) < (birth_date.month, birth_date.day))
+
+
+def age_group(birth_date, day):
+    age = age_on(birth_date, day)
+    for upper, label in AGE_GROUPS:
+        if age < upper:
+            return label
+    return OLDEST_AGE_GROUP
+
+
+def _bump(table, keys, values):
+    """Add ``values`` to the rollup row identified by ``keys``, creating it if needed"""
+    params = {**keys, **values}
+    where = " AND ".join(f"{k} = :{k}" for k in keys)
+    sets = ", ".join(f"{v} = {v} + :{v}" for v in values)
+    result = db.session.execute(text(f"UPDATE {table} SET {sets} WHERE {where}"), params)
+    if result.rowcount == 0:
+        columns = ", ".join(params)
+        placeholders = ", ".join(f":{c}" for c in params)
+        db.session.execute(text(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"), params)
+
+
+def record_order(order, customer, pizza_lines, sign=1):
+    """Add an order to the rollups (``sign=-1`` takes it back out).
+
+    ``pizza_lines`` is an iterable of (pizza_id, quantity, unit_price).
+    """
+    day = order.order_time.date().isoformat()
+    amount = sign * float(order.total_amount or 0)
+
+    _bump("DailyEarningsRollup",
+          {"day": day, "postcode": order.postcode_snapshot, "gender": customer.gender,
+           "age_group": age_group(customer.birth_date, order.order_time.date())},
+          {"total_orders": sign, "total_earnings": amount})
+    _bump("DailyCustomerRollup",
+          {"day": day, "customer_id": customer.customer_id},
+          {"total_orders": sign, "total_spent": amount})
+
+    pizzas = defaultdict(lambda: [0, 0.0])
+    for pizza_id, quantity, unit_price in pizza_lines:
+        pizzas[pizza_id][0] += quantity
+        pizzas[pizza_id][1] += quantity * float(unit_price)
+    for pizza_id, (sold, revenue) in pizzas.items():
+        _bump("DailyPizzaRollup",
+              {"day": day, "pizza_id": pizza_id},
+              {"total_sold": sign * sold, "total_revenue": sign * revenue})
+
+
+def reverse_order(order):
+    """Take a (just cancelled) order back out of the rollups"""
+    customer = db.session.get(Customer, order.customer_id)
+    lines = db.session.query(OrderPizza.pizza_id, OrderPizza.quantity, OrderPizza.unit_price) \
+        .filter(OrderPizza.order_id == order.order_id).all()
+    record_order(order, customer, lines, sign=-1)
+
+
+def backfill():
+    """Rebuild all three rollups from the non-cancelled orders (caller commits)"""
+    earnings = defaultdict(lambda: [0, 0.0])
+    customers = defaultdict(lambda: [0, 0.0])
+    pizzas = defaultdict(lambda: [0, 0.0])
+
+    orders = db.session.query(
+        Order.order_id, Order.order_time, Order.postcode_snapshot, Order.total_amount,
+        Customer.customer_id, Customer.gender, Customer.birth_date
+    ).join(Customer, Customer.customer_id == Order.customer_id) \
+        .filter(Order.cancelled_at.is_(None)).yield_per(5000)
+    for order_id, order_time, postcode, total, customer_id, gender, birth_date in orders:
+        day = order_time.date()
+        for bucket in (earnings[(day, postcode, gender, age_group(birth_date, day))],
+                       customers[(day, customer_id)]):
+            bucket[0] += 1
+            bucket[1] += float(total or 0)
+
+    lines = db.session.query(
+        Order.order_time, OrderPizza.pizza_id, OrderPizza.quantity, OrderPizza.unit_price
+    ).join(Order, Order.order_id == OrderPizza.order_id) \
+        .filter(Order.cancelled_at.is_(None)).yield_per(5000)
+    for order_time, pizza_id, quantity, unit_price in lines:
+        bucket = pizzas[(order_time.date(), pizza_id)]
+        bucket[0] += quantity
+        bucket[1] += quantity * float(unit_price)
+
+    for table in ("DailyEarningsRollup", "DailyCustomerRollup", "DailyPizzaRollup"):
+        db.session.execute(text(f"DELETE FROM {table}"))
+
+    if earnings:
+        db.session.execute(
+            text("""INSERT INTO DailyEarningsRollup (day, postcode, gender, age_group, total_orders, total_earnings)
+                    VALUES (:day, :postcode, :gender, :age_group, :orders, :amount)"""),
+            [{"day": k[0].isoformat(), "postcode": k[1], "gender": k[2], "age_group": k[3],
+              "orders": v[0], "amount": round(v[1], 2)} for k, v in earnings.items()]
+        )
+    if customers:
+        db.session.execute(
+            text("""INSERT INTO DailyCustomerRollup (day, customer_id, total_orders, total_spent)
+                    VALUES (:day, :customer_id, :orders, :amount)"""),
+            [{"day": k[0].isoformat(), "customer_id": k[1], "orders": v[0], "amount": round(v[1], 2)}
+             for k, v in customers.items()]
+        )
+    if pizzas:
+        db.session.execute(
+            text("""INSERT INTO DailyPizzaRollup (day, pizza_id, total_sold, total_revenue)
+                    VALUES (:day, :pizza_id, :sold, :revenue)"""),
+            [{"day": k[0].isoformat(), "pizza_id": k[1], "sold": v[0], "revenue": round(v[1], 2)}
+             for k, v in pizzas.items()]
+        )
+    return len(earnings), len(customers), len(pizzas)
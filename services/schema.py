@@ -0,0 +1,174 @@
+"""
+In-place upgrades for databases created by an older version of the app.
+
+load_from_sql.py builds new databases with the current schema. upgrade()
+(``flask --app main init-db``) brings an existing one up to date instead:
+
+- creates the tables it lacks from the ORM models, with the first
+  CatalogVersion row, and fills the loyalty counters and daily rollups
+  from the orders already there;
+- adds the columns added to existing tables since (ADDED_COLUMNS) with
+  ALTER TABLE and backfills them;
+- creates the indexes of schema.sql that are missing and drops the ones
+  it no longer has;
+- recreates the views and triggers of business_queries.sql, so changed
+  view definitions are picked up.
+
+Every step looks at the database first, so running it again is a no-op
+apart from recreating the views.
+
+check() is the other direction: the servers (wsgi.py, ``python main.py``)
+call it before serving and stop with a SchemaError naming the tables and
+columns the database lacks, instead of answering every page with a 500.
+"""
+import os
+import re
+from ORM import db
+
+SCHEMA_PATH = os.path.join('database_layer', 'schema.sql')
+QUERIES_PATH = os.path.join('database_layer', 'business_queries.sql')
+
+# (table, column, ADD COLUMN definition, backfill statement or None). SQLite
+# cannot add a STORED generated column, the VIRTUAL one indexes the same way.
+ADDED_COLUMNS = [
+    ('Customer', 'birth_month_day',
+     "birth_month_day CHAR(5) AS (strftime('%m-%d', birth_date)) VIRTUAL", None),
+    ('DeliveryPerson', 'available_at',
+     "available_at DATETIME NOT NULL DEFAULT '1970-01-01 00:00:00'",
+     "UPDATE DeliveryPerson SET available_at = DATETIME(last_delivery_at, '+30 minutes') "
+     "WHERE last_delivery_at IS NOT NULL"),
+    ('DeliveryPerson', 'version', "version INT NOT NULL DEFAULT 0", None),
+]
+
+# Indexes schema.sql used to create and has replaced
+DROPPED_INDEXES = ['idx_dp_postcode', 'idx_dp_last_delivery']
+
+# Filled from the existing orders when upgrade() creates them
+DERIVED_TABLES = {'CustomerLoyaltyCounter', 'DailyEarningsRollup', 'DailyCustomerRollup', 'DailyPizzaRollup'}
+
+SETUP_HINT = ("run `python load_from_sql.py` to build it with the sample data, or "
+              "`flask --app main init-db` to create or upgrade the tables in place")
+
+_CREATE_INDEX = re.compile(r"CREATE\s+(UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+([^;]+);", re.IGNORECASE)
+_CREATE_VIEW = re.compile(r"CREATE\s+VIEW\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE)
+
+
+class SchemaError(RuntimeError):
+    """The database lacks tables or columns of the ORM models"""
+
+
+def _tables(cursor):
+    return {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _columns(cursor, table):
+    # table_xinfo also lists generated columns
+    return {row[1] for row in cursor.execute(f"PRAGMA table_xinfo({table})")}
+
+
+def schema_indexes():
+    """{index name: CREATE INDEX IF NOT EXISTS statement} from schema.sql"""
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        schema = f.read()
+    return {name: f"CREATE {unique or ''}INDEX IF NOT EXISTS {name} ON {target}"
+            for unique, name, target in _CREATE_INDEX.findall(schema)}
+
+
+def business_views():
+    """(view names, SQLite script creating the views and triggers) from business_queries.sql"""
+    from load_from_sql import mysql_to_sqlite_views
+
+    with open(QUERIES_PATH, 'r', encoding='utf-8') as f:
+        script = mysql_to_sqlite_views(f.read())
+    return _CREATE_VIEW.findall(script), script
+
+
+def upgrade():
+    """Bring the app's database up to the current schema; returns the changes made"""
+    from load_from_sql import seed_derived_tables
+
+    changes = []
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        before = _tables(cursor)
+        view_names, view_script = business_views()
+
+        # The views may read columns added below: drop them first, recreated at the end
+        for name in view_names:
+            cursor.execute(f"DROP VIEW IF EXISTS {name}")
+
+        for table, column, definition, backfill in ADDED_COLUMNS:
+            if table in before and column not in _columns(cursor, table):
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {definition}")
+                if backfill:
+                    cursor.execute(backfill)
+                changes.append(f"added column {table}.{column}")
+        connection.commit()
+    finally:
+        connection.close()
+
+    db.metadata.create_all(db.engine)
+
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        created = sorted(_tables(cursor) - before)
+        changes += [f"created table {table}" for table in created]
+        if 'CatalogVersion' in created:
+            cursor.execute("INSERT OR IGNORE INTO CatalogVersion (id, version) VALUES (1, 0)")
+
+        for name in DROPPED_INDEXES:
+            if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone():
+                cursor.execute(f"DROP INDEX {name}")
+                changes.append(f"dropped index {name}")
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name, statement in schema_indexes().items():
+            if name not in existing:
+                cursor.execute(statement)
+                changes.append(f"created index {name}")
+        connection.commit()
+
+        cursor.executescript(view_script)
+        changes.append(f"recreated {len(view_names)} views")
+        if DERIVED_TABLES & set(created):
+            # Only the tables just created are empty; seeding fills all four from scratch
+            for table in DERIVED_TABLES - set(created):
+                cursor.execute(f"DELETE FROM {table}")
+            seed_derived_tables(cursor)
+            changes.append("filled the loyalty counters and daily rollups from the orders")
+        connection.commit()
+    finally:
+        connection.close()
+    return changes
+
+
+def missing():
+    """Tables and columns of the ORM models the app's database does not have"""
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        tables = _tables(cursor)
+        gaps = []
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                gaps.append(f"table {table.name}")
+                continue
+            columns = _columns(cursor, table.name)
+            gaps += [f"column {table.name}.{column.name}" for column in table.columns if column.name not in columns]
+        return gaps
+    finally:
+        connection.close()
+
+
+def check(app):
+    """Raise SchemaError unless the database has every table and column the models use"""
+    with app.app_context():
+        gaps = missing()
+        if not gaps:
+            return
+        if len(gaps) == len(db.metadata.tables) and all(gap.startswith("table ") for gap in gaps):
+            what = "none of the app's tables"
+        else:
+            what = f"no {', '.join(gaps)}"
+        raise SchemaError(f"database {db.engine.url.database} has {what}; {SETUP_HINT}")
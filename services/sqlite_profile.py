@@ -0,0 +1,105 @@
+"""
+SQLite connection profile for running several workers on one database file.
+
+configure() fills in the engine options before db.init_app(): a sized
+connection pool per worker process and, when SQLITE_READ_BIND is on, a
+second read-only pool ("reads" bind) for the menu, products and reports
+routes. install() then hooks every new connection so it runs in WAL mode
+with synchronous=NORMAL, a busy timeout, a larger page cache and foreign
+keys enforced. With WAL, report reads no longer block order writes (or the
+other way round), and concurrent writers wait for each other instead of
+failing with "database is locked".
+
+Config keys (all optional):
+    SQLITE_PROFILE       apply the profile at all (default True)
+    SQLITE_PRAGMAS       dict merged over DEFAULT_PRAGMAS
+    SQLITE_POOL_SIZE     pooled connections per worker (default 5)
+    SQLITE_MAX_OVERFLOW  extra connections under bursts (default 10)
+    SQLITE_POOL_TIMEOUT  seconds to wait for a pooled connection (default 30)
+    SQLITE_READ_BIND     route read-only queries to a separate read-only pool
+"""
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from ORM import db
+
+READ_BIND = 'reads'
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,     # ms a writer waits for the lock before giving up
+    'cache_size': -65536,     # 64 MB page cache per connection
+    'foreign_keys': 'ON',
+}
+
+# Only these make sense on a connection opened with mode=ro
+READ_ONLY_PRAGMAS = ('busy_timeout', 'cache_size', 'foreign_keys')
+
+
+def _is_sqlite_file(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def _read_only_url(url):
+    """sqlite:///path -> sqlite:///file:path?mode=ro&uri=true"""
+    url = make_url(url)
+    database = url.database if url.query.get('uri') else f"file:{url.database}"
+    return url.set(database=database).update_query_dict({'mode': 'ro', 'uri': 'true'})
+
+
+def configure(app):
+    """Set pool options (and the read-only bind) on the app; call before db.init_app"""
+    app.config.setdefault('SQLITE_PROFILE', True)
+    app.config.setdefault('SQLITE_READ_BIND', False)
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not app.config['SQLITE_PROFILE'] or not _is_sqlite_file(uri):
+        app.config['SQLITE_READ_BIND'] = False
+        return
+
+    pool_options = {
+        'pool_size': app.config.get('SQLITE_POOL_SIZE', 5),
+        'max_overflow': app.config.get('SQLITE_MAX_OVERFLOW', 10),
+        'pool_timeout': app.config.get('SQLITE_POOL_TIMEOUT', 30),
+    }
+    engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    for key, value in pool_options.items():
+        engine_options.setdefault(key, value)
+
+    if app.config['SQLITE_READ_BIND']:
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault(READ_BIND, dict(pool_options, url=str(_read_only_url(uri))))
+
+
+def _pragma_hook(pragmas):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+    return set_pragmas
+
+
+def install(app):
+    """Run the PRAGMAs on every new pooled connection; call after db.init_app"""
+    if not app.config.get('SQLITE_PROFILE') or not _is_sqlite_file(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+    pragmas = dict(DEFAULT_PRAGMAS, **app.config.get('SQLITE_PRAGMAS', {}))
+    with app.app_context():
+        engines = db.engines
+        event.listen(engines[None], 'connect', _pragma_hook(pragmas))
+        if READ_BIND in engines:
+            read_pragmas = {name: value for name, value in pragmas.items() if name in READ_ONLY_PRAGMAS}
+            read_pragmas['query_only'] = 'ON'
+            event.listen(engines[READ_BIND], 'connect', _pragma_hook(read_pragmas))
+
+
+def reads():
+    """bind_arguments for read-only queries: the "reads" pool when it is configured
+
+        db.session.execute(text(...), bind_arguments=sqlite_profile.reads())
+    """
+    if current_app.config.get('SQLITE_READ_BIND'):
+        return {'bind': db.engines[READ_BIND]}
+    return None
@@ -0,0 +1,53 @@
+"""
+Employee-only order actions: who may use them, and CSRF tokens.
+
+Employees sign in like customers; the accounts whose email is listed in
+EMPLOYEE_EMAILS (PIZZA_EMPLOYEE_EMAILS, comma separated) may change the
+state of an order and download whole reports. The POSTs must also carry
+the session's CSRF token, rendered into the forms with csrf_token(), so a
+page on another site cannot submit them with an employee's cookie; GETs
+change nothing and need none.
+"""
+import hmac
+import secrets
+from functools import wraps
+from flask import current_app, flash, redirect, request, session, url_for
+from ORM import db
+from ORM.Customer import Customer
+
+
+def csrf_token():
+    """The session's CSRF token, issued on first use"""
+    if '_csrf_token' not in session:
+        session['_csrf_token'] = secrets.token_urlsafe(32)
+    return session['_csrf_token']
+
+
+def csrf_valid():
+    expected = session.get('_csrf_token')
+    submitted = request.form.get('csrf_token', '')
+    return bool(expected) and hmac.compare_digest(expected, submitted)
+
+
+def is_employee():
+    """Whether the signed-in account is listed in EMPLOYEE_EMAILS"""
+    customer_id = session.get('customer_id')
+    if not customer_id:
+        return False
+    customer = db.session.get(Customer, customer_id)
+    return customer is not None and customer.email.lower() in current_app.config['EMPLOYEE_EMAILS']
+
+
+def employee_required(view):
+    """Only employees get through to ``view``, with the session's CSRF token unless it is a GET"""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not session.get('customer_id'):
+            flash("Please sign in with an employee account.", "warning")
+            return redirect(url_for("account.signIn_route"))
+        if not is_employee():
+            return "Employees only", 403
+        if request.method not in ('GET', 'HEAD') and not csrf_valid():
+            return "Missing or invalid CSRF token", 400
+        return view(*args, **kwargs)
+    return wrapped
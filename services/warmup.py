@@ -0,0 +1,72 @@
+"""
+Per-worker warm-up, run before a server worker accepts traffic.
+
+A fresh worker process starts with empty in-process caches: the first
+requests it serves build the PizzaMenu copy (menu_cache) and the courier
+heaps of their postcodes, render and keep the pizza/product grids
+(fragment_cache), compile the Jinja templates and SQLAlchemy statements,
+and open SQLite connections, which then run the profile PRAGMAs and start
+with a cold page cache. warm_up() does all of that up front:
+
+- checks out SQLITE_POOL_SIZE connections from every engine at once (so
+  the pool holds them open afterwards) and reads the menu, product and
+  discount-code tables on each, which pulls their pages into that
+  connection's cache. The analytics snapshot's pool is left alone, its
+  connections are reopened at every publish;
+- loads the courier heaps for every postcode (services/dispatch.py);
+- sends WARM_UP_URLS through the test client, which builds the menu cache
+  and the grid fragments and compiles the templates those pages use.
+
+The metrics are reset afterwards so /metrics only counts real traffic.
+gunicorn.conf.py calls it from post_worker_init.
+"""
+import time
+from sqlalchemy import text
+from ORM import db
+from services.analytics_snapshot import REPORTS_BIND
+from services.dispatch import dispatcher
+from services.metrics import metrics
+
+WARM_UP_URLS = ['/', '/products', '/api/menu', '/api/products']
+
+# Read once per pooled connection to load their pages
+WARM_UP_QUERIES = [
+    "SELECT * FROM PizzaMenu",
+    "SELECT * FROM ProductMenu",
+    "SELECT * FROM DiscountCode",
+]
+
+
+def open_pool(engine, size):
+    """Open ``size`` connections at once and return them to the pool, warmed"""
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connections.append(connection)
+            for query in WARM_UP_QUERIES:
+                connection.execute(text(query)).fetchall()
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def warm_up(app, urls=None):
+    """Prime caches and connections; returns (seconds taken, connections opened)"""
+    started = time.perf_counter()
+    opened = 0
+    with app.app_context():
+        size = app.config.get('SQLITE_POOL_SIZE', 5) if app.config.get('SQLITE_PROFILE') else 1
+        for bind, engine in db.engines.items():
+            if bind != REPORTS_BIND:   # snapshot connections are replaced at every publish anyway
+                opened += open_pool(engine, size)
+        dispatcher.load()
+
+    client = app.test_client()
+    for url in WARM_UP_URLS if urls is None else urls:
+        response = client.get(url)
+        if response.status_code >= 500:
+            app.logger.warning("warm-up: %s returned %s", url, response.status_code)
+    metrics.reset()
+    return time.perf_counter() - started, opened
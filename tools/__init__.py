@@ -0,0 +1,6 @@
+"""
+Developer tools: synthetic data generation and benchmarks.
+
+Run them from the repository root, e.g. ``python -m tools.generate_data``
+or ``python -m tools.benchmark``. Nothing here is imported by the app.
+"""
@@ -0,0 +1,117 @@
+"""
+Payload size and latency of the JSON API against the HTML pages.
+
+Generates a seeded dataset (tools/generate_data.py), pads the catalog
+(tools/render_benchmark.py) and signs in as the customer with the most
+orders, then times through Flask's test client:
+
+- GET / and GET /products against /api/menu and /api/products, full rows
+  and with a ``fields=`` projection;
+- /api/orders first page, projected, and the last page reached by
+  following the cursors (keyset pages cost the same wherever they are).
+
+There is no HTML order history to compare with. Bytes are the response
+body as sent, uncompressed.
+
+    python -m tools.api_benchmark --pizzas 60 --products 40 --repeat 500
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from load_from_sql import load_streaming
+from tools import generate_data
+from tools.render_benchmark import pad_catalog
+
+
+def busiest_customer(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("""
+            SELECT c.email, COUNT(*) FROM Orders o JOIN Customer c ON c.customer_id = o.customer_id
+            GROUP BY o.customer_id ORDER BY COUNT(*) DESC LIMIT 1
+        """).fetchone()
+
+
+def last_page_url(client, url):
+    """Follow next_cursor to the last page of ``url``"""
+    cursor = None
+    while True:
+        body = client.get(url + (f"&cursor={cursor}" if cursor else "")).get_json()
+        if not body['next_cursor']:
+            return url + (f"&cursor={cursor}" if cursor else "")
+        cursor = body['next_cursor']
+
+
+def measure(client, url, repeat):
+    """(bytes, median ms, p99 ms)"""
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        response = client.get(url)
+        samples.append((time.perf_counter() - t0) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+        size = len(response.get_data())
+    samples.sort()
+    return size, statistics.median(samples), samples[max(0, int(len(samples) * 0.99) - 1)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON API vs HTML pages: bytes and latency")
+    parser.add_argument('--customers', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--pizzas', type=int, default=60, help="active pizzas in the catalog (padded)")
+    parser.add_argument('--products', type=int, default=40, help="active products in the catalog (padded)")
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='pizza-api-') as workdir:
+        db_path = os.path.join(workdir, 'api.db')
+        sql_path = os.path.join(workdir, 'generated.sql')
+        print(f"• generating {args.customers} customers / {args.orders} orders", file=sys.stderr)
+        with open(sql_path, 'w', encoding='utf-8') as out:
+            generate_data.generate(out, args.customers, args.orders,
+                                   end=datetime.now().replace(second=0, microsecond=0))
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_streaming(db_path, [generate_data.SAMPLE_DATA_PATH, sql_path])
+        pad_catalog(db_path, args.pizzas, args.products)
+        email, order_count = busiest_customer(db_path)
+
+        os.environ['PIZZA_DATABASE_URI'] = f"sqlite:///{os.path.abspath(db_path)}"
+        from main import create_app
+        app = create_app()
+        app.config['TESTING'] = True
+        client = app.test_client()
+        client.post('/signin', data={'email': email, 'password': generate_data.PASSWORD})
+
+        pages = [
+            ('GET / (HTML)', '/'),
+            ('/api/menu', '/api/menu?limit=200'),
+            ('/api/menu name,price', '/api/menu?limit=200&fields=pizza_id,name,price'),
+            ('GET /products (HTML)', '/products'),
+            ('/api/products', '/api/products?limit=200'),
+            ('/api/products name,price', '/api/products?limit=200&fields=product_id,name,price'),
+            ('/api/orders', '/api/orders?limit=50'),
+            ('/api/orders status,total', '/api/orders?limit=50&fields=order_id,status,total_amount'),
+            ('/api/orders last page', last_page_url(client, '/api/orders?limit=50')),
+        ]
+
+        print(f"{args.pizzas} pizzas, {args.products} products, {order_count} orders for the "
+              f"signed-in customer; {args.repeat} requests each")
+        print(f"{'request':<28} {'bytes':>8} {'median ms':>10} {'p99 ms':>8}")
+        for label, url in pages:
+            client.get(url)  # warm caches
+            size, median, p99 = measure(client, url, args.repeat)
+            print(f"{label:<28} {size:>8} {median:>10.2f} {p99:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+"""
+Query benchmark for the business views and the queries the routes issue.
+
+For every data size the runner generates a seeded dataset
+(tools/generate_data.py), loads it with the streaming loader into a
+scratch database and then:
+
+- times every view in business_queries.sql (``SELECT *``, rows fetched);
+- drives the routes (views/) with Flask's test client in a subprocess
+  pointed at that database through PIZZA_DATABASE_URI, recording each SQL
+  statement with SQLAlchemy engine events.
+
+Results go to a JSON report that can be compared with an older one:
+
+    python -m tools.benchmark --sizes 1000x10000 10000x100000 -o bench.json
+    python -m tools.benchmark --sizes 1000x10000 10000x100000 -o new.json --compare bench.json
+
+Statement timings cover cursor.execute() only; rows fetched afterwards are
+part of the route timing.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from load_from_sql import load_streaming
+from tools import generate_data
+
+QUERIES_PATH = 'database_layer/business_queries.sql'
+COUNTED_TABLES = ['Customer', 'DeliveryPerson', 'Orders', 'OrderPizza', 'OrderProduct', 'UsedDiscountCode']
+
+SIGNIN = {'email': 'john.smith@example.com', 'password': 'Password1!'}
+NOISE_FLOOR_MS = 1.0  # timings below this are treated as equal when comparing
+
+
+def _timing(samples):
+    return {
+        'runs': len(samples),
+        'min_ms': round(min(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def parse_size(text):
+    """'1000x10000' -> (1000 customers, 10000 orders)"""
+    match = re.fullmatch(r'(\d+)x(\d+)', text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"size must look like CUSTOMERSxORDERS, got {text!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def view_names():
+    with open(QUERIES_PATH, 'r', encoding='utf-8') as f:
+        return re.findall(r'CREATE\s+VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)', f.read(), re.IGNORECASE)
+
+
+def time_views(db_path, repeat):
+    """Median/min/max milliseconds for SELECT * on every business view"""
+    conn = sqlite3.connect(db_path)
+    results = {}
+    for name in view_names():
+        samples = []
+        try:
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                rows = conn.execute(f"SELECT * FROM {name}").fetchall()
+                samples.append((time.perf_counter() - t0) * 1000)
+        except sqlite3.Error as e:
+            results[name] = {'error': str(e)}
+            continue
+        results[name] = dict(_timing(samples), rows=len(rows))
+    conn.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Route driver (runs in a subprocess so the app binds to the scratch database)
+# ---------------------------------------------------------------------------
+
+class StatementRecorder:
+    """Collect (statement, milliseconds) for every cursor execute on an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.statements = []
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('benchmark_started', []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - conn.info['benchmark_started'].pop()) * 1000
+        self.statements.append((' '.join(statement.split()), elapsed))
+
+
+def _scenario(client):
+    """One customer session through every route; yields (label, response)"""
+    yield 'GET /', client.get('/')
+    yield 'GET /products', client.get('/products')
+    yield 'GET /signin', client.get('/signin')
+    yield 'POST /signin', client.post('/signin', data=SIGNIN)
+    yield 'GET / (signed in)', client.get('/')
+    yield 'POST /add_to_cart/<pizza_id>', client.post('/add_to_cart/1')
+    yield 'POST /add_to_cart/<pizza_id>', client.post('/add_to_cart/2')
+    yield 'POST /add_product_to_cart/<product_id>', client.post('/add_product_to_cart/5', data={'quantity': '2'})
+    yield 'GET /cart', client.get('/cart')
+    yield 'POST /apply_discount', client.post('/apply_discount', data={'discount_code': 'LOYAL15'})
+    checkout = client.get('/checkout')
+    yield 'GET /checkout', checkout
+    form = dict(re.findall(r'name="(\w+)" value="([^"]*)"', checkout.get_data(as_text=True)))
+    yield 'POST /place_order', client.post('/place_order', data=form)
+    undelivered = client.get('/reports?type=undelivered')
+    yield 'GET /reports?type=undelivered', undelivered
+    for report in ('top_pizzas', 'earnings'):
+        yield f'GET /reports?type={report}', client.get(f'/reports?type={report}')
+    yield 'GET /reports?type=earnings (filtered)', client.get('/reports?type=earnings&gender=F&age=25_40')
+    # Newest undelivered order first: the one just placed
+    cancel_url = re.search(r'/orders/\d+/cancel', undelivered.get_data(as_text=True))
+    if cancel_url:
+        yield 'POST /orders/<order_id>/cancel', client.post(cancel_url.group())
+    yield 'GET /logout', client.get('/logout')
+
+
+def drive_routes(repeat):
+    """Run the scenario ``repeat`` times against main.create_app() and summarise it"""
+    from main import create_app
+    from ORM import db
+
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        recorder = StatementRecorder(db.engine)
+
+    routes = {}
+    queries = {}
+    for _ in range(repeat):
+        client = app.test_client()
+        requests = iter(_scenario(client))
+        while True:
+            recorder.statements.clear()
+            t0 = time.perf_counter()
+            try:
+                label, response = next(requests)
+            except StopIteration:
+                break
+            elapsed = (time.perf_counter() - t0) * 1000
+            if response.status_code >= 500:
+                raise RuntimeError(f"{label} returned {response.status_code}")
+            stats = routes.setdefault(label, {'ms': [], 'queries': [], 'query_ms': []})
+            stats['ms'].append(elapsed)
+            stats['queries'].append(len(recorder.statements))
+            stats['query_ms'].append(sum(ms for _, ms in recorder.statements))
+            for statement, ms in recorder.statements:
+                query = queries.setdefault(statement, {'sql': statement, 'calls': 0, 'total_ms': 0.0,
+                                                       'max_ms': 0.0, 'routes': set()})
+                query['calls'] += 1
+                query['total_ms'] += ms
+                query['max_ms'] = max(query['max_ms'], ms)
+                query['routes'].add(label)
+
+    summary = {}
+    for label, stats in routes.items():
+        summary[label] = dict(_timing(stats['ms']),
+                              queries_per_request=statistics.median(stats['queries']),
+                              query_ms=round(statistics.median(stats['query_ms']), 3))
+    query_list = []
+    for query in sorted(queries.values(), key=lambda q: -q['total_ms']):
+        query_list.append(dict(query, total_ms=round(query['total_ms'], 3), max_ms=round(query['max_ms'], 3),
+                               mean_ms=round(query['total_ms'] / query['calls'], 3),
+                               routes=sorted(query['routes'])))
+    return {'routes': summary, 'queries': query_list}
+
+
+def run_routes(db_path, repeat):
+    env = dict(os.environ, PIZZA_DATABASE_URI=f"sqlite:///{os.path.abspath(db_path)}")
+    result = subprocess.run([sys.executable, '-m', 'tools.benchmark', '--routes-db', db_path,
+                             '--repeat', str(repeat)],
+                            env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"route benchmark failed:\n{result.stderr[-3000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def benchmark_size(customers, orders, workdir, seed, repeat):
+    label = f"{customers}x{orders}"
+    sql_path = os.path.join(workdir, f"generated_{label}.sql")
+    db_path = os.path.join(workdir, f"benchmark_{label}.db")
+
+    print(f"• {label}: generating data", file=sys.stderr)
+    end = datetime.now().replace(second=0, microsecond=0)
+    with open(sql_path, 'w', encoding='utf-8') as out:
+        generate_data.generate(out, customers, orders, seed=seed, end=end)
+
+    print(f"• {label}: loading", file=sys.stderr)
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_streaming(db_path, [generate_data.SAMPLE_DATA_PATH, sql_path])
+    load_seconds = time.perf_counter() - t0
+
+    conn = sqlite3.connect(db_path)
+    rows = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in COUNTED_TABLES}
+    conn.close()
+
+    print(f"• {label}: timing views", file=sys.stderr)
+    views = time_views(db_path, repeat)
+    print(f"• {label}: driving routes", file=sys.stderr)
+    routes = run_routes(db_path, repeat)
+
+    return {
+        'label': label,
+        'customers': customers,
+        'orders': orders,
+        'end': end.isoformat(sep=' '),
+        'rows': rows,
+        'load_seconds': round(load_seconds, 3),
+        'db_bytes': os.path.getsize(db_path),
+        'views': views,
+        'routes': routes['routes'],
+        'queries': routes['queries'],
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, report, threshold):
+    """Print timing/query-count changes against a baseline; return the regressions"""
+    regressions = []
+    baseline_sizes = {size['label']: size for size in baseline.get('sizes', [])}
+    for size in report['sizes']:
+        base = baseline_sizes.get(size['label'])
+        if base is None:
+            print(f"{size['label']}: not in baseline")
+            continue
+        for section in ('views', 'routes'):
+            for name, current in size[section].items():
+                old = base[section].get(name, {})
+                if 'median_ms' not in old or 'median_ms' not in current:
+                    continue
+                ratio = max(current['median_ms'], NOISE_FLOOR_MS) / max(old['median_ms'], NOISE_FLOOR_MS)
+                more_queries = current.get('queries_per_request', 0) > old.get('queries_per_request', 0)
+                flag = ratio > threshold or more_queries
+                line = (f"{size['label']} {section[:-1]} {name}: {old['median_ms']:.2f}ms -> "
+                        f"{current['median_ms']:.2f}ms (x{ratio:.2f})")
+                if section == 'routes':
+                    line += f", queries {old.get('queries_per_request')} -> {current.get('queries_per_request')}"
+                print(('REGRESSION ' if flag else '           ') + line)
+                if flag:
+                    regressions.append(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the business views and route queries")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[(1000, 10000), (10000, 100000)],
+                        metavar='CUSTOMERSxORDERS', help="data sizes (default: 1000x10000 10000x100000)")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per view / route scenario")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-o', '--output', default='-', help="JSON report path (default: stdout)")
+    parser.add_argument('--keep', metavar='DIR', help="keep generated SQL and databases in DIR")
+    parser.add_argument('--compare', metavar='JSON', help="baseline report to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown ratio reported as a regression (default: 1.25)")
+    parser.add_argument('--routes-db', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.routes_db:
+        print(json.dumps(drive_routes(args.repeat)))
+        return
+
+    if args.keep:
+        os.makedirs(args.keep, exist_ok=True)
+        workdir = contextlib.nullcontext(args.keep)
+    else:
+        workdir = tempfile.TemporaryDirectory(prefix='pizza-benchmark-')
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'sizes': [],
+    }
+    with workdir as path:
+        for customers, orders in args.sizes:
+            report['sizes'].append(benchmark_size(customers, orders, path, args.seed, args.repeat))
+
+    text = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✓ Wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} regression(s) against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Parallel readers and writers against one SQLite file, with and without the
+connection profile (services/sqlite_profile.py).
+
+Each worker is a separate process that creates the app (like a server
+worker would) and drives it with Flask's test client: writers sign in and
+place orders, readers hit the menu, products and report pages. Any
+exception ("database is locked" and friends) counts as an error.
+
+    python -m tools.concurrency_check --writers 4 --readers 8 --seconds 10
+    python -m tools.concurrency_check --read-bind --profile-only
+    python -m tools.concurrency_check --analytics-snapshot --profile-only --db big.db
+
+The database is a scratch copy built from the sample data, unless --db is
+given (that file is modified). Exits non-zero if the profiled run had errors.
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+
+from load_from_sql import clone_template
+
+READ_URLS = ['/', '/products', '/reports?type=undelivered', '/reports?type=top_pizzas',
+             '/reports?type=earnings', '/reports?type=earnings&gender=F&age=25_40']
+
+
+def _writer(client, email, password):
+    client.post('/signin', data={'email': email, 'password': password})
+    while True:
+        client.post('/add_to_cart/1')
+        client.post('/add_product_to_cart/5', data={'quantity': '1'})
+        checkout = client.get('/checkout')
+        form = dict(re.findall(r'name="(\w+)" value="([^"]*)"', checkout.get_data(as_text=True)))
+        response = client.post('/place_order', data=form)
+        yield response
+
+
+def _reader(client):
+    while True:
+        for url in READ_URLS:
+            yield client.get(url)
+
+
+def _worker(role, index, db_path, seconds, profile, read_bind, snapshot=False):
+    """Run one role until the deadline; returns (role, ok, Counter of errors)"""
+    os.environ['PIZZA_DATABASE_URI'] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ['PIZZA_SQLITE_PROFILE'] = '1' if profile else '0'
+    os.environ['PIZZA_SQLITE_READ_BIND'] = '1' if read_bind else '0'
+    os.environ['PIZZA_ANALYTICS_SNAPSHOT'] = '1' if snapshot else '0'
+    os.environ.setdefault('PIZZA_ANALYTICS_SNAPSHOT_INTERVAL', str(max(1, int(seconds // 4))))
+    from main import create_app
+    from ORM import db
+
+    app = create_app({'TESTING': True})  # exceptions reach the test client
+    with sqlite3.connect(db_path) as conn:
+        customers = conn.execute("SELECT email, password FROM Customer ORDER BY customer_id").fetchall()
+    client = app.test_client()
+    email, password = customers[index % len(customers)]
+    requests = _writer(client, email, password) if role == 'writer' else _reader(client)
+
+    ok = 0
+    errors = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            response = next(requests)
+            if response.status_code >= 500:
+                errors[f"HTTP {response.status_code}"] += 1
+            else:
+                ok += 1
+        except Exception as e:
+            errors[str(e).splitlines()[0][:120]] += 1
+            with app.app_context():
+                db.session.rollback()
+            requests = _writer(client, email, password) if role == 'writer' else _reader(client)
+    return role, ok, errors
+
+
+def build_database(path):
+    clone_template(path)   # sample data, from the loader's cached template
+
+
+def run(db_path, writers, readers, seconds, profile, read_bind, snapshot=False):
+    if not profile:
+        # The profile turns WAL on and that sticks to the file: go back to a rollback journal
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("PRAGMA journal_mode = DELETE")
+
+    with sqlite3.connect(db_path) as conn:
+        orders_before = conn.execute("SELECT COUNT(*) FROM Orders").fetchone()[0]
+
+    jobs = [('writer', i) for i in range(writers)] + [('reader', i) for i in range(readers)]
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(len(jobs)) as pool:
+        results = pool.starmap(_worker, [(role, i, db_path, seconds, profile, read_bind, snapshot)
+                                         for role, i in jobs])
+
+    totals = {'writer': [0, Counter()], 'reader': [0, Counter()]}
+    for role, ok, errors in results:
+        totals[role][0] += ok
+        totals[role][1].update(errors)
+    with sqlite3.connect(db_path) as conn:
+        placed = conn.execute("SELECT COUNT(*) FROM Orders").fetchone()[0] - orders_before
+    return totals, placed
+
+
+def report(label, result, seconds):
+    totals, placed = result
+    print(f"\n{label}")
+    print(f"  orders placed: {placed} ({placed / seconds:.1f}/s)")
+    for role, (ok, errors) in totals.items():
+        print(f"  {role}s: {ok} ok ({ok / seconds:.1f}/s), {sum(errors.values())} errors")
+        for message, count in errors.most_common(5):
+            print(f"    {count} × {message}")
+    return sum(sum(errors.values()) for _, errors in totals.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel readers/writers against the SQLite database")
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--read-bind', action='store_true', help="serve reads from the read-only pool")
+    parser.add_argument('--analytics-snapshot', action='store_true',
+                        help="reports read the analytics snapshot (refreshed every seconds/4)")
+    parser.add_argument('--profile-only', action='store_true', help="skip the run without the profile")
+    parser.add_argument('--db', help="database to use (default: scratch copy of the sample data)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='pizza-concurrency-') as workdir:
+        db_path = args.db or os.path.join(workdir, 'database.db')
+        if not args.db:
+            build_database(db_path)
+
+        print(f"{args.writers} writer and {args.readers} reader processes, {args.seconds:g}s per run")
+        if not args.profile_only:
+            report("Default SQLite settings (rollback journal, no profile):",
+                   run(db_path, args.writers, args.readers, args.seconds, False, False), args.seconds)
+        extras = (', read-only pool' if args.read_bind else '') + \
+                 (', analytics snapshot' if args.analytics_snapshot else '')
+        errors = report(f"SQLite profile (WAL, busy_timeout{extras}):",
+                        run(db_path, args.writers, args.readers, args.seconds, True, args.read_bind,
+                            args.analytics_snapshot),
+                        args.seconds)
+
+    if errors:
+        raise SystemExit(f"{errors} errors with the SQLite profile")
+    print("\n✓ No errors with the SQLite profile")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Concurrent orders for one postcode: are couriers ever double-assigned?
+
+Every worker is a separate process that creates the app and places orders
+through Flask's test client (tools/concurrency_check.py's writer), all for
+customers in the same postcode, so every order contends for the same few
+couriers through the dispatcher's conditional claim (services/dispatch.py).
+Afterwards, for every courier with n new orders:
+
+- its version went up by exactly n (every assignment was one successful
+  claim, none was lost or applied twice);
+- its available_at is at least its first new order + n × 30 minutes (the
+  claims chained; two orders started from the same availability would
+  leave it 30 minutes short);
+
+and no order for the postcode is left without a courier. Lost claims
+(conditional UPDATEs that matched nothing and were retried on the next
+candidate) are counted per process.
+
+    python -m tools.dispatch_stress --workers 8 --couriers 4 --seconds 10
+
+The database is a scratch copy built from the sample data. Exits non-zero
+if any check fails.
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+from tools.concurrency_check import _writer, build_database
+
+COOLDOWN_MINUTES = 30
+
+
+def _worker(index, db_path, postcode, seconds):
+    """Place orders until the deadline; returns (ok, Counter of errors, lost claims)"""
+    os.environ['PIZZA_DATABASE_URI'] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ['PIZZA_SQLITE_PROFILE'] = '1'
+    from main import create_app
+    from ORM import db
+    from services.dispatch import dispatcher
+
+    app = create_app({'TESTING': True})
+    with sqlite3.connect(db_path) as conn:
+        customers = conn.execute("SELECT email, password FROM Customer WHERE postcode = ? "
+                                 "ORDER BY customer_id", (postcode,)).fetchall()
+    client = app.test_client()
+    email, password = customers[index % len(customers)]
+    requests = _writer(client, email, password)
+
+    ok = 0
+    errors = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            response = next(requests)
+            if response.status_code >= 500:
+                errors[f"HTTP {response.status_code}"] += 1
+            else:
+                ok += 1
+        except Exception as e:
+            errors[str(e).splitlines()[0][:120]] += 1
+            with app.app_context():
+                db.session.rollback()
+            requests = _writer(client, email, password)
+    return ok, errors, dispatcher.claim_conflicts
+
+
+def add_couriers(db_path, postcode, count):
+    """Make sure the postcode has ``count`` couriers"""
+    with sqlite3.connect(db_path) as conn:
+        have = conn.execute("SELECT COUNT(*) FROM DeliveryPerson WHERE postcode = ?", (postcode,)).fetchone()[0]
+        conn.executemany("INSERT INTO DeliveryPerson (full_name, phone, postcode) VALUES (?, ?, ?)",
+                         [(f"Stress Courier {n}", f"+1-555-9{n:03d}", postcode) for n in range(have, count)])
+
+
+def couriers(conn, postcode):
+    """delivery_person_id -> (available_at, version)"""
+    return {courier_id: (available_at, version) for courier_id, available_at, version in conn.execute(
+        "SELECT delivery_person_id, available_at, version FROM DeliveryPerson WHERE postcode = ?", (postcode,))}
+
+
+def check(db_path, postcode, before, first_order_id):
+    """List of problems found (empty when every claim was exclusive)"""
+    problems = []
+    with sqlite3.connect(db_path) as conn:
+        after = couriers(conn, postcode)
+        assigned = {courier_id: (count, first) for courier_id, count, first in conn.execute("""
+            SELECT delivery_person_id, COUNT(*), MIN(order_time) FROM Orders
+            WHERE order_id >= ? AND delivery_person_id IS NOT NULL
+            GROUP BY delivery_person_id
+        """, (first_order_id,))}
+        unassigned = conn.execute(
+            "SELECT COUNT(*) FROM Orders WHERE order_id >= ? AND delivery_person_id IS NULL",
+            (first_order_id,)).fetchone()[0]
+
+    for courier_id, (count, first) in sorted(assigned.items()):
+        if courier_id not in after:
+            problems.append(f"courier {courier_id} is not in postcode {postcode}")
+            continue
+        available_at, version = after[courier_id]
+        if version - before[courier_id][1] != count:
+            problems.append(f"courier {courier_id}: {count} orders but version went "
+                            f"{before[courier_id][1]} -> {version}")
+        earliest = datetime.fromisoformat(str(first)).timestamp() + count * COOLDOWN_MINUTES * 60
+        if datetime.fromisoformat(str(available_at)).timestamp() < earliest - 1:
+            problems.append(f"courier {courier_id}: {count} orders from {first} but available at "
+                            f"{available_at} (overlapping deliveries)")
+    if unassigned:
+        problems.append(f"{unassigned} orders left without a courier")
+    return problems, assigned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent orders for one postcode: no double assignment")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--couriers', type=int, default=4, help="couriers in the postcode")
+    parser.add_argument('--postcode', default='10001')
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='pizza-dispatch-') as workdir:
+        db_path = os.path.join(workdir, 'database.db')
+        build_database(db_path)
+        add_couriers(db_path, args.postcode, args.couriers)
+        with sqlite3.connect(db_path) as conn:
+            before = couriers(conn, args.postcode)
+            first_order_id = conn.execute("SELECT COALESCE(MAX(order_id), 0) + 1 FROM Orders").fetchone()[0]
+
+        print(f"{args.workers} processes ordering for postcode {args.postcode} "
+              f"({len(before)} couriers) for {args.seconds:g}s")
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(args.workers) as pool:
+            results = pool.starmap(_worker, [(i, db_path, args.postcode, args.seconds)
+                                             for i in range(args.workers)])
+        problems, assigned = check(db_path, args.postcode, before, first_order_id)
+
+    ok = sum(r[0] for r in results)
+    errors = Counter()
+    for r in results:
+        errors.update(r[1])
+    conflicts = sum(r[2] for r in results)
+    placed = sum(count for count, _ in assigned.values())
+    print(f"  orders placed: {placed} ({placed / args.seconds:.1f}/s), {ok} requests ok, "
+          f"{sum(errors.values())} errors")
+    for message, count in errors.most_common(5):
+        print(f"    {count} × {message}")
+    print(f"  lost claims retried on the next courier: {conflicts}")
+    print(f"  orders per courier: {', '.join(f'{c}: {n}' for c, (n, _) in sorted(assigned.items()))}")
+
+    if problems or errors:
+        for problem in problems:
+            print(f"  ✗ {problem}")
+        raise SystemExit(f"{len(problems)} problems, {sum(errors.values())} errors")
+    print("\n✓ Every order got its own courier slot")
+
+
+if __name__ == '__main__':
+    main()
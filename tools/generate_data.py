@@ -0,0 +1,409 @@
+"""
+Seeded synthetic data for scaling tests.
+
+Writes MySQL-syntax INSERTs (the dialect of database_layer/sample_data.sql)
+meant to be loaded on top of the sample data. Strings are escaped with
+backslashes the way mysqldump does (a quote as backslash-quote), so every
+load also runs the streaming loader's decode-and-executemany path, not
+just the statements SQLite can execute as they are:
+
+    python -m tools.generate_data --customers 10000 --orders 100000 -o /tmp/generated.sql
+    python load_from_sql.py --streaming --data database_layer/sample_data.sql /tmp/generated.sql --db /tmp/big.db
+
+The menu, products and discount codes come from the sample data. The
+generator adds customers, couriers, orders with pizza/product lines and
+discount code usage. Customer activity and pizza popularity are skewed,
+orders follow lunch/dinner peaks with busier weekends, and recent orders
+are still in progress. The same arguments (including --end) always
+produce the same file.
+"""
+import argparse
+import io
+import random
+import sqlite3
+import sys
+from bisect import bisect
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+from load_from_sql import (iter_sql_statements, mysql_to_sqlite_data,
+                           mysql_to_sqlite_schema, mysql_to_sqlite_views)
+
+SCHEMA_PATH = 'database_layer/schema.sql'
+SAMPLE_DATA_PATH = 'database_layer/sample_data.sql'
+QUERIES_PATH = 'database_layer/business_queries.sql'
+
+ROWS_PER_INSERT = 1000
+PASSWORD = 'Password1!'  # every generated customer signs in with this
+LOYALTY_THRESHOLD = 10  # same rule as services/loyalty.py
+COURIER_COOLDOWN = timedelta(minutes=30)  # same rule as services/dispatch.py
+
+# mysqldump's string escapes (load_from_sql._MYSQL_ESCAPES decodes them)
+MYSQL_ESCAPES = str.maketrans({'\\': '\\\\', "'": "\\'", '\n': '\\n', '\r': '\\r',
+                               '\0': '\\0', '\x1a': '\\Z'})
+
+FIRST_NAMES = [
+    'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+    'William', 'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
+    'Thomas', 'Sarah', 'Carlos', 'Karen', 'Daniel', 'Nancy', 'Matteo', 'Lisa', 'Anthony',
+    'Sofia', 'Mark', 'Giulia', 'Paul', 'Emma', 'Kevin', 'Chiara', 'Brian', "Siobhán",
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+    'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson',
+    'Rossi', 'Russo', 'Ferrari', 'Esposito', 'Bianchi', 'Romano', 'Colombo', 'Ricci',
+    'Marino', 'Greco', "O'Brien", 'Bruno', 'Gallo', 'Conti', 'De Luca', 'Costa',
+]
+GENDERS = ['M', 'F', 'Other']
+GENDER_WEIGHTS = [48, 48, 4]
+
+# Share of orders per hour of the day: lunch and dinner peaks
+HOUR_WEIGHTS = {11: 4, 12: 10, 13: 9, 14: 4, 15: 2, 16: 2, 17: 5,
+                18: 11, 19: 14, 20: 12, 21: 7, 22: 3}
+
+OPEN_WINDOW = timedelta(minutes=90)  # orders younger than this are still in progress
+CANCEL_RATE = 0.03
+CODE_RATE = 0.05
+DRINK_RATE = 0.5
+SNACK_RATE = 0.25
+
+ORDER_COLUMNS = ('order_id', 'customer_id', 'order_time', 'status', 'discount_code',
+                 'delivery_person_id', 'postcode_snapshot', 'delivered_at', 'cancelled_at',
+                 'total_amount', 'applied_discount')
+PIZZA_LINE_COLUMNS = ('order_id', 'pizza_id', 'quantity', 'unit_price', 'name_snapshot')
+PRODUCT_LINE_COLUMNS = ('order_id', 'product_id', 'quantity', 'unit_price', 'name_snapshot')
+
+
+@dataclass
+class Catalog:
+    """What the generated rows build on: the sample menu and the next free ids"""
+    pizzas: list      # (pizza_id, name, price) of active pizzas
+    drinks: list      # (product_id, name, cost)
+    snacks: list
+    codes: list       # (code, percent_off, amount_off, single_use)
+    couriers: dict    # postcode -> [delivery_person_id]
+    used_codes: set   # (customer_id, code) pairs already taken
+    next_customer_id: int
+    next_courier_id: int
+    next_order_id: int
+
+
+@dataclass
+class Summary:
+    rows: dict = field(default_factory=dict)
+
+    def __str__(self):
+        return ', '.join(f"{table}: {count}" for table, count in self.rows.items())
+
+
+def load_catalog():
+    """Build the sample database in memory and read the catalog from it"""
+    conn = sqlite3.connect(':memory:')
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        for statement in iter_sql_statements(io.StringIO(mysql_to_sqlite_schema(f.read()))):
+            conn.execute(statement)
+    with open(SAMPLE_DATA_PATH, 'r', encoding='utf-8') as f:
+        for statement in iter_sql_statements(f):
+            conn.execute(mysql_to_sqlite_data(statement))
+    with open(QUERIES_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(mysql_to_sqlite_views(f.read()))
+
+    def next_id(table, column):
+        return conn.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}").fetchone()[0]
+
+    couriers = {}
+    for courier_id, postcode in conn.execute(
+            "SELECT delivery_person_id, postcode FROM DeliveryPerson ORDER BY delivery_person_id"):
+        couriers.setdefault(postcode, []).append(courier_id)
+
+    products = conn.execute(
+        "SELECT product_id, name, cost, category FROM Product WHERE active = 1 ORDER BY product_id"
+    ).fetchall()
+    catalog = Catalog(
+        pizzas=conn.execute(
+            "SELECT pizza_id, name, ROUND(price, 2) FROM PizzaMenu WHERE active = 1 ORDER BY pizza_id"
+        ).fetchall(),
+        drinks=[p[:3] for p in products if p[3] == 'drink'],
+        snacks=[p[:3] for p in products if p[3] == 'snack'],
+        codes=conn.execute(
+            "SELECT code, percent_off, amount_off, single_use FROM DiscountCode ORDER BY code"
+        ).fetchall(),
+        couriers=couriers,
+        used_codes=set(conn.execute("SELECT customer_id, code FROM UsedDiscountCode")),
+        next_customer_id=next_id('Customer', 'customer_id'),
+        next_courier_id=next_id('DeliveryPerson', 'delivery_person_id'),
+        next_order_id=next_id('Orders', 'order_id'),
+    )
+    conn.close()
+    return catalog
+
+
+def _sql(value):
+    """Format a Python value as a MySQL literal"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if isinstance(value, datetime):
+        return f"'{value:%Y-%m-%d %H:%M:%S}'"
+    if isinstance(value, date):
+        return f"'{value.isoformat()}'"
+    return "'" + str(value).translate(MYSQL_ESCAPES) + "'"
+
+
+class _InsertWriter:
+    """Buffer rows per table and write them out as multi-row INSERTs"""
+
+    def __init__(self, out, summary, rows_per_insert=ROWS_PER_INSERT):
+        self.out = out
+        self.summary = summary
+        self.rows_per_insert = rows_per_insert
+        self._columns = {}
+        self._rows = {}
+
+    def add(self, table, columns, values):
+        self._columns[table] = columns
+        rows = self._rows.setdefault(table, [])
+        rows.append('(' + ', '.join(map(_sql, values)) + ')')
+        if len(rows) >= self.rows_per_insert:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in [table] if table else list(self._rows):
+            rows = self._rows.get(name)
+            if not rows:
+                continue
+            self.out.write(f"INSERT INTO {name} ({', '.join(self._columns[name])}) VALUES\n")
+            self.out.write(',\n'.join(rows))
+            self.out.write(';\n\n')
+            self.summary.rows[name] = self.summary.rows.get(name, 0) + len(rows)
+            rows.clear()
+
+
+class _WeightedPicker:
+    """Fast repeated weighted choice from a fixed population"""
+
+    def __init__(self, rng, items, weights):
+        self.rng = rng
+        self.items = items
+        self.cum_weights = list(accumulate(weights))
+        self.total = self.cum_weights[-1]
+
+    def pick(self):
+        return self.items[bisect(self.cum_weights, self.rng.random() * self.total)]
+
+    def pick_distinct(self, n):
+        n = min(n, len(self.items))
+        chosen = []
+        while len(chosen) < n:
+            item = self.pick()
+            if item not in chosen:
+                chosen.append(item)
+        return chosen
+
+
+def _zipf(rng, items, exponent=1.0):
+    """Weighted picker where popularity follows a Zipf curve in shuffled order"""
+    items = list(items)
+    rng.shuffle(items)
+    return _WeightedPicker(rng, items, [1 / (rank + 1) ** exponent for rank in range(len(items))])
+
+
+def _postcodes(catalog, count):
+    """The sample postcodes, extended with new five-digit postcodes up to count"""
+    postcodes = sorted(catalog.couriers)
+    candidate = int(postcodes[-1]) + 1 if postcodes else 10001
+    while len(postcodes) < count:
+        postcodes.append(f"{candidate:05d}")
+        candidate += 1
+    return postcodes
+
+
+def _quantity(rng):
+    r = rng.random()
+    return 1 if r < 0.8 else 2 if r < 0.95 else 3
+
+
+def generate(out, customers=1000, orders=10000, seed=42, couriers=None, postcodes=None,
+             days=365, end=None, catalog=None):
+    """Write the synthetic data to the file object ``out`` and return a Summary"""
+    rng = random.Random(seed)
+    catalog = catalog or load_catalog()
+    end = end or datetime.now().replace(second=0, microsecond=0)
+    postcodes = _postcodes(catalog, postcodes or max(5, min(200, customers // 400)))
+    couriers = couriers if couriers is not None else max(len(postcodes), customers // 250)
+    summary = Summary()
+    writer = _InsertWriter(out, summary)
+
+    out.write(f"-- Generated by tools/generate_data.py: seed={seed} customers={customers} "
+              f"orders={orders} days={days} end={end:%Y-%m-%d %H:%M}\n\n")
+
+    # Couriers: every postcode gets at least one, the rest go round-robin
+    courier_ids = {postcode: list(catalog.couriers.get(postcode, [])) for postcode in postcodes}
+    courier_id = catalog.next_courier_id
+    for i in range(couriers):
+        postcode = postcodes[i % len(postcodes)]
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        writer.add('DeliveryPerson', ('delivery_person_id', 'full_name', 'phone', 'postcode', 'last_delivery_at'),
+                   (courier_id, name, f"+1-556-{courier_id:06d}", postcode, None))
+        courier_ids[postcode].append(courier_id)
+        courier_id += 1
+    writer.flush()
+
+    # Customers: a few busy postcodes, ages skewed towards 25-40
+    postcode_picker = _WeightedPicker(rng, postcodes, [1 / (rank + 1) ** 0.8 for rank in range(len(postcodes))])
+    customer_ids = list(range(catalog.next_customer_id, catalog.next_customer_id + customers))
+    customer_postcodes = []
+    customer_birthdays = []
+    for customer_id in customer_ids:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        age = int(rng.triangular(18, 80, 30))
+        birth_date = end.date() - timedelta(days=age * 365 + rng.randrange(365) + age // 4)
+        postcode = postcode_picker.pick()
+        email = f"{first}.{last}.{customer_id}@example.com".lower().replace(' ', '').replace("'", '')
+        writer.add('Customer', ('customer_id', 'first_name', 'last_name', 'email', 'password',
+                                'birth_date', 'postcode', 'gender'),
+                   (customer_id, first, last, email, PASSWORD, birth_date, postcode,
+                    rng.choices(GENDERS, GENDER_WEIGHTS)[0]))
+        customer_postcodes.append(postcode)
+        customer_birthdays.append((birth_date.month, birth_date.day))
+    writer.flush()
+
+    # Orders: a long tail of regulars (Pareto), busier weekends, growth over the period
+    customer_picker = _WeightedPicker(rng, range(customers), [rng.paretovariate(1.16) for _ in range(customers)])
+    pizza_picker = _zipf(rng, catalog.pizzas)
+    drink_picker = _zipf(rng, catalog.drinks) if catalog.drinks else None
+    snack_picker = _zipf(rng, catalog.snacks) if catalog.snacks else None
+    hours = list(HOUR_WEIGHTS)
+    hour_weights = list(HOUR_WEIGHTS.values())
+
+    first_day = end.date() - timedelta(days=days - 1)
+    day_weights = [(1.3 if (first_day + timedelta(days=i)).weekday() >= 4 else 1.0) * (0.7 + 0.6 * i / days)
+                   for i in range(days)]
+    per_day = [0] * days
+    for i in rng.choices(range(days), weights=day_weights, k=orders):
+        per_day[i] += 1
+
+    pizzas_bought = [0] * customers
+    last_delivery = {}
+    used_codes = set(catalog.used_codes)
+    order_id = catalog.next_order_id
+
+    for i, count in enumerate(per_day):
+        day_start = datetime.combine(first_day + timedelta(days=i), datetime.min.time())
+        times = []
+        for hour in rng.choices(hours, weights=hour_weights, k=count):
+            order_time = day_start + timedelta(hours=hour, seconds=rng.randrange(3600))
+            if order_time > end:
+                order_time = end - timedelta(seconds=rng.randrange(3 * 3600))
+            times.append(order_time)
+        times.sort()
+
+        for order_time in times:
+            index = customer_picker.pick()
+            customer_id = customer_ids[index]
+            postcode = customer_postcodes[index]
+
+            pizza_count = 1
+            while pizza_count < 4 and rng.random() < 0.35:
+                pizza_count += 1
+            pizza_lines = [(pizza, _quantity(rng)) for pizza in pizza_picker.pick_distinct(pizza_count)]
+            drink_lines = []
+            if drink_picker and rng.random() < DRINK_RATE:
+                drink_lines = [(drink, _quantity(rng)) for drink in drink_picker.pick_distinct(1 + (rng.random() < 0.15))]
+            snack_lines = []
+            if snack_picker and rng.random() < SNACK_RATE:
+                snack_lines = [(snack_picker.pick(), 1)]
+            subtotal = sum(item[2] * quantity for item, quantity in pizza_lines + drink_lines + snack_lines)
+
+            # Same discount rules as checkout: birthday gift, loyalty reward, discount code
+            discount = 0.0
+            if (order_time.month, order_time.day) == customer_birthdays[index]:
+                discount += min(item[2] for item, _ in pizza_lines)
+                if drink_lines:
+                    discount += min(item[2] for item, _ in drink_lines)
+            if pizzas_bought[index] >= LOYALTY_THRESHOLD:
+                discount += round(subtotal * 0.10, 2)
+            code = None
+            if catalog.codes and rng.random() < CODE_RATE:
+                code, percent_off, amount_off, single_use = rng.choice(catalog.codes)
+                if single_use and (customer_id, code) in used_codes:
+                    code = None
+                else:
+                    discount += round(subtotal * percent_off / 100, 2) if percent_off else min(amount_off, subtotal)
+                    if single_use:
+                        used_codes.add((customer_id, code))
+                        writer.add('UsedDiscountCode', ('customer_id', 'code', 'order_id', 'used_at'),
+                                   (customer_id, code, order_id, order_time))
+            discount = round(min(discount, subtotal), 2)
+
+            age = end - order_time
+            courier = rng.choice(courier_ids[postcode]) if courier_ids[postcode] else None
+            delivered_at = cancelled_at = None
+            if age < OPEN_WINDOW:
+                status = ('pending' if age < timedelta(minutes=10)
+                          else 'preparing' if age < timedelta(minutes=30) else 'out_for_delivery')
+                if status == 'pending':
+                    courier = None
+            elif rng.random() < CANCEL_RATE:
+                status = 'cancelled'
+                cancelled_at = order_time + timedelta(minutes=rng.randint(1, 15))
+                courier = None
+            else:
+                status = 'delivered'
+                delivered_at = order_time + timedelta(minutes=rng.randint(20, 60))
+                if courier is not None:
+                    last_delivery[courier] = max(last_delivery.get(courier, delivered_at), delivered_at)
+
+            writer.add('Orders', ORDER_COLUMNS,
+                       (order_id, customer_id, order_time, status, code, courier, postcode,
+                        delivered_at, cancelled_at, round(subtotal - discount, 2), discount))
+            for (pizza_id, name, price), quantity in pizza_lines:
+                writer.add('OrderPizza', PIZZA_LINE_COLUMNS,
+                           (order_id, pizza_id, quantity, price, name))
+            for (product_id, name, cost), quantity in drink_lines + snack_lines:
+                writer.add('OrderProduct', PRODUCT_LINE_COLUMNS,
+                           (order_id, product_id, quantity, cost, name))
+            if status != 'cancelled':
+                pizzas_bought[index] += sum(quantity for _, quantity in pizza_lines)
+            order_id += 1
+    writer.flush()
+
+    # Couriers' cooldowns start from their most recent delivery
+    for courier, delivered_at in sorted(last_delivery.items()):
+        out.write(f"UPDATE DeliveryPerson SET last_delivery_at = {_sql(delivered_at)}, "
+                  f"available_at = {_sql(delivered_at + COURIER_COOLDOWN)} "
+                  f"WHERE delivery_person_id = {courier};\n")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic pizza orders (MySQL INSERTs)")
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--couriers', type=int, help="new couriers (default: customers / 250)")
+    parser.add_argument('--postcodes', type=int, help="postcodes in use (default: customers / 400, 5..200)")
+    parser.add_argument('--days', type=int, default=365, help="days of order history")
+    parser.add_argument('--end', type=lambda s: datetime.strptime(s, '%Y-%m-%d %H:%M'),
+                        help="timestamp of the newest order, 'YYYY-MM-DD HH:MM' (default: now)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        summary = generate(out, args.customers, args.orders, seed=args.seed, couriers=args.couriers,
+                           postcodes=args.postcodes, days=args.days, end=args.end)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"✓ Generated {summary}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Orders per second through place_order, with and without group commit.
+
+Runs N client threads in one process (like a threaded worker), each signed
+in as a different customer and placing orders in a loop (add a pizza,
+checkout, place_order), first with every request committing its own
+order and then with ORDER_GROUP_COMMIT (services/order_queue.py).
+
+    python -m tools.order_throughput --clients 1,8,32 --seconds 10
+    python -m tools.order_throughput --synchronous FULL
+
+The database is a scratch copy built from the sample data, unless --db is
+given (that file gets the orders).
+"""
+import argparse
+import contextlib
+import io
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from load_from_sql import load_streaming
+
+
+def _client(app, email, password, deadline, errors):
+    client = app.test_client()
+    client.post('/signin', data={'email': email, 'password': password})
+    while time.monotonic() < deadline:
+        client.post('/add_to_cart/1')
+        checkout = client.get('/checkout')
+        form = dict(re.findall(r'name="(\w+)" value="([^"]*)"', checkout.get_data(as_text=True)))
+        response = client.post('/place_order', data=form)
+        if response.status_code != 200:
+            errors[f"HTTP {response.status_code}"] += 1
+
+
+def run(app, db_path, clients, seconds, group_commit):
+    """Orders committed per second (and error counts) for one setting"""
+    app.config['ORDER_GROUP_COMMIT'] = group_commit
+    with sqlite3.connect(db_path) as conn:
+        customers = conn.execute("SELECT email, password FROM Customer ORDER BY customer_id").fetchall()
+        orders_before = conn.execute("SELECT COUNT(*) FROM Orders").fetchone()[0]
+
+    errors = Counter()
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=_client, args=(app, *customers[i % len(customers)], deadline, errors))
+               for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with sqlite3.connect(db_path) as conn:
+        placed = conn.execute("SELECT COUNT(*) FROM Orders").fetchone()[0] - orders_before
+    return placed / elapsed, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="place_order throughput with and without group commit")
+    parser.add_argument('--clients', default='1,8,32', help="comma-separated concurrent client counts")
+    parser.add_argument('--seconds', type=float, default=10, help="duration of each run")
+    parser.add_argument('--synchronous', choices=['NORMAL', 'FULL'], default='NORMAL',
+                        help="SQLite synchronous setting (FULL syncs the WAL on every commit)")
+    parser.add_argument('--db', help="database to use (default: scratch copy of the sample data)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='pizza-orders-') as workdir:
+        db_path = args.db or os.path.join(workdir, 'database.db')
+        if not args.db:
+            with contextlib.redirect_stdout(io.StringIO()):
+                load_streaming(db_path)
+
+        os.environ['PIZZA_DATABASE_URI'] = f"sqlite:///{os.path.abspath(db_path)}"
+        from main import create_app
+        from ORM import db
+        app = create_app()
+        app.config['TESTING'] = True
+        from sqlalchemy import event
+        with app.app_context():
+            engine = db.engine
+            event.listen(engine, 'connect',
+                         lambda dbapi_connection, _: dbapi_connection.execute(f"PRAGMA synchronous = {args.synchronous}"))
+            engine.dispose()
+
+        print(f"synchronous={args.synchronous}, {args.seconds:g}s per run")
+        print(f"{'clients':>8} {'per-request':>14} {'group commit':>14}")
+        for clients in [int(n) for n in args.clients.split(',')]:
+            rates = []
+            for group_commit in (False, True):
+                rate, errors = run(app, db_path, clients, args.seconds, group_commit)
+                rates.append(f"{rate:.1f}/s" + (f" ({sum(errors.values())} err)" if errors else ""))
+            print(f"{clients:>8} {rates[0]:>14} {rates[1]:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+EXPLAIN QUERY PLAN regression check for every view and route statement.
+
+Generates a seeded dataset (tools/generate_data.py), loads it into a
+scratch database, then inside one process pointed at it:
+
+- records every SQL statement (with its parameters) the routes (views/)
+  issue while tools.benchmark's scenario walks through them;
+- adds ``SELECT * FROM <view>`` for every view in business_queries.sql;
+- runs EXPLAIN QUERY PLAN on each and fails on a full SCAN of a table with
+  at least --min-rows rows, unless services.query_plans.ALLOWED_SCANS
+  lists it.
+
+For each failure a candidate index is suggested and tried inside a
+transaction that is rolled back, to show whether it removes the scan.
+
+    python -m tools.query_plan_check
+    python -m tools.query_plan_check --customers 10000 --orders 100000 -v
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from load_from_sql import load_streaming
+from tools import generate_data
+
+SKIPPED_PREFIXES = ('PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'EXPLAIN')
+
+
+class StatementCollector:
+    """First parameters and the route labels of every distinct statement"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.statements = {}
+        event.listen(engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(SKIPPED_PREFIXES):
+            return
+        from flask import has_request_context, request
+        label = f"{request.method} {request.path}" if has_request_context() else "(no request)"
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        entry = self.statements.setdefault(statement, {'params': tuple(parameters or ()), 'labels': []})
+        if label not in entry['labels']:
+            entry['labels'].append(label)
+
+
+def collect_route_statements(app, engine):
+    from tools.benchmark import _scenario
+
+    collector = StatementCollector(engine)
+    for label, response in _scenario(app.test_client()):
+        if response.status_code >= 500:
+            raise RuntimeError(f"{label} returned {response.status_code}")
+    return collector.statements
+
+
+def check(db, query_plans, statements, min_rows, verbose):
+    """Print a line per statement; returns the number of failures"""
+    sizes = query_plans.table_sizes()
+    views = query_plans.view_sql()
+    partial = query_plans.partial_indexes()
+    failures = 0
+    for label, sql, params in statements:
+        try:
+            plan = query_plans.explain(sql, params)
+        except Exception as e:
+            db.session.rollback()
+            failures += 1
+            print(f"{'ERROR':<7} {label}\n        {str(e).splitlines()[0]}")
+            continue
+        expanded = query_plans.expand_views(sql, views)
+        aliases = query_plans.table_aliases(expanded, sizes)
+        scans = query_plans.large_scans(plan, aliases, sizes, min_rows, partial)
+        problems = [(table, alias) for table, alias in scans if not query_plans.allowed_scan(table, expanded)]
+        allowed = [query_plans.allowed_scan(table, expanded) for table, alias in scans
+                   if (table, alias) not in problems]
+
+        status = 'FAIL' if problems else 'allowed' if allowed else 'ok'
+        print(f"{status:<7} {label}")
+        if problems or verbose:
+            print(f"        {' '.join(sql.split())[:160]}")
+            print(f"        plan: {' | '.join(plan)}")
+        for reason in allowed:
+            if verbose:
+                print(f"        allowed: {reason}")
+        for table, alias in problems:
+            failures += 1
+            print(f"        full scan of {table} ({sizes[table]} rows)")
+            index = query_plans.suggest_index(expanded, table, alias)
+            if index is None:
+                print("        no candidate index: add it to ALLOWED_SCANS if the scan is intended")
+                continue
+            print(f"        suggested: {index}")
+            # DDL is not wrapped in a transaction by the driver, so roll the index back by hand
+            conn = db.session.connection()
+            conn.exec_driver_sql("SAVEPOINT suggested_index")
+            try:
+                conn.exec_driver_sql(index)
+                index_name = index.split()[2]
+                fixed = (table, alias) not in query_plans.large_scans(
+                    query_plans.explain(sql, params), aliases, sizes, min_rows, partial | {index_name})
+            finally:
+                conn.exec_driver_sql("ROLLBACK TO suggested_index")
+                conn.exec_driver_sql("RELEASE suggested_index")
+            print(f"        {'removes the scan' if fixed else 'does not remove the scan'} on this dataset")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail on full table scans in view and route query plans")
+    parser.add_argument('--customers', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--min-rows', type=int, default=None,
+                        help="tables smaller than this may be scanned (default: LARGE_TABLE_ROWS)")
+    parser.add_argument('--db', help="check an existing database instead of generating one")
+    parser.add_argument('-v', '--verbose', action='store_true', help="print every plan")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='pizza-plans-') as workdir:
+        db_path = args.db
+        if not db_path:
+            db_path = os.path.join(workdir, 'plans.db')
+            sql_path = os.path.join(workdir, 'generated.sql')
+            print(f"• generating {args.customers} customers / {args.orders} orders", file=sys.stderr)
+            with open(sql_path, 'w', encoding='utf-8') as out:
+                generate_data.generate(out, args.customers, args.orders, seed=args.seed,
+                                       end=datetime.now().replace(second=0, microsecond=0))
+            with contextlib.redirect_stdout(io.StringIO()):
+                load_streaming(db_path, [generate_data.SAMPLE_DATA_PATH, sql_path])
+
+        os.environ['PIZZA_DATABASE_URI'] = f"sqlite:///{os.path.abspath(db_path)}"
+        from main import create_app
+        from ORM import db
+        app = create_app()
+        from services import query_plans
+
+        app.config['TESTING'] = True
+        with app.app_context():
+            route_statements = collect_route_statements(app, db.engine)
+
+        with app.app_context():
+            statements = [(f"view {name}", f"SELECT * FROM {name}", {})
+                          for name in sorted(query_plans.view_sql())]
+            statements += [(', '.join(entry['labels']), sql, entry['params'])
+                           for sql, entry in route_statements.items()]
+            min_rows = args.min_rows if args.min_rows is not None else query_plans.LARGE_TABLE_ROWS
+            failures = check(db, query_plans, statements, min_rows, args.verbose)
+
+    if failures:
+        raise SystemExit(f"{failures} statement(s) failed: full scans of large tables or EXPLAIN errors")
+    print(f"✓ {len(statements)} statements, no unexpected full scans")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Render timings for the catalog pages with and without the fragment cache.
+
+Builds a scratch database from the sample data, optionally pads the
+catalog with extra pizzas (copying an existing recipe) and products, and
+times GET / (anonymous and signed in) and GET /products through Flask's
+test client with FRAGMENT_CACHE off and on. Conditional GET never kicks in
+here: the client sends no validators.
+
+    python -m tools.render_benchmark --pizzas 60 --products 40 --repeat 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from load_from_sql import load_streaming
+
+SIGNIN = {'email': 'john.smith@example.com', 'password': 'Password1!'}
+PAGES = [('GET / (anonymous)', False, '/'), ('GET / (signed in)', True, '/'), ('GET /products', True, '/products')]
+
+
+def pad_catalog(db_path, pizzas, products):
+    """Add copies of pizza 1 and product 1 until the catalog has the requested size"""
+    with sqlite3.connect(db_path) as conn:
+        have = conn.execute("SELECT COUNT(*) FROM Pizza WHERE active").fetchone()[0]
+        for n in range(max(0, pizzas - have)):
+            pizza_id = conn.execute("INSERT INTO Pizza (name, active) VALUES (?, 1)", (f"House Special {n + 1}",)).lastrowid
+            conn.execute("""
+                INSERT INTO PizzaIngredient (pizza_id, ingredient_id, grams)
+                SELECT ?, ingredient_id, grams FROM PizzaIngredient WHERE pizza_id = 1
+            """, (pizza_id,))
+        have = conn.execute("SELECT COUNT(*) FROM Product WHERE active").fetchone()[0]
+        for n in range(max(0, products - have)):
+            conn.execute("INSERT INTO Product (name, category, cost, is_alcohol, active) VALUES (?, 'snack', ?, 0, 1)",
+                         (f"Side {n + 1}", 2.5 + n % 7))
+
+
+def time_page(client, url, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        response = client.get(url)
+        samples.append((time.perf_counter() - t0) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+    return statistics.median(samples), sorted(samples)[int(len(samples) * 0.95) - 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catalog page render timings with/without the fragment cache")
+    parser.add_argument('--pizzas', type=int, default=60, help="active pizzas in the catalog (padded)")
+    parser.add_argument('--products', type=int, default=40, help="active products in the catalog (padded)")
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='pizza-render-') as workdir:
+        db_path = os.path.join(workdir, 'database.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_streaming(db_path)
+        pad_catalog(db_path, args.pizzas, args.products)
+
+        os.environ['PIZZA_DATABASE_URI'] = f"sqlite:///{os.path.abspath(db_path)}"
+        from main import create_app
+        app = create_app()
+        from services.fragment_cache import fragment_cache
+        app.config['TESTING'] = True
+
+        anonymous = app.test_client()
+        signed_in = app.test_client()
+        signed_in.post('/signin', data=SIGNIN)
+
+        print(f"{args.pizzas} pizzas, {args.products} products, median / p95 of {args.repeat} requests (ms)")
+        print(f"{'page':<20} {'no cache':>16} {'fragment cache':>16}")
+        for label, signed, url in PAGES:
+            client = signed_in if signed else anonymous
+            results = []
+            for enabled in (False, True):
+                app.config['FRAGMENT_CACHE'] = enabled
+                fragment_cache.clear()
+                client.get(url)  # warm the menu cache (and the fragment)
+                median, p95 = time_page(client, url, args.repeat)
+                results.append(f"{median:.2f} / {p95:.2f}")
+            print(f"{label:<20} {results[0]:>16} {results[1]:>16}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Throughput of the debug server against gunicorn (gunicorn.conf.py).
+
+Builds a scratch database from the sample data, then for each server:
+starts it as a subprocess on a free port and waits until it serves a
+static file (which touches no cache), sends COLD_REQUESTS requests over
+URLS one by one (the first hits on each worker: without warm-up they build
+the menu, grids and connections) and then runs --clients client processes
+for --seconds, each sending GET requests round-robin over URLS on a fresh
+connection (the debug server closes every connection anyway).
+
+- debug: ``app.run(debug=True, use_reloader=False)``, what ``python
+  main.py`` runs;
+- gunicorn: ``gunicorn -c gunicorn.conf.py wsgi:app`` with --workers and
+  --threads, with the per-worker warm-up;
+- gunicorn, no warm-up (``--no-warm-up-run`` skips it): shows what the
+  warm-up does to the first requests.
+
+    python -m tools.server_benchmark --clients 16 --seconds 10 --workers 4 --threads 4
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from tools.concurrency_check import build_database
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+URLS = ['/', '/products', '/api/menu', '/api/products?limit=50']
+READY_URL = '/static/style.css'
+COLD_REQUESTS = 32
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def get(url):
+    """(status, seconds) of one GET"""
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return status, time.perf_counter() - started
+
+
+def start(command, env, base_url, deadline=60):
+    """Start a server; returns (process, seconds until it answers)"""
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while time.perf_counter() - started < deadline:
+        if get(base_url + READY_URL)[0] == 200:
+            return process, time.perf_counter() - started
+        if process.poll() is not None:
+            raise RuntimeError(f"{command[0]} exited with {process.returncode}")
+        time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"server at {base_url} did not answer within {deadline}s")
+
+
+def stop(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def _client(base_url, seconds, offset):
+    """Requests until the deadline; returns (latencies of 200s, errors)"""
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + seconds
+    n = offset
+    while time.monotonic() < deadline:
+        status, elapsed = get(base_url + URLS[n % len(URLS)])
+        n += 1
+        if status == 200:
+            latencies.append(elapsed)
+        else:
+            errors += 1
+    return latencies, errors
+
+
+def load(base_url, clients, seconds):
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(clients) as pool:
+        results = pool.starmap(_client, [(base_url, seconds, i) for i in range(clients)])
+    latencies = sorted(latency for result in results for latency in result[0])
+    return latencies, sum(result[1] for result in results)
+
+
+def run(label, command, env, base_url, args):
+    process, ready = start(command, env, base_url)
+    try:
+        cold = [get(base_url + URLS[n % len(URLS)])[1] for n in range(COLD_REQUESTS)]
+        latencies, errors = load(base_url, args.clients, args.seconds)
+    finally:
+        stop(process)
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000 if latencies else 0
+    median = statistics.median(latencies) * 1000 if latencies else 0
+    print(f"{label:<28} {len(latencies) / args.seconds:>8.1f} {median:>8.1f} {p99:>8.1f} "
+          f"{errors:>6} {ready:>8.2f} {max(cold) * 1000:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Debug server vs gunicorn: requests/s and latency")
+    parser.add_argument('--clients', type=int, default=16, help="concurrent client processes")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--no-warm-up-run', action='store_true', help="skip the gunicorn run without warm-up")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='pizza-server-') as workdir:
+        db_path = os.path.join(workdir, 'database.db')
+        build_database(db_path)
+        env = dict(os.environ, PIZZA_DATABASE_URI=f"sqlite:///{db_path}")
+
+        print(f"{args.clients} clients for {args.seconds:g}s per server over {', '.join(URLS)}; "
+              f"cold ms: slowest of the first {COLD_REQUESTS} requests")
+        print(f"{'server':<28} {'req/s':>8} {'med ms':>8} {'p99 ms':>8} {'errors':>6} "
+              f"{'ready s':>8} {'cold ms':>9}")
+
+        port = free_port()
+        debug = [sys.executable, '-c', f"import main; main.create_app().run(debug=True, use_reloader=False, port={port})"]
+        run('debug server', debug, env, f"http://127.0.0.1:{port}", args)
+
+        gunicorn_env = dict(env, PIZZA_WORKERS=str(args.workers), PIZZA_THREADS=str(args.threads),
+                            PIZZA_BIND=f"127.0.0.1:{port}")
+        gunicorn = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--pid',
+                    os.path.join(workdir, 'gunicorn.pid'), 'wsgi:app']
+        label = f"gunicorn {args.workers}x{args.threads}"
+        run(label, gunicorn, gunicorn_env, f"http://127.0.0.1:{port}", args)
+        if not args.no_warm_up_run:
+            run(label + ' no warm-up', gunicorn, dict(gunicorn_env, PIZZA_WARM_UP='0'),
+                f"http://127.0.0.1:{port}", args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Cold-start cost of the app: import time and time to first response.
+
+Every sample is a fresh interpreter pointed at a scratch database (the
+sample data, or --db) through PIZZA_DATABASE_URI. It records:
+
+- import_ms: ``import main``;
+- create_app_ms: ``main.create_app()``;
+- first_response_ms: the first ``GET /`` through the test client;
+- ready_ms: the three above together, what a new worker costs before it
+  has answered once (work moved between them does not count as a gain);
+- process_ms: the whole process, interpreter start to exit;
+- cli_ms: ``flask --app main --help``, what every CLI invocation pays
+  before its command runs.
+
+One more run with ``python -X importtime -c "import main"`` lists the
+modules main.py pulls in at import and the slowest of them.
+
+Results go to a JSON report that can be compared with an older one to
+catch regressions:
+
+    python -m tools.startup_benchmark -o startup.json
+    python -m tools.startup_benchmark --compare startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from tools.concurrency_check import build_database
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS = ('import_ms', 'create_app_ms', 'first_response_ms', 'ready_ms', 'process_ms', 'cli_ms')
+GUARDED = ('ready_ms', 'process_ms', 'cli_ms')   # compared against the baseline
+NOISE_FLOOR_MS = 5.0
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def cold_start():
+    """Runs in the child process: one import / create_app / first request"""
+    t0 = time.perf_counter()
+    import main
+    t1 = time.perf_counter()
+    app = main.create_app()
+    t2 = time.perf_counter()
+    status = app.test_client().get('/').status_code
+    t3 = time.perf_counter()
+    if status != 200:
+        raise SystemExit(f"GET / returned {status}")
+    return {'import_ms': (t1 - t0) * 1000, 'create_app_ms': (t2 - t1) * 1000,
+            'first_response_ms': (t3 - t2) * 1000, 'ready_ms': (t3 - t0) * 1000}
+
+
+def sample(env):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-m', 'tools.startup_benchmark', '--child'],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    process_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"cold start failed:\n{result.stderr[-3000:]}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_ms'] = process_ms
+
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'main', '--help'],
+                   cwd=ROOT, env=env, capture_output=True, check=True)
+    timings['cli_ms'] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def import_profile(env, top):
+    """(modules imported by main, cumulative ms of main, slowest modules by self time)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    main_us = next((cumulative for name, _, cumulative in modules if name == 'main'), 0)
+    slowest = sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+    return len(modules), main_us / 1000, [{'module': name, 'self_ms': round(us / 1000, 2)}
+                                          for name, us, _ in slowest]
+
+
+def compare(baseline, report, threshold):
+    """Print changes against a baseline; return the regressions (GUARDED metrics only)"""
+    regressions = []
+    for metric in METRICS:
+        old, new = baseline['median'].get(metric), report['median'][metric]
+        if old is None:
+            continue
+        ratio = max(new, NOISE_FLOOR_MS) / max(old, NOISE_FLOOR_MS)
+        line = f"{metric}: {old:.1f}ms -> {new:.1f}ms (x{ratio:.2f})"
+        flag = metric in GUARDED and ratio > threshold
+        print(('REGRESSION ' if flag else '           ') + line)
+        if flag:
+            regressions.append(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import time and time to first response of main.py")
+    parser.add_argument('--repeat', type=int, default=7, help="cold starts to take the median of")
+    parser.add_argument('--db', help="database to start against (default: scratch copy of the sample data)")
+    parser.add_argument('--top', type=int, default=10, help="slowest imports to list")
+    parser.add_argument('-o', '--output', help="write the JSON report here")
+    parser.add_argument('--compare', metavar='JSON', help="baseline report to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown ratio reported as a regression (default: 1.25)")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(cold_start()))
+        return
+
+    with tempfile.TemporaryDirectory(prefix='pizza-startup-') as workdir:
+        db_path = args.db or os.path.join(workdir, 'database.db')
+        if not args.db:
+            build_database(db_path)
+        env = dict(os.environ, PIZZA_DATABASE_URI=f"sqlite:///{os.path.abspath(db_path)}")
+        samples = [sample(env) for _ in range(args.repeat)]
+        module_count, main_ms, slowest = import_profile(env, args.top)
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'median': {metric: round(statistics.median(s[metric] for s in samples), 2) for metric in METRICS},
+        'importtime': {'modules': module_count, 'main_ms': round(main_ms, 2), 'slowest': slowest},
+    }
+
+    print(f"median of {args.repeat} cold starts")
+    for metric in METRICS:
+        print(f"  {metric:<18} {report['median'][metric]:>9.1f}")
+    print(f"python -X importtime -c 'import main': {module_count} modules, main {main_ms:.1f}ms cumulative")
+    for entry in slowest:
+        print(f"  {entry['self_ms']:>8.2f}ms  {entry['module']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(report, indent=2) + '\n')
+        print(f"✓ Wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} regression(s) against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+"""
+Route blueprints, registered by main.create_app().
+
+Endpoints are namespaced by blueprint: url_for('shop.index'),
+url_for('account.signIn_route'), url_for('reports.reports_page'), ...
+"""
+
+
+def register_blueprints(app):
+    # Imported here so that `import main` does not pull in every route, model and service
+    import commands
+    from views import account, api, ops, reports, shop
+
+    for module in (shop, account, reports, api, ops, commands):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,111 @@
+"""
+Customer sign up, sign in and sign out.
+"""
+from datetime import datetime, date
+from flask import Blueprint, redirect, render_template, request, session, url_for
+from ORM import db
+from ORM.Customer import Customer
+from services import loyalty
+from services.cart import cart_store
+
+bp = Blueprint('account', __name__)
+
+# -----------------------------
+# SIGN IN PAGE
+# -----------------------------
+@bp.route("/signin", methods=["GET", "POST"])
+def signIn_route():
+    if request.method == "POST":
+        email = request.form.get("email")
+        password = request.form.get("password")
+
+        # --- Basic validation ---
+        if not email or not password:
+            return "Both email and password are required", 400
+
+        # --- Check if customer exists ---
+        customer = Customer.query.filter_by(email=email).first()
+
+        # --- Validate credentials ---
+        if not customer or customer.password != password:
+            return redirect(url_for(".login_failed_route"))
+
+        # --- Store logged-in customer ID in session ---
+        session['customer_id'] = customer.customer_id
+
+        # --- Successful login ---
+        session['customer_id'] = customer.customer_id
+        session['customer_name'] = f"{customer.first_name} {customer.last_name}"
+        return redirect(url_for("shop.index"))
+
+    # GET request
+    return render_template("signIn.html", current_year=datetime.now().year)
+
+# -----------------------------
+# SIGN UP PAGE
+# -----------------------------
+@bp.route("/signup", methods=["GET", "POST"])
+def signUp_route():
+    max_birth_date = date.today().isoformat()
+
+    if request.method == "POST":
+        first_name = request.form.get("first_name")
+        last_name = request.form.get("last_name")
+        email = request.form.get("email")
+        password = request.form.get("password")
+        birth_date_str = request.form.get("birth_date")
+        postcode = request.form.get("postcode")
+        gender = request.form.get("gender")
+
+        if not all([first_name, last_name, email, password, birth_date_str, postcode, gender]):
+            return "All fields are required", 400
+
+        try:
+            birth_date = datetime.strptime(birth_date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return "Invalid birth date format", 400
+
+        if not postcode.isdigit() or len(postcode) != 5:
+            return "Invalid postcode format", 400
+
+        # --- Check for existing email ---
+        existing_customer = Customer.query.filter_by(email=email).first()
+        if existing_customer:
+            return "Email already registered", 400
+
+        # --- Create and save new customer ---
+        new_customer = Customer(
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            password=password,
+            birth_date=birth_date,
+            postcode=postcode,
+            gender=gender
+        )
+
+        db.session.add(new_customer)
+        db.session.flush()
+        loyalty.open_counter(new_customer.customer_id)
+        db.session.commit()
+
+        return redirect(url_for(".signIn_route"))
+
+    return render_template("signUp.html", current_year=datetime.now().year, max_birth_date=max_birth_date)
+
+# -----------------------------
+# LOGOUT
+# -----------------------------
+@bp.route("/logout")
+def logout():
+    session.pop('customer_id', None)
+    session.pop('customer_name', None)
+    cart_store.clear(session.pop('cart_id', None))
+    return redirect(url_for("shop.index"))
+
+# -----------------------------
+# LOGIN FAILED PAGE
+# -----------------------------
+@bp.route("/login_failed")
+def login_failed_route():
+    return render_template("login_failed.html", current_year=datetime.now().year)
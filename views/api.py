@@ -0,0 +1,29 @@
+"""
+JSON API routes; the paging and projection live in services/api.py.
+"""
+from flask import Blueprint, jsonify, session
+from services import api
+
+bp = Blueprint('api', __name__, url_prefix='/api')
+
+# -----------------------------
+# JSON API (read-only, keyset pagination + ?fields= projection, see services/api.py)
+# -----------------------------
+@bp.errorhandler(api.ApiError)
+def api_error(e):
+    return jsonify(error=str(e)), e.status
+
+@bp.route("/menu")
+def api_menu():
+    return jsonify(api.menu_page())
+
+@bp.route("/products")
+def api_products():
+    return jsonify(api.products_page())
+
+@bp.route("/orders")
+def api_orders():
+    customer_id = session.get("customer_id")
+    if not customer_id:
+        raise api.ApiError("sign in to list your orders", 401)
+    return jsonify(api.orders_page(customer_id))
@@ -0,0 +1,14 @@
+"""
+Operational endpoints.
+"""
+from flask import Blueprint, Response
+from services.metrics import metrics
+
+bp = Blueprint('ops', __name__)
+
+# -----------------------------
+# METRICS (Prometheus scrape endpoint)
+# -----------------------------
+@bp.route("/metrics")
+def metrics_route():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
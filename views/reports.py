@@ -0,0 +1,121 @@
+"""
+Employee pages: the reports, their exports and closing orders.
+"""
+from datetime import date, datetime
+from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
+from sqlalchemy import text
+from ORM import db
+from ORM.Customer import Customer
+from ORM.Order import Order
+from services import exports, orders, reports, staff
+from services.analytics_snapshot import analytics_snapshot
+
+bp = Blueprint('reports', __name__)
+
+# -----------------------------
+# CANCEL ORDER (For Employees)
+# -----------------------------
+@bp.route("/orders/<int:order_id>/cancel", methods=["POST"])
+@staff.employee_required
+def cancel_order_route(order_id):
+    order = Order.query.get(order_id)
+    if not order:
+        return "Order not found", 404
+
+    if orders.cancel_order(order):
+        db.session.commit()
+        flash(f"Order #{order_id} has been cancelled.", "info")
+    else:
+        flash(f"Order #{order_id} can no longer be cancelled.", "warning")
+    return redirect(url_for(".reports_page", type="undelivered"))
+
+# -----------------------------
+# MARK ORDER DELIVERED (For Employees)
+# -----------------------------
+@bp.route("/orders/<int:order_id>/deliver", methods=["POST"])
+@staff.employee_required
+def deliver_order_route(order_id):
+    order = Order.query.get(order_id)
+    if not order:
+        return "Order not found", 404
+
+    if orders.mark_delivered(order):
+        db.session.commit()
+        flash(f"Order #{order_id} has been marked as delivered.", "info")
+    else:
+        flash(f"Order #{order_id} is already closed.", "warning")
+    return redirect(url_for(".reports_page", type="undelivered"))
+
+# -----------------------------
+# REPORTS PAGE (For Employees)
+# -----------------------------
+@bp.route("/reports")
+def reports_page():
+    customer_id = session.get("customer_id")
+    customer = Customer.query.get(customer_id) if customer_id else None
+    
+    # Get filter parameters
+    report_type = request.args.get("type", "undelivered")
+    if report_type not in reports.REPORT_TYPES:
+        report_type = "undelivered"
+    gender_filter = request.args.get("gender", "all")
+    age_filter = request.args.get("age", "all")
+    postcode_filter = request.args.get("postcode", "all")
+    page = max(request.args.get("page", 1, type=int), 1)
+
+    # Only the requested page is fetched; row counts and totals come from the database
+    query, params = reports.report_query(report_type, gender_filter, age_filter, postcode_filter)
+    summary_sql, summary_params = reports.summary_query(report_type, query, params)
+    summary = db.session.execute(
+        text(summary_sql), summary_params, bind_arguments=analytics_snapshot.reads()
+    ).mappings().one()
+    page_count = max(1, -(-summary["total_rows"] // reports.REPORT_PAGE_SIZE))
+    page = min(page, page_count)
+    page_sql, page_params = reports.page_query(query, params, page)
+    rows = db.session.execute(text(page_sql), page_params, bind_arguments=analytics_snapshot.reads())
+    rows = [dict(row._mapping) for row in rows]
+
+    # Get unique postcodes for filter dropdown
+    postcodes = db.session.execute(
+        text("SELECT DISTINCT postcode FROM Customer ORDER BY postcode"), bind_arguments=analytics_snapshot.reads()
+    ).fetchall()
+    postcode_list = [row[0] for row in postcodes]
+
+    # Age of the data shown, when the reports read the analytics snapshot
+    snapshot_taken_at = analytics_snapshot.taken_at() if current_app.config["ANALYTICS_SNAPSHOT"] else None
+    
+    return render_template(
+        "reports.html",
+        customer=customer,
+        report_type=report_type,
+        undelivered_orders=rows if report_type == "undelivered" else [],
+        top_pizzas=rows if report_type == "top_pizzas" else [],
+        earnings=rows if report_type == "earnings" else [],
+        summary=summary,
+        page=page,
+        page_count=page_count,
+        gender_filter=gender_filter,
+        age_filter=age_filter,
+        postcode_filter=postcode_filter,
+        postcode_list=postcode_list,
+        snapshot_taken_at=snapshot_taken_at,
+        is_employee=staff.is_employee(),
+        csrf_token=staff.csrf_token(),
+        snapshot_age_minutes=int((datetime.now() - snapshot_taken_at).total_seconds() // 60) if snapshot_taken_at else None,
+        current_year=datetime.now().year
+    )
+
+@bp.route("/reports/export")
+@staff.employee_required
+def reports_export():
+    """Whole report as CSV or NDJSON, streamed in batches (services/exports.py)"""
+    report_type = request.args.get("type", "undelivered")
+    export_format = request.args.get("format", "csv")
+    if report_type not in reports.REPORT_TYPES or export_format not in exports.EXPORT_FORMATS:
+        return "Unknown report type or format", 400
+
+    query, params = reports.report_query(
+        report_type, request.args.get("gender", "all"), request.args.get("age", "all"),
+        request.args.get("postcode", "all")
+    )
+    return exports.stream(query, params, export_format, f"{report_type}-{date.today().isoformat()}")
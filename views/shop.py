@@ -0,0 +1,309 @@
+"""
+Storefront: menu, products, cart, checkout and placing orders.
+"""
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
+from ORM import db
+from ORM.Customer import Customer
+from ORM.DiscountCode import DiscountCode
+from ORM.Product import Product
+from ORM.UsedDiscountCode import UsedDiscountCode
+from services import http_cache, orders, pricing, sqlite_profile
+from services.cart import cart_store, resolve_cart
+from services.dispatch import dispatcher
+from services.fragment_cache import fragment_cache
+from services.menu_cache import menu_cache
+from services.order_queue import order_queue
+
+bp = Blueprint('shop', __name__)
+
+# -----------------------------
+# HOME PAGE
+# -----------------------------
+@bp.route("/")
+@http_cache.conditional("index")  # 304 on a matching ETag before any query/render
+def index():
+    customer_id = session.get('customer_id')
+    customer = Customer.query.get(customer_id) if customer_id else None
+
+    # Active pizzas with calculated prices (cached PizzaMenu, rebuilt on catalog changes)
+    pizzas = menu_cache.active_pizzas()
+
+    # The grid HTML is reused until the menu version (or sign-in state) changes
+    signed_in = customer_id is not None
+    pizza_grid = fragment_cache.render(
+        "partials/pizza_grid.html", (menu_cache.version, signed_in),
+        lambda: {"pizzas": pizzas, "signed_in": signed_in}
+    )
+
+    return render_template(
+        "homepage.html",
+        current_year=datetime.now().year,
+        customer=customer,
+        pizza_grid=pizza_grid
+    )
+
+# -----------------------------
+# ADD TO CART
+# -----------------------------
+def current_cart_id():
+    """Cart id from the session cookie, issuing one on first use"""
+    if "cart_id" not in session:
+        session["cart_id"] = cart_store.new_id()
+    return session["cart_id"]
+
+
+@bp.route("/add_to_cart/<int:pizza_id>", methods=["POST"])
+def add_to_cart(pizza_id):
+    if "customer_id" not in session:
+        flash("Please sign in to add pizzas to your cart.", "warning")
+        return redirect(url_for("account.signIn_route"))
+
+    # Price and name come from the cached PizzaMenu
+    pizza = menu_cache.get(pizza_id)
+    if not pizza or not pizza['active']:
+        return "Pizza not available", 404
+
+    pizza_name = pizza['name']
+
+    # Only the cart id travels in the cookie; the lines are stored in the database
+    if not cart_store.add(current_cart_id(), 'pizza', pizza_id):
+        flash("Your cart is full.", "warning")
+        return redirect(url_for(".index"))
+
+    flash(f"Added {pizza_name} to your cart!", "success")
+    return redirect(url_for(".index"))
+
+# -----------------------------
+# CLEAR CART/REMOVE PAGE
+# -----------------------------
+@bp.route("/clear_cart")
+def clear_cart():
+    cart_store.clear(session.pop("cart_id", None))
+    flash("Your cart has been cleared.", "info")
+    return redirect(url_for(".cart_summary_route"))
+
+# -----------------------------
+# CART SUMMARY PAGE
+# -----------------------------
+@bp.route("/cart")
+def cart_summary_route():
+    # Names and current prices come from the menu cache / one products query
+    priced_cart = resolve_cart(cart_store.items(session.get("cart_id")))
+    total_price = round(priced_cart.subtotal, 2)
+
+    return render_template(
+        "cart_summary.html",
+        cart_items=priced_cart.lines,
+        total_price=total_price,
+        current_year=datetime.now().year
+    )
+
+# -----------------------------
+# ADD PRODUCTS PAGE
+# -----------------------------
+@bp.route("/add_product_to_cart/<int:product_id>", methods=["POST"])
+def add_product_to_cart(product_id):
+    if "customer_id" not in session:
+        flash("Please sign in to add products to your cart.", "warning")
+        return redirect(url_for("account.signIn_route"))
+
+    product = Product.query.get(product_id)
+    if not product or not product.active:
+        return "Product not available", 404
+
+    quantity = int(request.form.get("quantity", 1))
+    if quantity <= 0:
+        quantity = 1
+
+    product_name = product.name
+    if not cart_store.add(current_cart_id(), 'product', product.product_id, quantity):
+        flash("Your cart is full.", "warning")
+        return redirect(url_for(".products_page"))
+
+    flash(f"Added {product_name} x{quantity} to your cart!", "success")
+    return redirect(url_for(".products_page"))
+
+@bp.route("/products")
+@http_cache.conditional("products")
+def products_page():
+    customer_id = session.get("customer_id")
+    customer = Customer.query.get(customer_id) if customer_id else None
+
+    # Fetch all active products (drinks/snacks), only when the cached grid is out of date
+    product_grid = fragment_cache.render(
+        "partials/product_grid.html", (http_cache.catalog_clock.current()[0],),
+        lambda: {"products": db.session.scalars(
+            db.select(Product).filter_by(active=True), bind_arguments=sqlite_profile.reads()
+        ).all()}
+    )
+
+    return render_template(
+        "products_page.html",
+        product_grid=product_grid,
+        current_year=datetime.now().year,
+        customer=customer
+    )
+
+# -----------------------------
+# CHECKOUT PAGE
+# -----------------------------
+@bp.route("/checkout")
+def checkout_page():
+    cart = cart_store.items(session.get("cart_id"))
+    if not cart:
+        flash("Your cart is empty.", "warning")
+        return redirect(url_for(".index"))
+    
+    customer_id = session.get("customer_id")
+    if not customer_id:
+        flash("Please sign in to checkout.", "warning")
+        return redirect(url_for("account.signIn_route"))
+    
+    customer = Customer.query.get(customer_id)
+    
+    # Price the cart in bulk (one products query, pizzas from the menu cache)
+    priced_cart = resolve_cart(cart)
+    
+    # Birthday gift, loyalty reward and discount code, signed so place_order can reuse it
+    discount_code = session.get("discount_code")
+    quote, rejected_code = pricing.build_quote(customer, priced_cart, cart, discount_code)
+    if rejected_code:
+        flash(f"Discount code '{rejected_code}' has already been used.", "warning")
+    if discount_code and not quote['discount_code']:
+        session.pop("discount_code", None)
+        discount_code = None
+    
+    # Calculate estimated delivery time
+    # Earliest courier for the customer's postcode (from the dispatcher's heaps)
+    courier_free_at = dispatcher.next_available(customer.postcode)
+    
+    estimated_delivery_minutes = 30  # Base delivery time
+    if courier_free_at:
+        # Calculate cooldown remaining
+        cooldown_remaining = max(0, (courier_free_at - datetime.now()).total_seconds() / 60)
+        estimated_delivery_minutes += cooldown_remaining
+    
+    estimated_delivery_time = datetime.now() + timedelta(minutes=estimated_delivery_minutes)
+    
+    return render_template(
+        "checkout.html",
+        cart_items=priced_cart.lines,
+        subtotal=quote['subtotal'],
+        discounts=quote['discounts'],
+        total_discount=quote['total_discount'],
+        total_price=quote['total'],
+        discount_code=discount_code,
+        is_birthday=quote['is_birthday'],
+        quote_token=pricing.sign_quote(quote),
+        estimated_delivery_minutes=int(estimated_delivery_minutes),
+        estimated_delivery_time=estimated_delivery_time.strftime("%H:%M"),
+        current_year=datetime.now().year
+    )
+
+# -----------------------------
+# APPLY DISCOUNT CODE
+# -----------------------------
+@bp.route("/apply_discount", methods=["POST"])
+def apply_discount():
+    code_input = request.form.get("discount_code", "").strip().upper()
+    
+    if not code_input:
+        flash("Please enter a discount code.", "warning")
+        return redirect(url_for(".checkout_page"))
+    
+    customer_id = session.get("customer_id")
+    if not customer_id:
+        flash("Please sign in first.", "warning")
+        return redirect(url_for("account.signIn_route"))
+    
+    # Check if code exists
+    discount_code = DiscountCode.query.get(code_input)
+    if not discount_code:
+        flash("Invalid discount code.", "error")
+        return redirect(url_for(".checkout_page"))
+    
+    # Check if it's a single-use code and has been used
+    if discount_code.single_use:
+        already_used = UsedDiscountCode.query.filter_by(
+            customer_id=customer_id,
+            code=code_input
+        ).first()
+        if already_used:
+            flash(f"You have already used this discount code.", "error")
+            return redirect(url_for(".checkout_page"))
+    
+    # Apply the discount code
+    session["discount_code"] = code_input
+    session.modified = True
+    flash(f"Discount code '{code_input}' applied successfully!", "success")
+    return redirect(url_for(".checkout_page"))
+
+# -----------------------------
+# REMOVE DISCOUNT CODE
+# -----------------------------
+@bp.route("/remove_discount", methods=["POST"])
+def remove_discount():
+    session.pop("discount_code", None)
+    session.modified = True
+    flash("Discount code removed.", "info")
+    return redirect(url_for(".checkout_page"))
+
+# -----------------------------
+# PLACE ORDER PAGE
+# -----------------------------
+@bp.route("/place_order", methods=["POST"])
+def place_order_route():
+    cart = cart_store.items(session.get("cart_id"))
+    if not cart:
+        flash("Your cart is empty.", "warning")
+        return redirect(url_for(".index"))
+
+    customer_id = session.get("customer_id")
+    if not customer_id:
+        flash("You must sign in to place an order.", "warning")
+        return redirect(url_for("account.signIn_route"))
+
+    # Reuse the checkout pricing; only the cheap invariants are re-checked here
+    discount_code = session.get("discount_code")
+    try:
+        quote = pricing.load_quote(request.form.get("quote"), customer_id, cart, discount_code)
+    except pricing.QuoteError as e:
+        flash(str(e), "warning")
+        return redirect(url_for(".checkout_page"))
+
+    customer = Customer.query.get(customer_id)
+    customer_name = f"{customer.first_name} {customer.last_name}"
+
+    try:
+        if current_app.config['ORDER_GROUP_COMMIT']:
+            # Written by the queue's writer thread, committed together with other waiting orders
+            order_id, assignment = order_queue.place(customer_id, quote)
+        else:
+            new_order, assignment = orders.place_order(customer, quote)
+            db.session.commit()
+
+        if assignment:
+            delivery_person_id, wait_minutes = assignment
+            if wait_minutes >= 1:
+                # Every courier is in cooldown, order will wait for the first one
+                flash(f"Your delivery will be delayed by {int(wait_minutes)} minutes due to driver availability.", "info")
+        else:
+            # No delivery person for this postcode
+            flash(f"Warning: No delivery person assigned for postcode {customer.postcode}. Order placed as pending.", "warning")
+
+        # Clear cart and discount code from session
+        cart_store.clear(session.pop("cart_id", None))
+        session.pop("discount_code", None)
+        session.modified = True
+
+        # Show discount messages
+        for discount in quote['discounts']:
+            flash(f"{discount['description']} (€{discount['amount']:.2f})", "success")
+        flash("Your order has been placed successfully!", "success")
+        return render_template("order_success.html", customer_name=customer_name, current_year=datetime.now().year)
+
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Failed to place the order. Error: {str(e)}", "danger")
+        return redirect(url_for(".cart_summary_route"))
@@ -0,0 +1,15 @@
+"""
+WSGI entry point for production servers:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every worker process imports this module itself (the app is not preloaded
+in the master), so each gets its own SQLite connections, dispatcher heaps
+and background threads. The worker refuses to start (SchemaError) when the
+database lacks tables or columns; see services/schema.py.
+"""
+from main import create_app
+from services import schema
+
+app = create_app()
+schema.check(app)